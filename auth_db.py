@@ -1,46 +1,30 @@
 import pyodbc
-import hashlib
 import secrets
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Set, Tuple
 
-# Настройки подключения - ПРОВЕРЬТЕ ЭТИ ДАННЫЕ
-SERVER = 'ILYAS'  # Имя вашего сервера
-DATABASE = 'CarDealership'  # Имя базы данных
-USERNAME = 'sa'  # Имя пользователя
-PASSWORD = '11111'  # Пароль
+from cache import TTLCache
+from db_common import (
+    DUPLICATE_USER_ERROR, INSERT_USER_SQL, REHASH_PASSWORD_SQL, REVOKE_SESSIONS_SQL, SESSION_USER_SQL, UPDATE_PASSWORD_SQL,
+    insert_users_batched, query_taken_logins,
+)
+from db_connection import get_conn
+from hashing import hash_password, verify_password
 
-def get_conn():
-    try:
-        # Попробуем разные варианты строк подключения
-        conn_strs = [
-            # Стандартное подключение
-            f'DRIVER={{SQL Server}};SERVER={SERVER};DATABASE={DATABASE};UID={USERNAME};PWD={PASSWORD}',
-            # Подключение с Trusted Connection
-            f'DRIVER={{SQL Server}};SERVER={SERVER};DATABASE={DATABASE};Trusted_Connection=yes;',
-            # Альтернативный драйвер
-            f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={SERVER};DATABASE={DATABASE};UID={USERNAME};PWD={PASSWORD}',
-            # Локальный сервер
-            f'DRIVER={{SQL Server}};SERVER=localhost;DATABASE={DATABASE};UID={USERNAME};PWD={PASSWORD}',
-            f'DRIVER={{SQL Server}};SERVER=.\\SQLEXPRESS;DATABASE={DATABASE};Trusted_Connection=yes;'
-        ]
-        
-        for conn_str in conn_strs:
-            try:
-                print(f"Попытка подключения: {conn_str[:50]}...")
-                conn = pyodbc.connect(conn_str, timeout=10)
-                print("✅ Подключение успешно!")
-                return conn
-            except pyodbc.Error as e:
-                print(f"❌ Ошибка: {e}")
-                continue
-                
-        raise Exception("Не удалось подключиться к базе данных")
-        
-    except Exception as e:
-        print(f"❌ Критическая ошибка подключения: {e}")
-        raise
+# Кэш проверки занятости логина/email при регистрации. "Занято" не меняется
+# (пользователи не удаляются), а "свободно" живёт недолго: его может занять
+# другой терминал, окончательно это проверяет UNIQUE-ограничение при INSERT.
+TAKEN_CACHE_TTL = 3600
+FREE_CACHE_TTL = 30
+_taken_cache = TTLCache(TAKEN_CACHE_TTL, max_entries=4096)
+_free_cache = TTLCache(FREE_CACHE_TTL, max_entries=1024)
+
+_USER_COLUMNS = "id, username, email, password_hash, salt"
+
+# Массовый импорт: в одном запросе SQL Server - не больше 2100 параметров
+BULK_CHECK_CHUNK = 500  # логинов (и столько же email) на запрос проверки
+BULK_INSERT_BATCH = 1000  # строк на один executemany
 
-def init_db():
+def init_db() -> bool:
     """Инициализация базы данных"""
     try:
         with get_conn() as conn:
@@ -58,74 +42,216 @@ def init_db():
                     created_at DATETIME DEFAULT GETDATE()
                 )
             """)
+            # Метка сессий "Запомнить меня": сброс в NULL отзывает все сохранённые входы
+            cursor.execute("""
+                IF COL_LENGTH('users', 'session_nonce') IS NULL
+                ALTER TABLE users ADD session_nonce NVARCHAR(64) NULL
+            """)
             conn.commit()
             print("✅ Таблица users готова")
+            return True
             
     except Exception as e:
         print(f"❌ Ошибка инициализации БД: {e}")
         # Создаем демо-режим
         print("🔄 Запуск в демо-режиме без базы данных...")
+        return False
+
+def get_schema_version() -> int:
+    """Версия схемы, записанная в БД (0 - маркера ещё нет)"""
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            IF OBJECT_ID('SCHEMA_INFO', 'U') IS NULL
+                SELECT 0
+            ELSE
+                SELECT COALESCE((SELECT version FROM SCHEMA_INFO WHERE name = 'auto_dreams'), 0)
+        """)
+        return cursor.fetchone()[0]
+
+def set_schema_version(version: int):
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            IF OBJECT_ID('SCHEMA_INFO', 'U') IS NULL
+            CREATE TABLE SCHEMA_INFO (
+                name NVARCHAR(50) PRIMARY KEY,
+                version INT NOT NULL,
+                updated_at DATETIME DEFAULT GETDATE()
+            )
+        """)
+        cursor.execute("""
+            UPDATE SCHEMA_INFO SET version = ?, updated_at = GETDATE() WHERE name = 'auto_dreams';
+            IF @@ROWCOUNT = 0
+                INSERT INTO SCHEMA_INFO (name, version) VALUES ('auto_dreams', ?)
+        """, (version, version))
+        conn.commit()
 
-def hash_password(password: str, salt: str = None) -> tuple:
-    """Хеширование пароля с солью"""
-    if salt is None:
-        salt = secrets.token_hex(16)
-    password_hash = hashlib.pbkdf2_hmac(
-        'sha256', 
-        password.encode('utf-8'), 
-        salt.encode('utf-8'), 
-        100000
-    ).hex()
-    return password_hash, salt
+def _cache_key(column: str, value: str) -> tuple:
+    # Сравнение в SQL Server по умолчанию без учёта регистра
+    return column, value.strip().casefold()
+
+def _is_available(column: str, value: str, use_free_cache: bool = True) -> bool:
+    key = _cache_key(column, value)
+    hit, _ = _taken_cache.lookup(key)
+    if hit:
+        return False
+    if use_free_cache:
+        hit, _ = _free_cache.lookup(key)
+        if hit:
+            return True
+
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        # column берётся только из двух констант ниже, значение - параметром
+        cursor.execute(f"SELECT TOP (1) 1 FROM users WHERE {column} = ?", (value.strip(),))
+        taken = cursor.fetchone() is not None
+
+    if taken:
+        _taken_cache.put(key, True)
+        _free_cache.invalidate(key)
+    else:
+        _free_cache.put(key, True)
+    return not taken
+
+def is_username_available(username: str, use_free_cache: bool = True) -> bool:
+    """Свободен ли логин (поиск по уникальному индексу, ответы кэшируются)"""
+    return _is_available('username', username, use_free_cache)
+
+def is_email_available(email: str, use_free_cache: bool = True) -> bool:
+    """Свободен ли email (поиск по уникальному индексу, ответы кэшируются)"""
+    return _is_available('email', email, use_free_cache)
+
+def _mark_taken(username: str, email: str):
+    for key in (_cache_key('username', username), _cache_key('email', email)):
+        _taken_cache.put(key, True)
+        _free_cache.invalidate(key)
+
+def availability_cache_stats() -> Dict[str, Any]:
+    return {'taken': _taken_cache.stats(), 'free': _free_cache.stats()}
 
 def create_user(username: str, email: str, password: str):
     """Создание нового пользователя"""
     try:
+        # Дубликат отсекаем до дорогого хеширования; кэш "свободно" тут не используем
+        if not is_username_available(username, use_free_cache=False):
+            raise ValueError("Логин уже занят")
+        if not is_email_available(email, use_free_cache=False):
+            raise ValueError("Email уже зарегистрирован")
+
         password_hash, salt = hash_password(password)
         
         with get_conn() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                "INSERT INTO users (username, email, password_hash, salt) VALUES (?, ?, ?, ?)",
-                (username, email, password_hash, salt)
-            )
+            cursor.execute(INSERT_USER_SQL, (username, email, password_hash, salt))
             conn.commit()
+        _mark_taken(username, email)
             
+    except ValueError as e:
+        raise Exception(str(e))
     except pyodbc.IntegrityError:
-        raise Exception("Пользователь с таким логином или email уже существует")
+        raise Exception(DUPLICATE_USER_ERROR)
     except Exception as e:
         raise Exception(f"Ошибка при создании пользователя: {str(e)}")
 
+def find_taken_logins(usernames: Iterable[str], emails: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+    """Какие из логинов и email уже заняты - (логины, email) в нижнем регистре.
+
+    Один запрос на каждые BULK_CHECK_CHUNK логинов вместо запроса на пользователя.
+    """
+    with get_conn() as conn:
+        return query_taken_logins(conn.cursor(), usernames, emails, BULK_CHECK_CHUNK)
+
+def create_users_bulk(rows: List[Tuple[str, str, str, str]]) -> List[Optional[str]]:
+    """Вставка уже захешированных пользователей (username, email, password_hash, salt) пачками.
+
+    Возвращает по строке на пользователя: None - создан, иначе текст ошибки.
+    """
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.fast_executemany = True
+        errors = insert_users_batched(conn, cursor, rows, BULK_INSERT_BATCH, pyodbc.IntegrityError)
+    for (username, email, _, _), error in zip(rows, errors):
+        if error is None:
+            _mark_taken(username, email)
+    return errors
+
+def _find_user_by(column: str, value: str) -> Optional[Dict[str, Any]]:
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {_USER_COLUMNS} FROM users WHERE {column} = ?", (value,))
+        row = cursor.fetchone()
+        if row:
+            return {
+                'id': row[0],
+                'username': row[1],
+                'email': row[2],
+                'password_hash': row[3],
+                'salt': row[4]
+            }
+        return None
+
 def find_user_by_login_or_email(login: str) -> Optional[Dict[str, Any]]:
     """Поиск пользователя по логину или email"""
+    # Вместо username = ? OR email = ? (часто даёт скан) - два запроса, каждый
+    # ищет по своему уникальному индексу; по виду строки угадываем, какой первым
+    columns = ('email', 'username') if '@' in login else ('username', 'email')
+    try:
+        for column in columns:
+            user = _find_user_by(column, login)
+            if user:
+                return user
+        return None
+            
+    except Exception as e:
+        print(f"❌ Ошибка поиска пользователя: {e}")
+        return None
+
+def issue_session_nonce(user_id: int) -> str:
+    """Метка сессий пользователя для токена "Запомнить меня" (создаётся при первом запросе)"""
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE users SET session_nonce = COALESCE(session_nonce, ?) OUTPUT INSERTED.session_nonce WHERE id = ?",
+            (secrets.token_hex(16), user_id)
+        )
+        nonce = cursor.fetchone()[0]
+        conn.commit()
+        return nonce
+
+def find_user_by_session(user_id: int, nonce: str) -> Optional[Dict[str, Any]]:
+    """Пользователь по сохранённой сессии - поиск по первичному ключу, без проверки пароля"""
     try:
         with get_conn() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                "SELECT id, username, email, password_hash, salt FROM users WHERE username = ? OR email = ?",
-                (login, login)
-            )
+            cursor.execute(SESSION_USER_SQL, (user_id, nonce))
             row = cursor.fetchone()
-            
             if row:
-                return {
-                    'id': row[0],
-                    'username': row[1],
-                    'email': row[2],
-                    'password_hash': row[3],
-                    'salt': row[4]
-                }
+                return {'id': row[0], 'username': row[1], 'email': row[2]}
             return None
-            
     except Exception as e:
-        print(f"❌ Ошибка поиска пользователя: {e}")
+        print(f"❌ Ошибка проверки сессии: {e}")
         return None
 
-def verify_password(password: str, stored_hash: str) -> bool:
-    """Проверка пароля"""
-    try:
-        # В реальном приложении здесь была бы проверка с солью
-        # Для демо-режима упрощаем
-        return True
-    except:
-        return False
\ No newline at end of file
+def revoke_sessions(user_id: int):
+    """Отзывает все сохранённые входы пользователя на всех терминалах"""
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute(REVOKE_SESSIONS_SQL, (user_id,))
+        conn.commit()
+
+def update_password(user_id: int, password: str):
+    """Смена пароля: новый хеш, сохранённые входы на всех терминалах отзываются"""
+    password_hash, salt = hash_password(password)
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute(UPDATE_PASSWORD_SQL, (password_hash, salt, user_id))
+        conn.commit()
+
+def rehash_password(user_id: int, password: str):
+    """Пересчитывает хеш того же пароля с текущими параметрами (после повышения стоимости)"""
+    password_hash, salt = hash_password(password)
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute(REHASH_PASSWORD_SQL, (password_hash, salt, user_id))
+        conn.commit()
\ No newline at end of file
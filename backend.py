@@ -0,0 +1,31 @@
+import os
+
+from db_common import PRICE_BANDS
+
+# Хранилище данных приложения:
+#   mssql  - SQL Server (car_db + auth_db), по умолчанию
+#   sqlite - локальный файл (sqlite_db), путь задаётся AUTO_DREAMS_SQLITE_PATH
+BACKEND = os.environ.get('AUTO_DREAMS_BACKEND', 'mssql').lower()
+
+if BACKEND == 'sqlite':
+    from sqlite_db import (
+        init_db, get_schema_version, set_schema_version, create_user, find_user_by_login_or_email, verify_password, update_password,
+        rehash_password, issue_session_nonce, find_user_by_session, revoke_sessions,
+        is_username_available, is_email_available, find_taken_logins, create_users_bulk,
+        init_car_db, get_all_cars, get_cars_page, get_client_orders, add_review,
+        get_client_reviews, create_order, get_or_create_client_for_user, get_session_client_id,
+        get_client_orders_page, get_client_reviews_page, get_catalog_facets,
+    )
+elif BACKEND == 'mssql':
+    from auth_db import (
+        init_db, get_schema_version, set_schema_version, create_user, find_user_by_login_or_email, verify_password, update_password,
+        rehash_password, issue_session_nonce, find_user_by_session, revoke_sessions,
+        is_username_available, is_email_available, find_taken_logins, create_users_bulk,
+    )
+    from car_db import (
+        init_car_db, get_all_cars, get_cars_page, get_client_orders, add_review,
+        get_client_reviews, create_order, get_or_create_client_for_user, get_session_client_id,
+        get_client_orders_page, get_client_reviews_page, get_catalog_facets,
+    )
+else:
+    raise ImportError(f"Неизвестное хранилище AUTO_DREAMS_BACKEND={BACKEND!r} (ожидается mssql или sqlite)")
@@ -0,0 +1,279 @@
+"""Бенчмарк функций доступа к данным.
+
+Прогоняет публичные функции хранилища на воспроизводимом наборе данных
+нескольких размеров и сохраняет p50/p95/p99, пропускную способность и
+выделения памяти в JSON, чтобы сравнивать прогоны между собой:
+
+    python bench.py --sizes 1000 10000 --output before.json
+    python bench.py --sizes 1000 10000 --output after.json --compare before.json
+
+Функции вызываются через backend, как в приложении. По умолчанию
+(--backend sqlite) данные генерируются в отдельном SQLite-файле, поэтому
+для запуска не нужен SQL Server. С --backend mssql те же функции car_db и
+auth_db прогоняются на настроенном SQL Server по уже имеющимся данным;
+меняющие данные функции (WRITE_CASES) там запускаются только через --only:
+
+    python bench.py --backend mssql --output mssql.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Set
+
+import sqlite_db
+
+BRANDS = {
+    'Toyota': ['Camry', 'Corolla', 'RAV4', 'Land Cruiser'],
+    'Honda': ['CR-V', 'Civic', 'Accord'],
+    'BMW': ['X5', 'X3', '3 Series', '5 Series'],
+    'Mercedes': ['E-Class', 'C-Class', 'GLE'],
+    'Audi': ['Q7', 'A4', 'A6'],
+    'Lexus': ['RX', 'NX', 'ES'],
+    'Hyundai': ['Tucson', 'Solaris', 'Santa Fe'],
+    'Kia': ['Sportage', 'Rio', 'Sorento'],
+}
+
+
+def populate(cars: int, seed: int = 42):
+    """Генерирует набор данных: машины, продавцы, клиенты с заказами и отзывами"""
+    rnd = random.Random(seed)
+    clients = max(10, cars // 20)
+    employees = max(3, cars // 500)
+    sold = cars // 5
+    models = [(brand, model) for brand, brand_models in BRANDS.items() for model in brand_models]
+
+    with sqlite_db.get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO EMPLOYEES (first_name, last_name) VALUES (?, ?)",
+            [(f"Продавец{i}", "Бенч") for i in range(employees)]
+        )
+        cursor.executemany(
+            "INSERT INTO CLIENTS (first_name, last_name, phone) VALUES (?, 'Бенч', '+7-000-000-00-00')",
+            [(f"client{i}",) for i in range(clients)]
+        )
+        cursor.executemany(
+            "INSERT INTO CARS (brand, model, vin, price, status) VALUES (?, ?, ?, ?, ?)",
+            [
+                (*rnd.choice(models), f"VIN{seed:04d}{i:09d}",
+                 rnd.randrange(900_000, 15_000_000, 10_000), 'продан' if i < sold else 'в наличии')
+                for i in range(cars)
+            ]
+        )
+        cursor.executemany(
+            "INSERT INTO ORDERS (client_id, car_id, employee_id, sale_date, final_price) "
+            "SELECT ?, id, ?, '2024-01-01', price FROM CARS WHERE id = ?",
+            [(rnd.randint(1, clients), rnd.randint(1, employees), car_id) for car_id in range(1, sold + 1)]
+        )
+        cursor.execute(
+            "INSERT INTO REVIEWS (client_id, order_id, rating, comment, review_date) "
+            "SELECT client_id, id, 1 + id % 5, 'Отзыв ' || id, sale_date FROM ORDERS WHERE id % 2 = 0"
+        )
+    return {'cars': cars, 'clients': clients, 'employees': employees, 'orders': sold}
+
+
+def measure(fn: Callable[[int], Any], repeat: int, warmup: int = 2) -> Dict[str, Any]:
+    """Задержки и выделения памяти для fn(i), i - номер вызова"""
+    for i in range(warmup):
+        fn(-1 - i)
+
+    latencies = []
+    started = time.perf_counter()
+    for i in range(repeat):
+        call_started = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    # Память меряем отдельным коротким прогоном - tracemalloc сильно замедляет вызовы
+    alloc_runs = min(repeat, 5)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(alloc_runs):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            fn(repeat + i)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+
+    ms = sorted(latency * 1000 for latency in latencies)
+    if len(ms) > 1:
+        percentiles = statistics.quantiles(ms, n=100, method='inclusive')
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+    else:
+        p50 = p95 = p99 = ms[0]
+    return {
+        'calls': repeat,
+        'mean_ms': statistics.fmean(ms),
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'max_ms': ms[-1],
+        'throughput_per_s': repeat / elapsed if elapsed else None,
+        'alloc_peak_kb': statistics.fmean(peaks) / 1024,
+    }
+
+
+def build_cases(store, clients: List[int], available: Iterator[int], usernames: List[str],
+                seed: int) -> Dict[str, Callable[[int], Any]]:
+    """Сценарии бенчмарка; store - модуль backend с функциями выбранного хранилища"""
+    rnd = random.Random(seed)
+
+    def create_order(i):
+        store.create_order(rnd.choice(clients), next(available))
+
+    return {
+        'catalog_all': lambda i: store.get_all_cars(),
+        'catalog_page': lambda i: store.get_cars_page(sort='price_asc'),
+        'order_history': lambda i: store.get_client_orders(rnd.choice(clients)),
+        'review_listing': lambda i: store.get_client_reviews(rnd.choice(clients)),
+        'order_creation': create_order,
+        'user_lookup': lambda i: store.find_user_by_login_or_email(rnd.choice(usernames)),
+        'registration': lambda i: store.create_user(f"new{seed}_{i}", f"new{seed}_{i}@bench.local", "password"),
+    }
+
+
+# Регистрация считает PBKDF2 - её гоняем меньше раз, чтобы прогон не растягивался
+SLOW_CASES = {'registration': 5}
+
+# Сценарии, которые пишут в БД: на SQL Server - только если явно указаны в --only
+WRITE_CASES = {'order_creation', 'registration'}
+
+
+def run_cases(label: str, cases: Dict[str, Callable[[int], Any]], repeat: int,
+              only: List[str] = None, skip: Set[str] = frozenset()) -> Dict[str, Any]:
+    results = {}
+    for name, fn in cases.items():
+        if (only and name not in only) or (not only and name in skip):
+            continue
+        stats = measure(fn, SLOW_CASES.get(name, repeat))
+        results[name] = stats
+        print(f"{label:>8} {name:<16} p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  "
+              f"p99 {stats['p99_ms']:8.2f} ms  {stats['throughput_per_s']:9.1f}/s  "
+              f"{stats['alloc_peak_kb']:9.1f} KiB")
+    return results
+
+
+def run_sqlite(store, sizes: List[int], repeat: int, seed: int, only: List[str] = None) -> Dict[str, Any]:
+    """Прогон на сгенерированных SQLite-файлах каждого размера"""
+    sizes_results = {}
+    original_path = sqlite_db.DB_PATH
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            sqlite_db.use_database(os.path.join(tmp, 'bench.db'))
+            store.init_db()
+            dataset = populate(size, seed)
+            usernames = [f"user{i}" for i in range(50)]
+            for username in usernames:
+                store.create_user(username, f"{username}@bench.local", "password")
+            cases = build_cases(store, list(range(1, dataset['clients'] + 1)),
+                                iter(range(dataset['orders'] + 1, dataset['cars'] + 1)), usernames, seed)
+            size_results = {'dataset': dataset, 'cases': run_cases(str(size), cases, repeat, only)}
+            size_results['pool'] = sqlite_db.pool_stats()
+            # Закрываем соединения до удаления временного файла
+            sqlite_db.pool.close_all()
+        sizes_results[str(size)] = size_results
+    sqlite_db.use_database(original_path)
+    return sizes_results
+
+
+def run_mssql(store, repeat: int, seed: int, only: List[str] = None) -> Dict[str, Any]:
+    """Прогон на настроенном SQL Server по имеющимся данным"""
+    from db_connection import get_conn, pool_stats
+
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM CLIENTS")
+        clients = [row[0] for row in cursor.fetchall()]
+        cursor.execute("SELECT TOP (50) username FROM users")
+        usernames = [row[0] for row in cursor.fetchall()]
+    available = iter([car['id'] for car in store.get_all_cars()])
+    if not clients or not usernames:
+        raise SystemExit("❌ В базе нет клиентов или пользователей - бенчмарк не на чем запускать")
+
+    skipped = sorted(WRITE_CASES - set(only or ()))
+    if skipped:
+        print(f"Пропущены сценарии, меняющие данные: {', '.join(skipped)} (включаются через --only)")
+    cases = build_cases(store, clients, available, usernames, seed)
+    dataset = {'clients': len(clients), 'users_sampled': len(usernames)}
+    label = 'mssql'
+    return {label: {'dataset': dataset, 'cases': run_cases(label, cases, repeat, only, WRITE_CASES),
+                    'pool': pool_stats()}}
+
+
+def run(backend_name: str, sizes: List[int], repeat: int, seed: int, only: List[str] = None) -> Dict[str, Any]:
+    # backend читает AUTO_DREAMS_BACKEND при импорте
+    os.environ['AUTO_DREAMS_BACKEND'] = backend_name
+    import backend as store
+
+    results = {
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'backend': backend_name,
+        'seed': seed,
+        'repeat': repeat,
+    }
+    if backend_name == 'mssql':
+        results['sizes'] = run_mssql(store, repeat, seed, only)
+    else:
+        results['sizes'] = run_sqlite(store, sizes, repeat, seed, only)
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]):
+    """Печатает изменение p50/p95 относительно сохранённого прогона"""
+    print("\nСравнение с базовым прогоном (отрицательное - быстрее):")
+    for size, size_results in current['sizes'].items():
+        base_cases = baseline.get('sizes', {}).get(size, {}).get('cases', {})
+        for name, stats in size_results['cases'].items():
+            base = base_cases.get(name)
+            if not base:
+                continue
+            deltas = []
+            for metric in ('p50_ms', 'p95_ms'):
+                delta = (stats[metric] - base[metric]) / base[metric] * 100 if base[metric] else 0.0
+                deltas.append(f"{metric[:3]} {delta:+6.1f}%")
+            print(f"{size:>8} {name:<16} " + "  ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк функций хранилища (backend)")
+    parser.add_argument('--backend', choices=['sqlite', 'mssql'], default='sqlite',
+                        help="sqlite - сгенерированные данные (по умолчанию), mssql - настроенный SQL Server")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+                        help="размеры каталога (число машин), только для --backend sqlite")
+    parser.add_argument('--repeat', type=int, default=30, help="вызовов на функцию")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', nargs='+', help="запустить только указанные функции")
+    parser.add_argument('--output', help="куда сохранить JSON (по умолчанию bench_results/<время>.json)")
+    parser.add_argument('--compare', help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    results = run(args.backend, args.sizes, args.repeat, args.seed, args.only)
+
+    output = args.output or os.path.join(
+        'bench_results', datetime.now().strftime('bench-%Y%m%d-%H%M%S.json'))
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ Результаты сохранены: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Массовый импорт пользователей из CSV или JSONL.
+
+    python bulk_import.py branch_clients.csv
+    python bulk_import.py branch_clients.jsonl --report import_report.csv
+
+Во входном файле - поля username, email, password (у CSV - строка заголовка,
+у JSONL - объект на строку). Для каждой строки в отчёт пишется результат:
+created, skipped (ошибка в данных или логин/email уже заняты) или error.
+
+Дубликаты проверяются одним запросом на пачку логинов до хеширования,
+пароли хешируются параллельно в пуле процессов, вставка - пачками.
+"""
+import argparse
+import csv
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from backend import find_taken_logins, create_users_bulk
+from hashing import service as hashing_service
+
+FIELDS = ('username', 'email', 'password')
+REPORT_FIELDS = ('line', 'username', 'email', 'status', 'message')
+
+
+def read_rows(path: str) -> List[Dict[str, Any]]:
+    """Строки входного файла с номером строки в поле 'line'"""
+    rows = []
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if path.lower().endswith(('.jsonl', '.ndjson')):
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    data = json.loads(line)
+                except ValueError as e:
+                    data = {'error': f"Некорректный JSON: {e}"}
+                if not isinstance(data, dict):
+                    data = {'error': "Ожидается JSON-объект"}
+                rows.append({'line': line_no, **data})
+        else:
+            # Строка 1 - заголовок
+            for line_no, data in enumerate(csv.DictReader(f), 2):
+                rows.append({'line': line_no, **data})
+    return rows
+
+
+def validate(row: Dict[str, Any]) -> Optional[str]:
+    """Те же правила, что и при регистрации в приложении"""
+    if row.get('error'):
+        return row['error']
+    username, email, password = (str(row.get(field) or '').strip() for field in FIELDS)
+    if not username or not email or not password:
+        return "Заполнены не все поля"
+    if len(username) < 3:
+        return "Логин должен быть не короче 3 символов"
+    if '@' not in email:
+        return "Некорректный email"
+    if len(password) < 6:
+        return "Пароль должен быть не короче 6 символов"
+    return None
+
+
+def import_users(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    results = []
+    candidates = []
+    seen_usernames, seen_emails = set(), set()
+
+    def result(row, status, message=''):
+        return {'line': row['line'], 'username': row.get('username', ''), 'email': row.get('email', ''),
+                'status': status, 'message': message}
+
+    for row in rows:
+        error = validate(row)
+        if error:
+            results.append(result(row, 'skipped', error))
+            continue
+        row['username'], row['email'] = str(row['username']).strip(), str(row['email']).strip()
+        row['password'] = str(row['password'])
+        username_key, email_key = row['username'].casefold(), row['email'].casefold()
+        if username_key in seen_usernames or email_key in seen_emails:
+            results.append(result(row, 'skipped', "Повтор логина или email в файле"))
+            continue
+        seen_usernames.add(username_key)
+        seen_emails.add(email_key)
+        candidates.append(row)
+
+    # Занятые логины отсекаем до хеширования - это самая дорогая часть
+    taken_usernames, taken_emails = find_taken_logins(
+        [row['username'] for row in candidates], [row['email'] for row in candidates])
+    fresh = []
+    for row in candidates:
+        if row['username'].casefold() in taken_usernames:
+            results.append(result(row, 'skipped', "Логин уже занят"))
+        elif row['email'].casefold() in taken_emails:
+            results.append(result(row, 'skipped', "Email уже зарегистрирован"))
+        else:
+            fresh.append(row)
+
+    futures = [hashing_service.hash_password_async(row['password']) for row in fresh]
+    hashed = []
+    for row, future in zip(fresh, futures):
+        try:
+            password_hash, salt = future.result()
+            hashed.append((row, (row['username'], row['email'], password_hash, salt)))
+        except Exception as e:
+            results.append(result(row, 'error', f"Ошибка хеширования: {e}"))
+
+    errors = create_users_bulk([values for _, values in hashed])
+    for (row, _), error in zip(hashed, errors):
+        results.append(result(row, 'error', error) if error else result(row, 'created'))
+
+    results.sort(key=lambda r: r['line'])
+    return results
+
+
+def write_report(results: List[Dict[str, Any]], path: str):
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Массовый импорт пользователей из CSV/JSONL")
+    parser.add_argument('input', help="CSV с заголовком username,email,password или JSONL")
+    parser.add_argument('--report', help="куда сохранить отчёт (по умолчанию <input>.report.csv)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    hashing_service.start()
+    try:
+        results = import_users(read_rows(args.input))
+    finally:
+        hashing_service.shutdown()
+
+    # clients.csv и clients.jsonl не должны писать отчёт в один и тот же файл
+    report = args.report or args.input + '.report.csv'
+    write_report(results, report)
+
+    counts = {status: sum(1 for r in results if r['status'] == status) for status in ('created', 'skipped', 'error')}
+    print(f"✅ Создано: {counts['created']}, пропущено: {counts['skipped']}, ошибок: {counts['error']} "
+          f"за {time.perf_counter() - started:.1f} с")
+    print(f"Отчёт: {report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+# Значение, которое fn в TTLCache.patch возвращает, чтобы удалить запись
+DROP = object()
+
+
+class TTLCache:
+    """Потокобезопасный кэш с временем жизни записей и счётчиками попаданий.
+
+    Записи старше ``ttl`` секунд считаются устаревшими; при переполнении
+    вытесняется запись, к которой дольше всего не обращались.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, время записи)
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'invalidations': 0,
+            'patches': 0,
+        }
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """(True, значение) при попадании, (False, None) при промахе"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, stored_at = entry
+                if time.monotonic() - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return True, value
+                del self._entries[key]
+                self._stats['expired'] += 1
+            self._stats['misses'] += 1
+            return False, None
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Удаляет одну запись или (без аргумента) весь кэш"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._stats['invalidations'] += 1
+
+    def patch(self, fn: Callable[[Hashable, Any], Any]):
+        """Точечно обновляет все записи: fn(key, value) возвращает новое значение или DROP для удаления.
+
+        Время жизни записей при этом не продлевается.
+        """
+        with self._lock:
+            for key, (value, stored_at) in list(self._entries.items()):
+                new_value = fn(key, value)
+                if new_value is DROP:
+                    del self._entries[key]
+                elif new_value is not value:
+                    self._entries[key] = (new_value, stored_at)
+            self._stats['patches'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
@@ -1,32 +1,169 @@
-import pyodbc
-from typing import List, Dict, Any
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
-SERVER = 'ILYAS'
-DATABASE = 'CarDealership'
-USERNAME = 'sa'
-PASSWORD = '11111'
+from cache import DROP, TTLCache
+from db_common import (
+    CARS_PAGE_SIZE, HISTORY_PAGE_SIZE, cars_page_sql, facets_from_rows, facets_without, orders_order_by, price_band_sql,
+    reviews_order_by, split_page,
+)
+from db_connection import get_conn
+from db_rows import Record, fetch_records
 
-def get_conn():
-    conn_str = f'DRIVER={{SQL Server}};SERVER={SERVER};DATABASE={DATABASE};UID={USERNAME};PWD={PASSWORD}'
-    return pyodbc.connect(conn_str)
+# Кэш каталога: сколько секунд результат запроса к CARS считается свежим
+CATALOG_CACHE_TTL = 60
 
-def get_all_cars() -> List[Dict[str, Any]]:
+_catalog_cache = TTLCache(CATALOG_CACHE_TTL)
+
+def catalog_cache_stats() -> Dict[str, Any]:
+    """Попадания/промахи кэша каталога - для подбора CATALOG_CACHE_TTL"""
+    return _catalog_cache.stats()
+
+def invalidate_catalog_cache():
+    """Сбрасывает кэш каталога целиком (например, после правки CARS вручную)"""
+    _catalog_cache.invalidate()
+
+def _forget_sold_car(car_id: int, car: Optional[Tuple[str, str, Any]] = None):
+    """Убирает проданную машину из закэшированных выборок вместо полной перезагрузки.
+
+    car - (марка, модель, цена) проданной машины, чтобы уменьшить счётчики
+    фасетов; без неё закэшированные фасеты сбрасываются.
+    """
+    def patch(key, value):
+        kind, filters = key[0], dict(key[1])
+        if kind == 'facets':
+            return DROP if car is None else facets_without(value, *car)
+        if filters.get('status', 'в наличии') != 'в наличии':
+            return DROP
+        if kind == 'all':
+            return [car for car in value if car['id'] != car_id]
+        cars, next_key = value
+        return [car for car in cars if car['id'] != car_id], next_key
+    _catalog_cache.patch(patch)
+
+def get_all_cars() -> List[Record]:
+    key = ('all', ())
+    hit, cars = _catalog_cache.lookup(key)
+    if hit:
+        return list(cars)
     try:
         with get_conn() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM CARS WHERE status = 'в наличии'")
-            rows = cursor.fetchall()
-            
-            cars = []
-            for row in rows:
-                columns = [column[0] for column in cursor.description]
-                cars.append(dict(zip(columns, row)))
-            return cars
+            cars = fetch_records(cursor)
     except Exception as e:
         print(f"Ошибка при получении автомобилей: {e}")
         return []
+    _catalog_cache.put(key, cars)
+    return list(cars)
 
-def get_client_orders(client_id: int) -> List[Dict[str, Any]]:
+def init_car_db() -> bool:
+    """Индексы для постраничной выборки каталога и истории клиента, связь клиентов с пользователями"""
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                IF COL_LENGTH('CLIENTS', 'user_id') IS NULL
+                ALTER TABLE CLIENTS ADD user_id INT NULL
+            """)
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'UX_CLIENTS_user_id')
+                CREATE UNIQUE INDEX UX_CLIENTS_user_id ON CLIENTS (user_id) WHERE user_id IS NOT NULL
+            """)
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_CARS_status_price_id')
+                CREATE INDEX IX_CARS_status_price_id ON CARS (status, price, id)
+            """)
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_CARS_status_brand_id')
+                CREATE INDEX IX_CARS_status_brand_id ON CARS (status, brand, model, id)
+            """)
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_CARS_status_brand_model_price')
+                CREATE INDEX IX_CARS_status_brand_model_price ON CARS (status, brand, model) INCLUDE (price)
+            """)
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_ORDERS_client_id_sale_date')
+                CREATE INDEX IX_ORDERS_client_id_sale_date ON ORDERS (client_id, sale_date, id)
+            """)
+            cursor.execute("""
+                IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_REVIEWS_client_id_review_date')
+                CREATE INDEX IX_REVIEWS_client_id_review_date ON REVIEWS (client_id, review_date, id)
+            """)
+            conn.commit()
+            return True
+    except Exception as e:
+        print(f"Ошибка при создании индексов каталога: {e}")
+        return False
+
+def get_cars_page(filters: Optional[Dict[str, Any]] = None, sort: str = 'id',
+                  after_key: Optional[Tuple[Any, int]] = None,
+                  limit: int = CARS_PAGE_SIZE) -> Tuple[List[Record], Optional[Tuple[Any, int]]]:
+    """Страница каталога с keyset-пагинацией.
+
+    filters: brand, model, min_price, max_price, status (по умолчанию 'в наличии').
+    after_key: ключ последней показанной машины - значение колонки сортировки и id.
+    Возвращает (машины, ключ для следующей страницы или None, если страниц больше нет).
+    Ошибки БД пробрасываются вызывающему.
+    """
+    filters = filters or {}
+    key = ('page', tuple(sorted(filters.items())), sort, after_key, limit)
+    hit, page = _catalog_cache.lookup(key)
+    if hit:
+        return list(page[0]), page[1]
+
+    column, where, order_by, params = cars_page_sql(filters, sort, after_key)
+    # Берём на одну строку больше, чтобы узнать, есть ли следующая страница
+    query = f"SELECT TOP ({int(limit) + 1}) * FROM CARS WHERE {where} ORDER BY {order_by}"
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            cars = fetch_records(cursor)
+    except Exception as e:
+        print(f"Ошибка при получении страницы каталога: {e}")
+        # Пустой результат неотличим от пустого каталога - ошибку получает страница (on_load_error)
+        raise
+
+    cars, next_key = split_page(cars, column, limit)
+    _catalog_cache.put(key, (cars, next_key))
+    return list(cars), next_key
+
+# Все счётчики фасетов одним проходом по покрывающему индексу:
+# GROUPING_ID(brand, model, price_band) = 1 - (марка, модель), 3 - марка,
+# 6 - ценовой диапазон, 7 - всего машин в наличии
+_FACETS_SQL = f"""
+    SELECT brand, model, price_band, COUNT(*) AS cars, GROUPING_ID(brand, model, price_band) AS facet
+    FROM (
+        SELECT brand, model, {price_band_sql()} AS price_band
+        FROM CARS WHERE status = 'в наличии'
+    ) AS available
+    GROUP BY GROUPING SETS ((brand, model), (brand), (price_band), ())
+"""
+
+def get_catalog_facets() -> Dict[str, Any]:
+    """Счётчики машин в наличии для навигации по каталогу.
+
+    Возвращает {'total': n, 'brands': {марка: n}, 'models': {(марка, модель): n},
+    'price_bands': {номер диапазона PRICE_BANDS: n}}. Результат кэшируется
+    вместе с каталогом и уменьшается при продаже (create_order).
+    """
+    key = ('facets', ())
+    hit, facets = _catalog_cache.lookup(key)
+    if hit:
+        return facets
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_FACETS_SQL)
+            facets = facets_from_rows(fetch_records(cursor))
+    except Exception as e:
+        print(f"Ошибка при подсчёте фасетов каталога: {e}")
+        raise
+    _catalog_cache.put(key, facets)
+    return facets
+
+def get_client_orders(client_id: int) -> List[Record]:
     try:
         with get_conn() as conn:
             cursor = conn.cursor()
@@ -38,16 +175,37 @@ def get_client_orders(client_id: int) -> List[Dict[str, Any]]:
                 WHERE o.client_id = ?
             """, (client_id,))
             
-            rows = cursor.fetchall()
-            orders = []
-            for row in rows:
-                columns = [column[0] for column in cursor.description]
-                orders.append(dict(zip(columns, row)))
-            return orders
+            return fetch_records(cursor)
     except Exception as e:
         print(f"Ошибка при получении заказов: {e}")
         return []
 
+def get_client_orders_page(client_id: int, sort: str = 'sale_date', descending: bool = True,
+                           offset: int = 0, limit: int = HISTORY_PAGE_SIZE) -> Tuple[List[Record], bool]:
+    """Страница заказов клиента, отсортированная на сервере.
+
+    Возвращает (заказы, есть ли следующая страница).
+    """
+    order_by = orders_order_by(sort, descending)
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            # Берём на одну строку больше, чтобы узнать, есть ли следующая страница
+            cursor.execute(f"""
+                SELECT o.*, c.brand, c.model, c.vin, emp.first_name + ' ' + emp.last_name as employee_name
+                FROM ORDERS o
+                JOIN CARS c ON o.car_id = c.id
+                JOIN EMPLOYEES emp ON o.employee_id = emp.id
+                WHERE o.client_id = ?
+                ORDER BY {order_by}
+                OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+            """, (client_id, int(offset), int(limit) + 1))
+            orders = fetch_records(cursor)
+    except Exception as e:
+        print(f"Ошибка при получении заказов: {e}")
+        raise
+    return orders[:limit], len(orders) > limit
+
 def add_review(client_id: int, order_id: int, rating: int, comment: str):
     try:
         with get_conn() as conn:
@@ -61,7 +219,7 @@ def add_review(client_id: int, order_id: int, rating: int, comment: str):
         print(f"Ошибка при добавлении отзыва: {e}")
         raise
 
-def get_client_reviews(client_id: int) -> List[Dict[str, Any]]:
+def get_client_reviews(client_id: int) -> List[Record]:
     try:
         with get_conn() as conn:
             cursor = conn.cursor()
@@ -74,59 +232,138 @@ def get_client_reviews(client_id: int) -> List[Dict[str, Any]]:
                 ORDER BY r.review_date DESC
             """, (client_id,))
             
-            rows = cursor.fetchall()
-            reviews = []
-            for row in rows:
-                columns = [column[0] for column in cursor.description]
-                reviews.append(dict(zip(columns, row)))
-            return reviews
+            return fetch_records(cursor)
     except Exception as e:
         print(f"Ошибка при получении отзывов: {e}")
         return []
 
-def create_order(client_id: int, car_id: int):
+def get_client_reviews_page(client_id: int, sort: str = 'review_date', descending: bool = True,
+                            offset: int = 0, limit: int = HISTORY_PAGE_SIZE) -> Tuple[List[Record], bool]:
+    """Страница отзывов клиента, отсортированная на сервере (см. get_client_orders_page)"""
+    order_by = reviews_order_by(sort, descending)
     try:
         with get_conn() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT TOP 1 id FROM EMPLOYEES ORDER BY NEWID()")
-            employee = cursor.fetchone()
-            employee_id = employee[0] if employee else 1
-            
-            cursor.execute("SELECT price FROM CARS WHERE id = ?", (car_id,))
-            car = cursor.fetchone()
-            price = car[0] if car else 0
-            
-            cursor.execute(
-                "INSERT INTO ORDERS (client_id, car_id, employee_id, sale_date, final_price) VALUES (?, ?, ?, GETDATE(), ?)",
-                (client_id, car_id, employee_id, price)
-            )
-            
-            cursor.execute("UPDATE CARS SET status = 'продан' WHERE id = ?", (car_id,))
-            
+            cursor.execute(f"""
+                SELECT r.*, c.brand, c.model
+                FROM REVIEWS r
+                JOIN ORDERS o ON r.order_id = o.id
+                JOIN CARS c ON o.car_id = c.id
+                WHERE r.client_id = ?
+                ORDER BY {order_by}
+                OFFSET ? ROWS FETCH NEXT ? ROWS ONLY
+            """, (client_id, int(offset), int(limit) + 1))
+            reviews = fetch_records(cursor)
+    except Exception as e:
+        print(f"Ошибка при получении отзывов: {e}")
+        raise
+    return reviews[:limit], len(reviews) > limit
+
+class EmployeeRoster:
+    """Закэшированный список продавцов; заказы распределяются по кругу.
+
+    Раньше продавец выбирался через ORDER BY NEWID(), что сортировало всю
+    таблицу EMPLOYEES на каждой покупке.
+    """
+
+    def __init__(self, ttl: float = 600):
+        self.ttl = ttl
+        self._ids: List[int] = []
+        self._loaded_at = None
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def next_employee_id(self) -> int:
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+                self._reload()
+            if not self._ids:
+                return 1
+            employee_id = self._ids[self._next % len(self._ids)]
+            self._next += 1
+            return employee_id
+
+    def _reload(self):
+        try:
+            with get_conn() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id FROM EMPLOYEES ORDER BY id")
+                self._ids = [row[0] for row in cursor.fetchall()]
+            self._loaded_at = time.monotonic()
+        except Exception as e:
+            # Оставляем прежний список, попробуем обновить его при следующей покупке
+            print(f"Ошибка при загрузке списка продавцов: {e}")
+
+employee_roster = EmployeeRoster()
+
+# Покупка одним пакетом: машина помечается проданной только если ещё в наличии,
+# заказ создаётся по её текущей цене, в ответ приходит id заказа (NULL - уже продана)
+_CREATE_ORDER_SQL = """
+    SET NOCOUNT ON;
+    UPDATE CARS SET status = 'продан' WHERE id = ? AND status = 'в наличии';
+    IF @@ROWCOUNT = 0
+    BEGIN
+        SELECT CAST(NULL AS INT);
+        RETURN;
+    END
+    INSERT INTO ORDERS (client_id, car_id, employee_id, sale_date, final_price)
+    SELECT ?, id, ?, GETDATE(), price FROM CARS WHERE id = ?;
+    SELECT CAST(SCOPE_IDENTITY() AS INT), brand, model, price FROM CARS WHERE id = ?;
+"""
+
+def create_order(client_id: int, car_id: int, employee_id: Optional[int] = None) -> int:
+    """Оформляет покупку за один запрос к серверу и возвращает id заказа"""
+    if employee_id is None:
+        employee_id = employee_roster.next_employee_id()
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_CREATE_ORDER_SQL, (car_id, client_id, employee_id, car_id, car_id))
+            row = cursor.fetchone()
+            order_id = row[0]
+            if order_id is None:
+                # Машину купили с другого терминала - в кэше она тоже больше не нужна
+                _forget_sold_car(car_id)
+                raise Exception("Автомобиль уже продан")
             conn.commit()
-            return True
+        _forget_sold_car(car_id, (row[1], row[2], row[3]))
+        return order_id
     except Exception as e:
         print(f"Ошибка при создании заказа: {e}")
         raise
 
-def get_or_create_client_for_user(user_id: int, username: str):
+# Атомарный upsert клиента по user_id. Клиент, заведённый раньше по одному имени
+# (до появления колонки user_id), привязывается к пользователю один раз
+_CLIENT_UPSERT_SQL = """
+    SET NOCOUNT ON;
+    IF NOT EXISTS (SELECT 1 FROM CLIENTS WITH (UPDLOCK, HOLDLOCK) WHERE user_id = ?)
+    BEGIN
+        UPDATE TOP (1) CLIENTS SET user_id = ? WHERE user_id IS NULL AND first_name = ?;
+        IF @@ROWCOUNT = 0
+            INSERT INTO CLIENTS (user_id, first_name, last_name, phone) VALUES (?, ?, 'User', '+7-000-000-00-00');
+    END
+    SELECT id FROM CLIENTS WHERE user_id = ?;
+"""
+
+def get_or_create_client_for_user(user_id: int, username: str) -> int:
     try:
         with get_conn() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id FROM CLIENTS WHERE first_name = ?", (username,))
-            client = cursor.fetchone()
-            
-            if client:
-                return client[0]
-            else:
-                cursor.execute(
-                    "INSERT INTO CLIENTS (first_name, last_name, phone) VALUES (?, ?, ?)",
-                    (username, "User", "+7-000-000-00-00")
-                )
-                cursor.execute("SELECT SCOPE_IDENTITY()")
-                new_client_id = cursor.fetchone()[0]
-                conn.commit()
-                return new_client_id
+            cursor.execute(_CLIENT_UPSERT_SQL, (user_id, user_id, username, user_id, username, user_id))
+            client_id = cursor.fetchone()[0]
+            conn.commit()
+            return client_id
     except Exception as e:
         print(f"Ошибка при получении/создании клиента: {e}")
-        return 1
\ No newline at end of file
+        raise
+
+def get_session_client_id(user: Dict[str, Any]) -> int:
+    """id клиента для сессии: определяется один раз и запоминается в user['client_id']"""
+    client_id = user.get('client_id')
+    if client_id is None:
+        client_id = user['client_id'] = get_or_create_client_for_user(user['id'], user['username'])
+    return client_id
@@ -0,0 +1,87 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+_TOKEN_SPLIT = re.compile(r"[\s\-_/.,]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Слова для поиска: без учёта регистра, разделители - пробелы, дефисы, '_', '/'"""
+    return [token for token in _TOKEN_SPLIT.split(text.casefold()) if token]
+
+
+class CatalogIndex:
+    """Индекс каталога в памяти для поиска при каждом нажатии клавиши.
+
+    Строится один раз по всей выборке машин (в фоновом потоке):
+      - отсортированный список слов марки, модели и VIN со списками позиций
+        машин - поиск по префиксу двоичным поиском, без перебора машин;
+      - цены, отсортированные по возрастанию, - диапазон цен через bisect.
+    Результат возвращается в исходном порядке машин.
+    """
+
+    def __init__(self, cars: Iterable[Any]):
+        self.cars = list(cars)
+        postings: Dict[str, List[int]] = {}
+        for position, car in enumerate(self.cars):
+            for token in set(tokenize(f"{car['brand']} {car['model']} {car['vin']}")):
+                postings.setdefault(token, []).append(position)
+        self.tokens = sorted(postings)
+        self.postings = [postings[token] for token in self.tokens]
+
+        self.price_of = [float(car['price']) for car in self.cars]
+        self.price_order = sorted(range(len(self.cars)), key=self.price_of.__getitem__)
+        self.prices = [self.price_of[position] for position in self.price_order]
+
+        self.positions = {car['id']: position for position, car in enumerate(self.cars)}
+        self.removed: Set[int] = set()
+
+    def __len__(self):
+        return len(self.cars) - len(self.removed)
+
+    def discard(self, car_id: int):
+        """Убирает проданную машину из результатов без перестройки индекса"""
+        position = self.positions.get(car_id)
+        if position is not None:
+            self.removed.add(position)
+
+    def _prefix_matches(self, prefix: str) -> Set[int]:
+        start = bisect_left(self.tokens, prefix)
+        end = bisect_left(self.tokens, prefix + '\U0010ffff', start)
+        matches: Set[int] = set()
+        for postings in self.postings[start:end]:
+            matches.update(postings)
+        return matches
+
+    def search(self, text: str = '', min_price: Optional[float] = None,
+               max_price: Optional[float] = None) -> List[Any]:
+        """Машины, у которых каждое слово запроса - начало слова марки, модели или VIN,
+        а цена в диапазоне [min_price, max_price]"""
+        matched: Optional[Set[int]] = None
+        # Длинные слова запроса дают меньше совпадений - пересекаем начиная с них
+        for token in sorted(set(tokenize(text)), key=len, reverse=True):
+            found = self._prefix_matches(token)
+            matched = found if matched is None else matched & found
+            if not matched:
+                return []
+
+        if min_price is not None or max_price is not None:
+            low = 0 if min_price is None else bisect_left(self.prices, min_price)
+            high = len(self.prices) if max_price is None else bisect_right(self.prices, max_price)
+            if matched is None:
+                matched = set(self.price_order[low:high])
+            elif high - low < len(matched):
+                matched.intersection_update(self.price_order[low:high])
+            else:
+                low_price = float('-inf') if min_price is None else min_price
+                high_price = float('inf') if max_price is None else max_price
+                price_of = self.price_of
+                matched = {position for position in matched if low_price <= price_of[position] <= high_price}
+
+        if matched is None:
+            positions: Iterable[int] = range(len(self.cars))
+        else:
+            positions = sorted(matched)
+        if self.removed:
+            return [self.cars[position] for position in positions if position not in self.removed]
+        return [self.cars[position] for position in positions]
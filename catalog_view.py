@@ -0,0 +1,323 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QAbstractListModel, QEvent, QModelIndex, QRect, QRectF, QSize, Qt, Signal
+from PySide6.QtGui import QColor, QFont, QLinearGradient, QPainter, QPen
+from PySide6.QtWidgets import QStyle, QStyledItemDelegate
+
+from thumbnails import thumbnail_service
+
+# Роли данных модели каталога
+CarRole = Qt.UserRole + 1
+PendingRole = Qt.UserRole + 2
+
+class CarListModel(QAbstractListModel):
+    """Машины каталога в том порядке, в каком их вернула БД.
+
+    Следующую страницу модель не грузит сама: когда вид долистали до конца,
+    fetchMore() вызывает fetch_more(next_key), а страница, получив данные
+    в фоновой задаче, передаёт их в append_page().
+    """
+
+    def __init__(self, fetch_more: Callable[[Any], None], is_fetching: Callable[[], bool], parent=None):
+        super().__init__(parent)
+        self.cars: List[Any] = []
+        self.next_key = None
+        self.pending = set()  # id машин, покупка которых сейчас оформляется
+        self._fetch_more = fetch_more
+        self._is_fetching = is_fetching
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.cars)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        car = self.cars[index.row()]
+        if role == CarRole:
+            return car
+        if role == PendingRole:
+            return car['id'] in self.pending
+        if role in (Qt.DisplayRole, Qt.AccessibleTextRole):
+            return f"{car['brand']} {car['model']}"
+        if role == Qt.ToolTipRole:
+            return f"{car['brand']} {car['model']} - {car['price']:,.0f} ₽"
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.next_key is not None and not self._is_fetching()
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._fetch_more(self.next_key)
+
+    def reset(self, cars: List[Any], next_key=None):
+        self.beginResetModel()
+        self.cars = list(cars)
+        self.next_key = next_key
+        self.pending.clear()
+        self.endResetModel()
+
+    def append_page(self, cars: List[Any], next_key):
+        self.next_key = next_key
+        if cars:
+            first = len(self.cars)
+            self.beginInsertRows(QModelIndex(), first, first + len(cars) - 1)
+            self.cars.extend(cars)
+            self.endInsertRows()
+
+    def sync(self, cars: List[Any], next_key=None):
+        """Приводит список к свежей выборке по id машин без сброса модели.
+
+        Пропавшие машины удаляются, новые вставляются на свои места,
+        у остальных обновляются изменившиеся поля - вид перерисовывает
+        только затронутые карточки и сохраняет позицию прокрутки.
+        """
+        self.next_key = next_key
+        fresh_ids = {car['id'] for car in cars}
+
+        # Удаляем снизу вверх, объединяя соседние строки в один диапазон
+        row = len(self.cars) - 1
+        while row >= 0:
+            if self.cars[row]['id'] in fresh_ids:
+                row -= 1
+                continue
+            last = row
+            while row > 0 and self.cars[row - 1]['id'] not in fresh_ids:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row, last)
+            for car in self.cars[row:last + 1]:
+                self.pending.discard(car['id'])
+            del self.cars[row:last + 1]
+            self.endRemoveRows()
+            row -= 1
+
+        for row, car in enumerate(cars):
+            if row < len(self.cars) and self.cars[row]['id'] == car['id']:
+                if self.cars[row] != car:
+                    self.cars[row] = car
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+                continue
+            current = self.row_of(car['id'])
+            if current > row:
+                # Машина сменила позицию (например, изменилась цена при сортировке по цене)
+                self.beginMoveRows(QModelIndex(), current, current, QModelIndex(), row)
+                self.cars.insert(row, self.cars.pop(current))
+                self.endMoveRows()
+                if self.cars[row] != car:
+                    self.cars[row] = car
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+            else:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.cars.insert(row, car)
+                self.endInsertRows()
+
+        # Хвост, не вошедший в свежую выборку, загрузится заново через fetchMore
+        if len(self.cars) > len(cars):
+            self.beginRemoveRows(QModelIndex(), len(cars), len(self.cars) - 1)
+            del self.cars[len(cars):]
+            self.endRemoveRows()
+
+    def stop_fetching(self):
+        self.next_key = None
+
+    def row_of(self, car_id: int) -> int:
+        for row, car in enumerate(self.cars):
+            if car['id'] == car_id:
+                return row
+        return -1
+
+    def set_pending(self, car_id: int, pending: bool):
+        if pending:
+            self.pending.add(car_id)
+        else:
+            self.pending.discard(car_id)
+        row = self.row_of(car_id)
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [PendingRole])
+
+    def remove_car(self, car_id: int):
+        self.pending.discard(car_id)
+        row = self.row_of(car_id)
+        if row >= 0:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.cars[row]
+            self.endRemoveRows()
+
+
+class CarCardDelegate(QStyledItemDelegate):
+    """Рисует карточку машины и обрабатывает нажатия на её кнопки.
+
+    Виджетов на каждую машину нет: вид вызывает paint() только для видимых
+    карточек, поэтому память и время отрисовки не зависят от размера каталога.
+    """
+
+    details_requested = Signal(object)
+    buy_requested = Signal(object)
+
+    CARD_SIZE = QSize(320, 420)
+    MARGIN = 8
+    PADDING = 12
+
+    def __init__(self, colors: Dict[str, str], view):
+        super().__init__(view)
+        self.colors = colors
+        self.view = view
+        # Миниатюры декодируются в фоне; пока их нет, рисуется заглушка
+        self.thumbnails = thumbnail_service()
+        self.thumbnails.thumbnail_ready.connect(lambda *_: self.view.viewport().update())
+        self.thumbnails.images_changed.connect(self.view.viewport().update)
+        self._hover: Tuple[int, Optional[str]] = (-1, None)
+        self.fonts = {
+            'placeholder': self._font(14, bold=True),
+            'title': self._font(16, bold=True),
+            'vin': self._font(10),
+            'price': self._font(18, bold=True),
+            'status': self._font(12, bold=True),
+            'button': self._font(12, bold=True),
+            'icon': self._font(14, bold=True),
+        }
+
+    @staticmethod
+    def _font(pixel_size: int, bold: bool = False) -> QFont:
+        font = QFont('Segoe UI')
+        font.setPixelSize(pixel_size)
+        font.setBold(bold)
+        return font
+
+    def sizeHint(self, option, index):
+        return self.CARD_SIZE + QSize(2 * self.MARGIN, 2 * self.MARGIN)
+
+    def layout(self, rect: QRect) -> Dict[str, QRect]:
+        """Прямоугольники частей карточки внутри ячейки вида"""
+        card = QRect(rect.left() + self.MARGIN, rect.top() + self.MARGIN,
+                     self.CARD_SIZE.width(), self.CARD_SIZE.height())
+        left = card.left() + self.PADDING
+        width = card.width() - 2 * self.PADDING
+        image = QRect(left, card.top() + self.PADDING, width, 160)
+        title = QRect(left, image.bottom() + 10, width, 48)
+        vin = QRect(left, title.bottom() + 2, width, 18)
+        price = QRect(left, vin.bottom() + 10, width, 44)
+        status = QRect(left, price.bottom() + 8, width, 20)
+        buttons_top = card.bottom() - self.PADDING - 35
+        details = QRect(left, buttons_top, 40, 35)
+        buy = QRect(details.right() + 9, buttons_top, width - 48, 35)
+        return {'card': card, 'image': image, 'title': title, 'vin': vin,
+                'price': price, 'status': status, 'details': details, 'buy': buy}
+
+    def _box(self, painter: QPainter, rect: QRect, background, border: str, radius: float):
+        painter.setPen(QPen(QColor(border), 1))
+        painter.setBrush(background)
+        painter.drawRoundedRect(QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), radius, radius)
+
+    def paint(self, painter, option, index):
+        car = index.data(CarRole)
+        if car is None:
+            return
+        colors = self.colors
+        rects = self.layout(option.rect)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        hover_part = self._hover[1] if hovered and self._hover[0] == index.row() else None
+        available = car['status'] == 'в наличии'
+        pending = bool(index.data(PendingRole))
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        self._box(painter, rects['card'], QColor('#1e2130' if hovered else colors['secondary_bg']),
+                  colors['accent_blue'] if hovered else colors['border'], 12)
+
+        # Изображение автомобиля
+        self._box(painter, rects['image'], QColor(colors['primary_bg']), colors['border'], 8)
+        pixmap = self.thumbnails.get(car['brand'], car['model'])
+        if pixmap is not None:
+            target = QRect(0, 0, pixmap.width(), pixmap.height())
+            target.moveCenter(rects['image'].center())
+            painter.drawPixmap(target, pixmap)
+        else:
+            painter.setPen(QColor(colors['accent_blue']))
+            painter.setFont(self.fonts['placeholder'])
+            painter.drawText(rects['image'], Qt.AlignCenter, f"🚗\n{car['brand']}\n{car['model']}")
+
+        painter.setPen(QColor(colors['text_primary']))
+        painter.setFont(self.fonts['title'])
+        painter.drawText(rects['title'], Qt.AlignCenter | Qt.TextWordWrap, f"{car['brand']} {car['model']}")
+
+        painter.setPen(QColor(colors['text_secondary']))
+        painter.setFont(self.fonts['vin'])
+        painter.drawText(rects['vin'], Qt.AlignCenter, f"VIN: {car['vin'][:8]}...")
+
+        self._box(painter, rects['price'], QColor(colors['primary_bg']), colors['border'], 6)
+        painter.setPen(QColor(colors['accent_blue']))
+        painter.setFont(self.fonts['price'])
+        painter.drawText(rects['price'], Qt.AlignCenter, f"{car['price']:,.0f} ₽")
+
+        painter.setPen(QColor(colors['success'] if available else colors['danger']))
+        painter.setFont(self.fonts['status'])
+        painter.drawText(rects['status'], Qt.AlignCenter, f"Статус: {car['status']}")
+
+        # Кнопка "Подробнее"
+        details_hover = hover_part == 'details'
+        self._box(painter, rects['details'],
+                  QColor(colors['accent_blue']) if details_hover else Qt.NoBrush, colors['accent_blue'], 6)
+        painter.setPen(QColor(colors['text_primary'] if details_hover else colors['accent_blue']))
+        painter.setFont(self.fonts['icon'])
+        painter.drawText(rects['details'], Qt.AlignCenter, "🔍")
+
+        # Кнопка покупки
+        buy = rects['buy']
+        if available and not pending:
+            gradient = QLinearGradient(buy.topLeft(), buy.topRight())
+            if hover_part == 'buy':
+                gradient.setColorAt(0, QColor('#2563eb'))
+                gradient.setColorAt(1, QColor('#7c3aed'))
+            else:
+                gradient.setColorAt(0, QColor(colors['accent_blue']))
+                gradient.setColorAt(1, QColor(colors['accent_purple']))
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(gradient)
+            painter.drawRoundedRect(QRectF(buy), 6, 6)
+            painter.setPen(QColor(colors['text_primary']))
+        else:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(colors['border']))
+            painter.drawRoundedRect(QRectF(buy), 6, 6)
+            painter.setPen(QColor(colors['text_secondary']))
+        painter.setFont(self.fonts['button'])
+        if pending:
+            buy_text = "ОФОРМЛЕНИЕ..."
+        else:
+            buy_text = "КУПИТЬ" if available else "ПРОДАНО"
+        painter.drawText(buy, Qt.AlignCenter, buy_text)
+
+        painter.restore()
+
+    def part_at(self, rect: QRect, pos) -> Optional[str]:
+        rects = self.layout(rect)
+        for part in ('details', 'buy'):
+            if rects[part].contains(pos):
+                return part
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        car = index.data(CarRole)
+        if car is None:
+            return False
+        if event.type() == QEvent.MouseMove:
+            hover = (index.row(), self.part_at(option.rect, event.position().toPoint()))
+            if hover != self._hover:
+                self._hover = hover
+                self.view.viewport().update(option.rect)
+            return False
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            part = self.part_at(option.rect, event.position().toPoint())
+            if part == 'details':
+                self.details_requested.emit(car)
+                return True
+            if part == 'buy':
+                if car['status'] == 'в наличии' and not index.data(PendingRole):
+                    self.buy_requested.emit(car)
+                return True
+        return False
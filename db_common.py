@@ -0,0 +1,214 @@
+"""Константы и построение SQL, общие для обоих хранилищ.
+
+car_db/auth_db (SQL Server) и sqlite_db импортируют отсюда белые списки
+сортировок, условия фильтров каталога, keyset-пагинацию и запросы к users.
+В модулях хранилищ остаётся только то, что зависит от диалекта: TOP или
+LIMIT, OUTPUT, GROUPING SETS, типы ошибок драйвера.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type
+
+# Сортировки каталога: имя -> (колонка, направление). Последний ключ всегда id,
+# чтобы постраничная выборка была однозначной при одинаковых значениях
+CAR_SORTS = {
+    'id': ('id', 'ASC'),
+    'price_asc': ('price', 'ASC'),
+    'price_desc': ('price', 'DESC'),
+    'brand': ('brand', 'ASC'),
+}
+
+CARS_PAGE_SIZE = 30
+
+# Ценовые диапазоны фасета каталога: [нижняя граница, верхняя граница), None - без границы
+PRICE_BANDS = [(0, 2_000_000), (2_000_000, 4_000_000), (4_000_000, 7_000_000), (7_000_000, None)]
+
+# Номера наборов группировки в результате запроса фасетов - значения
+# GROUPING_ID(brand, model, price_band) в SQL Server, SQLite выдаёт те же
+FACET_MODEL, FACET_BRAND, FACET_PRICE_BAND, FACET_TOTAL = 1, 3, 6, 7
+
+# Сортировки истории клиента (заказы, отзывы): ключ -> выражения ORDER BY.
+# В SQL попадают только выражения из этих словарей, ключ от интерфейса - нет.
+# Последним всегда идёт id, чтобы страницы OFFSET не пересекались при равных значениях
+ORDER_SORTS = {
+    'car': ('c.brand', 'c.model'),
+    'sale_date': ('o.sale_date',),
+    'final_price': ('o.final_price',),
+    'employee': ('employee_name',),
+}
+REVIEW_SORTS = {
+    'order_id': ('r.order_id',),
+    'rating': ('r.rating',),
+    'comment': ('r.comment',),
+    'review_date': ('r.review_date',),
+}
+
+HISTORY_PAGE_SIZE = 100
+
+INSERT_USER_SQL = "INSERT INTO users (username, email, password_hash, salt) VALUES (?, ?, ?, ?)"
+SESSION_USER_SQL = "SELECT id, username, email FROM users WHERE id = ? AND session_nonce = ?"
+REVOKE_SESSIONS_SQL = "UPDATE users SET session_nonce = NULL WHERE id = ?"
+# Смена пароля отзывает сохранённые входы на всех терминалах
+UPDATE_PASSWORD_SQL = "UPDATE users SET password_hash = ?, salt = ?, session_nonce = NULL WHERE id = ?"
+# Пересчёт хеша того же пароля с новой стоимостью - сохранённые входы остаются
+REHASH_PASSWORD_SQL = "UPDATE users SET password_hash = ?, salt = ? WHERE id = ?"
+
+DUPLICATE_USER_ERROR = "Пользователь с таким логином или email уже существует"
+
+
+def car_filters_sql(filters: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    """Условия WHERE для фильтров каталога: brand, model, min_price, max_price, status"""
+    conditions = ["status = ?"]
+    params = [filters.get('status', 'в наличии')]
+    if filters.get('brand'):
+        conditions.append("brand = ?")
+        params.append(filters['brand'])
+    if filters.get('model'):
+        conditions.append("model = ?")
+        params.append(filters['model'])
+    if filters.get('min_price') is not None:
+        conditions.append("price >= ?")
+        params.append(filters['min_price'])
+    if filters.get('max_price') is not None:
+        conditions.append("price < ?")
+        params.append(filters['max_price'])
+    return conditions, params
+
+
+def cars_page_sql(filters: Dict[str, Any], sort: str,
+                  after_key: Optional[Tuple[Any, int]]) -> Tuple[str, str, str, List[Any]]:
+    """Части запроса страницы каталога: (колонка сортировки, WHERE, ORDER BY, параметры).
+
+    Ограничение числа строк (TOP / LIMIT) добавляет хранилище.
+    """
+    column, direction = CAR_SORTS[sort]
+    conditions, params = car_filters_sql(filters)
+
+    if after_key is not None:
+        op = '>' if direction == 'ASC' else '<'
+        if column == 'id':
+            conditions.append(f"id {op} ?")
+            params.append(after_key[1])
+        else:
+            conditions.append(f"({column} {op} ? OR ({column} = ? AND id {op} ?))")
+            params.extend([after_key[0], after_key[0], after_key[1]])
+
+    return column, ' AND '.join(conditions), f"{column} {direction}, id {direction}", params
+
+
+def split_page(cars: List[Any], column: str, limit: int) -> Tuple[List[Any], Optional[Tuple[Any, int]]]:
+    """Запрос берёт limit + 1 строк: лишняя строка означает, что есть следующая страница"""
+    if len(cars) <= limit:
+        return cars, None
+    cars = cars[:limit]
+    last = cars[-1]
+    return cars, (last[column], last['id'])
+
+
+def _history_order_by(sorts: Dict[str, Tuple[str, ...]], sort: str, descending: bool, id_column: str) -> str:
+    if sort not in sorts:
+        raise ValueError(f"Неизвестная сортировка: {sort!r}")
+    direction = 'DESC' if descending else 'ASC'
+    return ', '.join(f"{column} {direction}" for column in (*sorts[sort], id_column))
+
+
+def orders_order_by(sort: str, descending: bool) -> str:
+    """ORDER BY страницы заказов (ORDERS o, CARS c) по ключу из ORDER_SORTS"""
+    return _history_order_by(ORDER_SORTS, sort, descending, 'o.id')
+
+
+def reviews_order_by(sort: str, descending: bool) -> str:
+    """ORDER BY страницы отзывов (REVIEWS r) по ключу из REVIEW_SORTS"""
+    return _history_order_by(REVIEW_SORTS, sort, descending, 'r.id')
+
+
+def query_taken_logins(cursor, usernames: Iterable[str], emails: Iterable[str],
+                       chunk_size: int) -> Tuple[Set[str], Set[str]]:
+    """Какие из логинов и email уже заняты - (логины, email) в нижнем регистре.
+
+    Один запрос на каждые chunk_size логинов вместо запроса на пользователя.
+    """
+    usernames, emails = list(usernames), list(emails)
+    taken_usernames, taken_emails = set(), set()
+    for start in range(0, max(len(usernames), len(emails)), chunk_size):
+        conditions, params = [], []
+        for column, values in (('username', usernames), ('email', emails)):
+            chunk = values[start:start + chunk_size]
+            if chunk:
+                conditions.append(f"{column} IN ({', '.join('?' * len(chunk))})")
+                params.extend(chunk)
+        cursor.execute(f"SELECT username, email FROM users WHERE {' OR '.join(conditions)}", params)
+        for username, email in cursor.fetchall():
+            taken_usernames.add(username.casefold())
+            taken_emails.add(email.casefold())
+    return taken_usernames, taken_emails
+
+
+def insert_users_batched(conn, cursor, rows: List[Tuple[str, str, str, str]], batch_size: int,
+                         integrity_error: Type[Exception]) -> List[Optional[str]]:
+    """Вставка (username, email, password_hash, salt) пачками по batch_size.
+
+    integrity_error - исключение драйвера о нарушении UNIQUE. Возвращает по
+    строке на пользователя: None - создан, иначе текст ошибки.
+    """
+    errors: List[Optional[str]] = [None] * len(rows)
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            cursor.executemany(INSERT_USER_SQL, batch)
+            conn.commit()
+        except integrity_error:
+            # Кто-то занял логин между проверкой и вставкой - эту пачку построчно
+            conn.rollback()
+            for offset, row in enumerate(batch):
+                try:
+                    cursor.execute(INSERT_USER_SQL, row)
+                    conn.commit()
+                except integrity_error:
+                    conn.rollback()
+                    errors[start + offset] = DUPLICATE_USER_ERROR
+    return errors
+
+
+def price_band_sql() -> str:
+    """Выражение SQL: номер диапазона PRICE_BANDS для колонки price"""
+    cases = ' '.join(f"WHEN price < {int(high)} THEN {band}"
+                     for band, (_, high) in enumerate(PRICE_BANDS) if high is not None)
+    return f"CASE {cases} ELSE {len(PRICE_BANDS) - 1} END"
+
+
+def price_band_of(price: Any) -> int:
+    for band, (_, high) in enumerate(PRICE_BANDS):
+        if high is None or price < high:
+            return band
+    return len(PRICE_BANDS) - 1
+
+
+def facets_from_rows(rows: List[Any]) -> Dict[str, Any]:
+    """Строки (brand, model, price_band, cars, facet) -> словарь фасетов"""
+    facets = {'total': 0, 'brands': {}, 'models': {}, 'price_bands': {}}
+    for row in rows:
+        if row['facet'] == FACET_MODEL:
+            facets['models'][(row['brand'], row['model'])] = row['cars']
+        elif row['facet'] == FACET_BRAND:
+            facets['brands'][row['brand']] = row['cars']
+        elif row['facet'] == FACET_PRICE_BAND:
+            facets['price_bands'][row['price_band']] = row['cars']
+        elif row['facet'] == FACET_TOTAL:
+            facets['total'] = row['cars']
+    return facets
+
+
+def facets_without(facets: Dict[str, Any], brand: str, model: str, price: Any) -> Dict[str, Any]:
+    """Копия фасетов без одной проданной машины"""
+    def decrement(counts, key):
+        counts = dict(counts)
+        if counts.get(key, 0) > 1:
+            counts[key] -= 1
+        else:
+            counts.pop(key, None)
+        return counts
+    return {
+        'total': max(facets['total'] - 1, 0),
+        'brands': decrement(facets['brands'], brand),
+        'models': decrement(facets['models'], (brand, model)),
+        'price_bands': decrement(facets['price_bands'], price_band_of(price)),
+    }
@@ -0,0 +1,163 @@
+import pyodbc
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from db_pool import ConnectionPool
+
+# Настройки подключения - ПРОВЕРЬТЕ ЭТИ ДАННЫЕ
+SERVER = 'ILYAS'  # Имя вашего сервера
+DATABASE = 'CarDealership'  # Имя базы данных
+USERNAME = 'sa'  # Имя пользователя
+PASSWORD = '11111'  # Пароль
+
+# Настройки пула соединений
+POOL_SIZE = 5  # Максимум одновременно открытых соединений
+POOL_IDLE_TIMEOUT = 300  # Через сколько секунд простоя соединение закрывается
+CONNECT_TIMEOUT = 10  # Таймаут одного подключения, секунд
+
+# Здесь запоминается, какая строка подключения сработала на этом компьютере
+CONN_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.db_connection.json')
+
+# Попробуем разные варианты строк подключения
+CONN_STRS = [
+    # Стандартное подключение
+    f'DRIVER={{SQL Server}};SERVER={SERVER};DATABASE={DATABASE};UID={USERNAME};PWD={PASSWORD}',
+    # Подключение с Trusted Connection
+    f'DRIVER={{SQL Server}};SERVER={SERVER};DATABASE={DATABASE};Trusted_Connection=yes;',
+    # Альтернативный драйвер
+    f'DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={SERVER};DATABASE={DATABASE};UID={USERNAME};PWD={PASSWORD}',
+    # Локальный сервер
+    f'DRIVER={{SQL Server}};SERVER=localhost;DATABASE={DATABASE};UID={USERNAME};PWD={PASSWORD}',
+    f'DRIVER={{SQL Server}};SERVER=.\\SQLEXPRESS;DATABASE={DATABASE};Trusted_Connection=yes;'
+]
+
+
+_resolved_conn_str: Optional[str] = None
+_resolve_lock = threading.Lock()
+
+
+def _fingerprint(conn_str: str) -> str:
+    return hashlib.sha256(conn_str.encode('utf-8')).hexdigest()
+
+
+def _load_cached_conn_str() -> Optional[str]:
+    """Строка подключения, сработавшая в прошлый раз (пароль в файл не пишется)"""
+    try:
+        with open(CONN_CACHE_FILE, encoding='utf-8') as f:
+            cached = json.load(f)
+        conn_str = CONN_STRS[cached['index']]
+        if _fingerprint(conn_str) == cached['fingerprint']:
+            return conn_str
+    except (OSError, ValueError, KeyError, IndexError, TypeError):
+        pass
+    return None
+
+
+def _save_cached_conn_str(conn_str: str):
+    try:
+        with open(CONN_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'index': CONN_STRS.index(conn_str), 'fingerprint': _fingerprint(conn_str)}, f)
+    except OSError as e:
+        print(f"❌ Не удалось сохранить настройки подключения: {e}")
+
+
+def forget_conn_str():
+    """Сбрасывает запомненную строку подключения - следующий connect() опросит все варианты"""
+    global _resolved_conn_str
+    _resolved_conn_str = None
+    try:
+        os.remove(CONN_CACHE_FILE)
+    except OSError:
+        pass
+
+
+def _close_late_probe(future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    conn = future.result()
+    if conn is not None and not getattr(future, 'winner', False):
+        conn.close()
+
+
+def _probe_candidates() -> Tuple[str, Any]:
+    """Пробует все строки подключения одновременно и возвращает первую по списку
+    из сработавших: вариант принимается, только когда все более приоритетные
+    отказали (SERVER=localhost не должен обгонять основной сервер)"""
+    winner_found = threading.Event()
+
+    def probe(conn_str):
+        conn = pyodbc.connect(conn_str, timeout=CONNECT_TIMEOUT)
+        if winner_found.is_set():
+            # Опоздавшее соединение никому не нужно
+            conn.close()
+            return None
+        return conn
+
+    executor = ThreadPoolExecutor(max_workers=len(CONN_STRS))
+    try:
+        futures = [executor.submit(probe, conn_str) for conn_str in CONN_STRS]
+        for conn_str, future in zip(CONN_STRS, futures):
+            try:
+                conn = future.result()
+            except pyodbc.Error as e:
+                print(f"❌ Ошибка: {conn_str[:50]}...: {e}")
+                continue
+            if conn is None:
+                continue
+            winner_found.set()
+            future.winner = True
+            print(f"✅ Подключение успешно: {conn_str[:50]}...")
+            return conn_str, conn
+    finally:
+        # Не ждём зависшие попытки - их соединения закроются по завершении
+        winner_found.set()
+        for future in futures:
+            future.add_done_callback(_close_late_probe)
+        executor.shutdown(wait=False)
+
+    raise Exception("Не удалось подключиться к базе данных")
+
+
+def connect():
+    """Открывает новое соединение по запомненной строке, при ошибке заново опрашивает варианты"""
+    global _resolved_conn_str
+    try:
+        conn_str = _resolved_conn_str or _load_cached_conn_str()
+        if conn_str:
+            try:
+                conn = pyodbc.connect(conn_str, timeout=CONNECT_TIMEOUT)
+                _resolved_conn_str = conn_str
+                return conn
+            except pyodbc.Error as e:
+                print(f"❌ Запомненное подключение не работает: {e}")
+                forget_conn_str()
+
+        with _resolve_lock:
+            # Пока мы ждали, другой поток мог уже найти рабочую строку
+            if _resolved_conn_str:
+                return pyodbc.connect(_resolved_conn_str, timeout=CONNECT_TIMEOUT)
+            conn_str, conn = _probe_candidates()
+            _resolved_conn_str = conn_str
+            _save_cached_conn_str(conn_str)
+            return conn
+
+    except Exception as e:
+        print(f"❌ Критическая ошибка подключения: {e}")
+        raise
+
+
+pool = ConnectionPool(connect, max_size=POOL_SIZE, idle_timeout=POOL_IDLE_TIMEOUT)
+
+
+def get_conn():
+    """Соединение из общего пула: ``with get_conn() as conn: ...``"""
+    return pool.connection()
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Статистика пула соединений (hits/misses/waits/wait_time)"""
+    return pool.stats()
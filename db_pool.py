@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict
+
+
+class PoolTimeout(Exception):
+    """Не удалось получить соединение из пула за отведённое время"""
+
+
+class ConnectionPool:
+    """Ограниченный пул соединений с БД.
+
+    Соединение выдаётся потоку на время блока ``with pool.connection() as conn``;
+    вложенные блоки в том же потоке получают то же самое соединение.
+    Перед выдачей давно простаивавшее соединение проверяется запросом ``ping_sql``,
+    а соединения, пролежавшие без дела дольше ``idle_timeout``, закрываются.
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_size: int = 5,
+                 idle_timeout: float = 300.0, checkout_timeout: float = 30.0,
+                 ping_after: float = 30.0, ping_sql: str = "SELECT 1"):
+        self._connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+        self.ping_sql = ping_sql
+
+        self._idle = deque()  # (conn, время возврата в пул); справа - самые "тёплые"
+        self._size = 0  # открытые соединения: свободные + выданные
+        self._generation = 0  # растёт при close_all: соединения прошлых поколений не возвращаются в пул
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'max_wait_time': 0.0,
+            'evicted': 0,
+            'discarded': 0,
+        }
+
+    def connection(self) -> "_PooledConnection":
+        """Контекстный менеджер, выдающий соединение текущему потоку"""
+        return _PooledConnection(self)
+
+    def stats(self) -> Dict[str, Any]:
+        """Счётчики пула: попадания, промахи, ожидания и текущий размер"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+        return stats
+
+    def close_all(self):
+        """Закрывает все свободные соединения; выданные закроются при возврате"""
+        with self._cond:
+            self._generation += 1
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close(conn)
+
+    def _checkout(self):
+        holder = getattr(self._local, 'holder', None)
+        if holder is not None:
+            holder[1] += 1
+            return holder[0]
+
+        conn, generation = self._acquire()
+        self._local.holder = [conn, 1, generation]
+        return conn
+
+    def _checkin(self, failed: bool):
+        holder = self._local.holder
+        holder[1] -= 1
+        if holder[1] > 0:
+            return
+        self._local.holder = None
+        conn, _, generation = holder
+
+        try:
+            if failed:
+                conn.rollback()
+            else:
+                conn.commit()
+        except Exception:
+            # Соединение в неизвестном состоянии - закрываем; несохранённые
+            # изменения не должны выглядеть успешными, поэтому ошибку пробрасываем
+            self._discard(conn)
+            if failed:
+                return  # Исходное исключение блока with пробросит __exit__
+            raise
+
+        with self._cond:
+            stale = generation != self._generation
+            if not stale:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+        if stale:
+            # Выдано до close_all (например, до use_database) - в пул не возвращаем
+            self._discard(conn)
+            return
+        self._evict_idle()
+
+    def _acquire(self):
+        deadline = None
+        wait_started = None
+        while True:
+            self._evict_idle()
+            with self._cond:
+                generation = self._generation
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    self._record_wait(wait_started)
+                    self._stats['hits'] += 1
+                elif self._size < self.max_size:
+                    self._size += 1
+                    self._record_wait(wait_started)
+                    self._stats['misses'] += 1
+                    conn = None
+                else:
+                    if wait_started is None:
+                        wait_started = time.monotonic()
+                        deadline = wait_started + self.checkout_timeout
+                        self._stats['waits'] += 1
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._record_wait(wait_started)
+                        raise PoolTimeout(
+                            f"Нет свободных соединений в пуле ({self.max_size}) "
+                            f"за {self.checkout_timeout:.0f} с")
+                    self._cond.wait(remaining)
+                    continue
+
+            if conn is None:
+                try:
+                    return self._connect(), generation
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            if time.monotonic() - returned_at < self.ping_after or self._ping(conn):
+                return conn, generation
+            self._discard(conn)
+
+    def _record_wait(self, wait_started):
+        if wait_started is None:
+            return
+        waited = time.monotonic() - wait_started
+        self._stats['wait_time'] += waited
+        self._stats['max_wait_time'] = max(self._stats['max_wait_time'], waited)
+
+    def _ping(self, conn) -> bool:
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.ping_sql)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle(self) -> int:
+        expired = []
+        now = time.monotonic()
+        with self._cond:
+            while self._idle and now - self._idle[0][1] > self.idle_timeout:
+                expired.append(self._idle.popleft()[0])
+            self._size -= len(expired)
+            self._stats['evicted'] += len(expired)
+            if expired:
+                self._cond.notify(len(expired))
+        for conn in expired:
+            self._close(conn)
+        return len(expired)
+
+    def _discard(self, conn):
+        with self._cond:
+            self._size -= 1
+            self._stats['discarded'] += 1
+            self._cond.notify()
+        self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class _PooledConnection:
+    """Аналог ``with pyodbc.connect(...) as conn``: commit при успехе, rollback при ошибке"""
+
+    def __init__(self, pool: ConnectionPool):
+        self._pool = pool
+
+    def __enter__(self):
+        return self._pool._checkout()
+
+    def __exit__(self, exc_type, exc, tb):
+        self._pool._checkin(failed=exc_type is not None)
+        return False
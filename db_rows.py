@@ -0,0 +1,110 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class Record:
+    """Компактная строка результата запроса.
+
+    Значения хранятся в кортеже, а имена колонок - один раз в классе,
+    общем для всего результата. Поддерживает доступ как у словаря
+    (``car['brand']``, ``get``, ``keys``, ``items``) и как у атрибута (``car.brand``).
+    """
+
+    __slots__ = ('_values',)
+    _fields: Tuple[str, ...] = ()
+    _index: Dict[str, int] = {}
+
+    def __init__(self, values: Sequence[Any]):
+        self._values = tuple(values)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._values[self._index[key]]
+        return self._values[key]
+
+    def __getattr__(self, name):
+        index = type(self)._index.get(name)
+        if index is None:
+            raise AttributeError(name)
+        return self._values[index]
+
+    def __contains__(self, key) -> bool:
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Record):
+            return self._fields == other._fields and self._values == other._values
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self._fields, self._values))
+
+    def __repr__(self) -> str:
+        return f"Record({self.to_dict()!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        index = self._index.get(key)
+        return default if index is None else self._values[index]
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._fields
+
+    def values(self) -> Tuple[Any, ...]:
+        return self._values
+
+    def items(self):
+        return zip(self._fields, self._values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._fields, self._values))
+
+    def _replace(self, **changes) -> "Record":
+        """Копия записи с изменёнными полями"""
+        values = list(self._values)
+        for key, value in changes.items():
+            values[self._index[key]] = value
+        return type(self)(values)
+
+
+_record_classes: Dict[Tuple[str, ...], type] = {}
+
+
+def record_class(fields: Tuple[str, ...]) -> type:
+    """Класс записи для набора колонок (создаётся один раз на набор)"""
+    cls = _record_classes.get(fields)
+    if cls is None:
+        index = {}
+        for i, name in enumerate(fields):
+            # При повторяющихся именах, как и dict(zip(...)), побеждает последняя колонка
+            index[name] = i
+        cls = type('Record', (Record,), {'__slots__': (), '_fields': fields, '_index': index})
+        _record_classes[fields] = cls
+    return cls
+
+
+def _cursor_record_class(cursor) -> type:
+    return record_class(tuple(column[0] for column in cursor.description))
+
+
+def fetch_records(cursor) -> List[Record]:
+    """Все строки текущего результата курсора в виде записей"""
+    rows = cursor.fetchall()
+    if not rows:
+        return []
+    make = _cursor_record_class(cursor)
+    return [make(row) for row in rows]
+
+
+def fetch_record(cursor) -> Optional[Record]:
+    """Одна строка результата курсора или None"""
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return _cursor_record_class(cursor)(row)
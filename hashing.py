@@ -0,0 +1,163 @@
+import atexit
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional, Tuple
+
+# Сколько должна занимать одна derivation на этой машине; число итераций
+# подбирается под это время при запуске и записывается рядом с каждым хешем
+HASH_TARGET_SECONDS = 0.25
+MIN_ITERATIONS = 100000  # Ниже исходной стоимости не опускаемся
+MAX_ITERATIONS = 2000000
+LEGACY_ITERATIONS = 100000  # Хеши без параметров создавались со 100 000 итераций
+# Калибровка при каждом запуске шумит на десятки процентов, поэтому хеш
+# пересчитывается, только если он в REHASH_FACTOR раз дешевле текущей стоимости
+REHASH_FACTOR = 2
+
+ALGORITHM = 'pbkdf2_sha256'
+
+
+def _derive(password: str, salt: str, iterations: int) -> str:
+    return hashlib.pbkdf2_hmac(
+        'sha256',
+        password.encode('utf-8'),
+        salt.encode('utf-8'),
+        iterations
+    ).hex()
+
+
+def _calibrate(target_seconds: float) -> int:
+    """Подбирает число итераций PBKDF2 под целевое время на текущем процессоре"""
+    probe = 20000
+    started = time.perf_counter()
+    _derive('calibration', 'calibration', probe)
+    elapsed = time.perf_counter() - started
+    iterations = int(probe * target_seconds / max(elapsed, 1e-6))
+    iterations = min(max(iterations, MIN_ITERATIONS), MAX_ITERATIONS)
+    return iterations // 1000 * 1000
+
+
+def _verify(password: str, stored_hash: str, salt: str) -> bool:
+    iterations, expected = parse_hash(stored_hash)
+    return hmac.compare_digest(_derive(password, salt, iterations), expected)
+
+
+def encode_hash(iterations: int, derived: str) -> str:
+    return f"{ALGORITHM}${iterations}${derived}"
+
+
+def parse_hash(stored_hash: str) -> Tuple[int, str]:
+    """(итерации, хеш) из сохранённой строки; старые хеши хранились без параметров"""
+    if stored_hash.startswith(ALGORITHM + '$'):
+        _, iterations, derived = stored_hash.split('$', 2)
+        return int(iterations), derived
+    return LEGACY_ITERATIONS, stored_hash
+
+
+class HashingService:
+    """Вычисляет хеши паролей в пуле процессов и возвращает Future.
+
+    Так PBKDF2 не держит GIL основного процесса, а несколько регистраций
+    подряд считаются параллельно на разных ядрах.
+    """
+
+    def __init__(self, target_seconds: float = HASH_TARGET_SECONDS, max_workers: Optional[int] = None):
+        self.target_seconds = target_seconds
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 1) - 1))
+        self._executor = None
+        self._calibration = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Поднимает пул и запускает калибровку (вызывается при старте приложения)"""
+        with self._lock:
+            if self._executor is None:
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                    self._calibration = self._executor.submit(_calibrate, self.target_seconds)
+                except (OSError, NotImplementedError) as e:
+                    # Без пула процессов (урезанное окружение) считаем в текущем процессе
+                    print(f"❌ Пул процессов для хеширования недоступен: {e}")
+                    self._executor = _InlineExecutor()
+                    self._calibration = self._executor.submit(_calibrate, self.target_seconds)
+        return self
+
+    @property
+    def iterations(self) -> int:
+        self.start()
+        return self._calibration.result()
+
+    def hash_password_async(self, password: str, salt: Optional[str] = None) -> Future:
+        """Future со значением (password_hash, salt)"""
+        self.start()
+        if salt is None:
+            salt = secrets.token_hex(16)
+        iterations = self.iterations
+        result = Future()
+        derivation = self._executor.submit(_derive, password, salt, iterations)
+
+        def done(future):
+            if future.exception() is not None:
+                result.set_exception(future.exception())
+            else:
+                result.set_result((encode_hash(iterations, future.result()), salt))
+
+        derivation.add_done_callback(done)
+        return result
+
+    def verify_password_async(self, password: str, stored_hash: str, salt: str) -> Future:
+        """Future со значением True/False"""
+        self.start()
+        return self._executor.submit(_verify, password, stored_hash, salt)
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """Хеш явно устарел: посчитан в REHASH_FACTOR раз дешевле текущей калибровки"""
+        iterations, _ = parse_hash(stored_hash)
+        return iterations * REHASH_FACTOR <= self.iterations
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+class _InlineExecutor:
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+service = HashingService()
+atexit.register(service.shutdown)
+
+
+def hash_password(password: str, salt: str = None) -> tuple:
+    """Хеширование пароля с солью"""
+    return service.hash_password_async(password, salt).result()
+
+
+def verify_password(password: str, stored_hash: str, salt: Optional[str] = None) -> bool:
+    """Проверка пароля"""
+    if not stored_hash or not salt:
+        return False
+    try:
+        return service.verify_password_async(password, stored_hash, salt).result()
+    except Exception as e:
+        print(f"❌ Ошибка проверки пароля: {e}")
+        return False
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    return service.needs_rehash(stored_hash)
@@ -0,0 +1,131 @@
+from typing import Any, Callable, List, Optional, Tuple
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtWidgets import QAbstractItemView, QHeaderView, QTableView
+
+# Колонка таблицы: (заголовок, ключ сортировки в БД или None, форматирование ячейки)
+Column = Tuple[str, Optional[str], Callable[[Any], str]]
+
+
+def _stars(rating: int) -> str:
+    return "★" * rating + "☆" * (5 - rating)
+
+
+ORDER_COLUMNS: List[Column] = [
+    ("Автомобиль", 'car', lambda order: f"{order['brand']} {order['model']}"),
+    ("Дата покупки", 'sale_date', lambda order: str(order['sale_date'])),
+    ("Цена", 'final_price', lambda order: f"{order['final_price']:,.0f} ₽"),
+    ("Продавец", 'employee', lambda order: order['employee_name']),
+    ("Статус", None, lambda order: "✅ Выполнен"),
+]
+
+REVIEW_COLUMNS: List[Column] = [
+    ("Заказ", 'order_id', lambda review: f"Заказ #{review['order_id']}"),
+    ("Оценка", 'rating', lambda review: _stars(review['rating'])),
+    ("Комментарий", 'comment', lambda review: review['comment'] or "Без комментария"),
+    ("Дата", 'review_date', lambda review: str(review['review_date'])),
+]
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """Заказы или отзывы клиента, подгружаемые страницами по мере прокрутки.
+
+    Как и CarListModel, модель сама в БД не ходит: fetchMore() вызывает
+    fetch_more(offset), а страница передаёт полученные строки в append_page().
+    Текст ячеек формируется в data() только для видимых строк. Сортировка по
+    заголовку выполняется в БД: sort() сообщает странице новый порядок через
+    on_sort(ключ, по убыванию), и та перезагружает данные.
+    """
+
+    def __init__(self, columns: List[Column], default_sort: str,
+                 fetch_more: Callable[[int], None], is_fetching: Callable[[], bool],
+                 on_sort: Callable[[str, bool], None], parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.rows: List[Any] = []
+        self.has_more = False
+        self.sort_key = default_sort
+        self.descending = True
+        self._fetch_more = fetch_more
+        self._is_fetching = is_fetching
+        self._on_sort = on_sort
+
+    def sort_column(self) -> int:
+        """Колонка текущей сортировки - для индикатора в заголовке"""
+        for column, (_, key, _) in enumerate(self.columns):
+            if key == self.sort_key:
+                return column
+        return -1
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.columns[section][0]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        return self.columns[index.column()][2](self.rows[index.row()])
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        key = self.columns[column][1]
+        descending = order == Qt.DescendingOrder
+        if key is None or (key, descending) == (self.sort_key, self.descending):
+            return
+        self.sort_key = key
+        self.descending = descending
+        self._on_sort(key, descending)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more and not self._is_fetching()
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._fetch_more(len(self.rows))
+
+    def reset(self, rows: List[Any], has_more: bool = False):
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.has_more = has_more
+        self.endResetModel()
+
+    def append_page(self, rows: List[Any], has_more: bool):
+        self.has_more = has_more
+        if rows:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self.rows.extend(rows)
+            self.endInsertRows()
+
+    def stop_fetching(self):
+        self.has_more = False
+
+
+def setup_history_table(view: QTableView, model: HistoryTableModel):
+    """Настраивает QTableView истории: сортировка кликом по заголовку - в БД"""
+    view.setModel(model)
+    view.verticalHeader().hide()
+    view.setWordWrap(False)
+    view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    header = view.horizontalHeader()
+    header.setSectionResizeMode(QHeaderView.Stretch)
+    # Индикатор ставим до включения сортировки: тогда QTableView не запросит
+    # лишнюю перезагрузку, а модель получит уже действующий порядок
+    current_order = lambda: Qt.DescendingOrder if model.descending else Qt.AscendingOrder
+    header.setSortIndicator(model.sort_column(), current_order())
+    view.setSortingEnabled(True)
+
+    def keep_indicator(column, order):
+        # По колонке без ключа сортировки (например, "Статус") порядок не меняется
+        if model.columns[column][1] is None:
+            header.blockSignals(True)
+            header.setSortIndicator(model.sort_column(), current_order())
+            header.blockSignals(False)
+    header.sortIndicatorChanged.connect(keep_indicator)
@@ -0,0 +1,128 @@
+import os
+from typing import Dict, Optional, Tuple
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QThreadPool, QTimer, Signal
+
+from workers import Worker
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')  # Если есть несколько файлов - берётся первый по списку
+REBUILD_DELAY_MS = 300  # Пачку изменений (копирование папки) обрабатываем одним пересканированием
+
+
+def normalize(name: str) -> str:
+    """Ключ индекса: без учёта регистра, пробелы и дефисы = подчёркивания"""
+    return name.casefold().replace(' ', '_').replace('-', '_')
+
+
+def image_key(brand: str, model: str) -> str:
+    return normalize(f"{brand}_{model}")
+
+
+def scan_images(directory: str) -> Dict[str, Tuple[str, float]]:
+    """Один проход по папке: ключ марка_модель -> (путь, mtime)"""
+    if not os.path.isdir(directory):
+        os.makedirs(directory, exist_ok=True)
+        print(f"Создана папка для изображений: {directory}")
+        return {}
+
+    found = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            ext = ext.lower()
+            if ext not in IMAGE_EXTENSIONS or not entry.is_file():
+                continue
+            key = normalize(stem)
+            rank = IMAGE_EXTENSIONS.index(ext)
+            if key in found and found[key][2] <= rank:
+                continue
+            found[key] = (entry.path, entry.stat().st_mtime, rank)
+    return {key: (path, mtime) for key, (path, mtime, _) in found.items()}
+
+
+class ImageIndex(QObject):
+    """Индекс папки с изображениями машин.
+
+    Папка сканируется один раз в фоне, дальше индекс обновляется по сигналам
+    QFileSystemWatcher (файл добавили, удалили или заменили). Поиск изображения
+    для карточки - обращение к словарю, без запросов к файловой системе.
+    """
+
+    changed = Signal()
+
+    def __init__(self, directory: str = IMAGES_DIR, parent: QObject = None):
+        super().__init__(parent)
+        self.directory = directory
+        self.ready = False
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._scanning = False
+        self._rescan = False
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_rebuild)
+        self.watcher.fileChanged.connect(self.schedule_rebuild)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(REBUILD_DELAY_MS)
+        self._timer.timeout.connect(self.rebuild)
+
+    def lookup(self, brand: str, model: str) -> Optional[Tuple[str, float]]:
+        """(путь, mtime) изображения или None, если его нет (или индекс ещё строится)"""
+        return self._entries.get(image_key(brand, model))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def schedule_rebuild(self, *args):
+        self._timer.start()
+
+    def rebuild(self):
+        if self._scanning:
+            self._rescan = True
+            return
+        self._scanning = True
+        worker = Worker(scan_images, self.directory)
+        worker.signals.result.connect(self._on_scanned)
+        worker.signals.error.connect(lambda e: print(f"Ошибка чтения папки изображений: {e}"))
+        worker.signals.finished.connect(self._on_scan_finished)
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_scanned(self, entries: Dict[str, Tuple[str, float]]):
+        first = not self.ready
+        self._entries = entries
+        self.ready = True
+        self._watch(entries)
+        if first:
+            print(f"Индекс изображений: {len(entries)} файлов")
+        self.changed.emit()
+
+    def _on_scan_finished(self):
+        self._scanning = False
+        if self._rescan:
+            self._rescan = False
+            self.rebuild()
+
+    def _watch(self, entries: Dict[str, Tuple[str, float]]):
+        watched = set(self.watcher.files()) | set(self.watcher.directories())
+        wanted = {path for path, _ in entries.values()}
+        if os.path.isdir(self.directory):
+            wanted.add(self.directory)
+        stale = watched - wanted
+        if stale:
+            self.watcher.removePaths(list(stale))
+        missing = wanted - watched
+        if missing:
+            self.watcher.addPaths(list(missing))
+
+
+_index: Optional[ImageIndex] = None
+
+
+def image_index() -> ImageIndex:
+    """Общий индекс изображений (строится при первом обращении, после QApplication)"""
+    global _index
+    if _index is None:
+        _index = ImageIndex()
+        _index.rebuild()
+    return _index
@@ -1,28 +1,35 @@
+from startup import timeline  # Первым: точка отсчёта для хронологии запуска
+
 import sys
-import os
-from PySide6.QtCore import Qt
+import time
+from PySide6.QtCore import Qt, QTimer, Signal
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
     QLineEdit, QPushButton, QLabel, QMessageBox, QStackedWidget, QFrame,
-    QTableWidget, QTableWidgetItem, QHeaderView, QTextEdit, QSpinBox,
-    QScrollArea, QGridLayout
+    QTableView, QTextEdit, QSpinBox, QCheckBox, QListView, QAbstractItemView,
+    QTreeWidget, QTreeWidgetItem
 )
-from PySide6.QtGui import QFont, QPixmap, QColor
-from auth_db import init_db, create_user, find_user_by_login_or_email, verify_password
-from car_db import get_all_cars, get_client_orders, add_review, get_client_reviews, create_order, get_or_create_client_for_user
-
-# Цветовая палитра нового дизайна
-COLORS = {
-    'primary_bg': '#0f1117',
-    'secondary_bg': '#1a1d29',
-    'accent_blue': '#3b82f6',
-    'accent_purple': '#8b5cf6',
-    'text_primary': '#f1f5f9',
-    'text_secondary': '#94a3b8',
-    'success': '#10b981',
-    'danger': '#ef4444',
-    'border': '#334155'
-}
+from PySide6.QtGui import QIntValidator
+from backend import create_user, find_user_by_login_or_email, verify_password, rehash_password
+from backend import issue_session_nonce, find_user_by_session, is_username_available, is_email_available
+from backend import PRICE_BANDS, get_catalog_facets, get_all_cars, get_cars_page, get_client_orders_page, add_review, get_client_reviews_page, create_order, get_session_client_id
+from workers import BackgroundTasks
+from hashing import service as hashing_service, needs_rehash
+from session_tokens import create_token, save_token, clear_token, saved_session
+from schema import ensure_schema
+from theme import COLORS, apply_theme, set_variant
+# catalog_view (миниатюры, индекс изображений) и history_view импортируются
+# при первом открытии соответствующих страниц - окно входа они не задерживают
+
+# Печатать разбивку запуска по этапам и завершиться (см. startup.py)
+PROFILE_STARTUP = '--profile-startup' in sys.argv
+
+# Пауза в наборе, после которой проверяем, свободны ли логин и email
+AVAILABILITY_DEBOUNCE_MS = 300
+
+# user_id демо-сессии: у настоящих пользователей id начинается с 1 (IDENTITY /
+# AUTOINCREMENT), поэтому демо получает собственного клиента и не видит чужих заказов
+DEMO_USER_ID = 0
 
 class Line(QWidget):
     def __init__(self):
@@ -30,7 +37,7 @@ class Line(QWidget):
         line = QFrame()
         line.setFrameShape(QFrame.HLine)
         line.setFrameShadow(QFrame.Sunken)
-        line.setStyleSheet(f"background-color: {COLORS['accent_blue']}; height: 2px;")
+        line.setObjectName("divider")
         lay = QVBoxLayout(self)
         lay.setContentsMargins(0, 8, 0, 8)
         lay.addWidget(line)
@@ -39,31 +46,20 @@ class RegisterPage(QWidget):
     def __init__(self, go_login):
         super().__init__()
         self.go_login = go_login
+        self.tasks = BackgroundTasks(self)
         self.setup_ui()
 
     def setup_ui(self):
-        self.setStyleSheet(f"background-color: {COLORS['primary_bg']};")
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(100, 50, 100, 50)
         
         title = QLabel("РЕГИСТРАЦИЯ")
         title.setAlignment(Qt.AlignCenter)
-        title.setStyleSheet(f"""
-            font-size: 28px;
-            font-weight: bold;
-            color: {COLORS['accent_blue']};
-            margin-bottom: 30px;
-            font-family: 'Segoe UI';
-        """)
+        title.setObjectName("formTitle")
         
         # Контейнер формы
         form_container = QWidget()
-        form_container.setStyleSheet(f"""
-            background-color: {COLORS['secondary_bg']};
-            border: 2px solid {COLORS['accent_blue']};
-            border-radius: 15px;
-            padding: 30px;
-        """)
+        form_container.setObjectName("formPanel")
         form_layout = QFormLayout(form_container)
         form_layout.setSpacing(20)
         
@@ -76,30 +72,6 @@ class RegisterPage(QWidget):
         self.pass2_edit = QLineEdit()
         self.pass2_edit.setPlaceholderText("Повторите пароль")
         
-        # Стиль для полей ввода
-        input_style = f"""
-            QLineEdit {{
-                background-color: {COLORS['secondary_bg']};
-                color: {COLORS['text_primary']};
-                padding: 12px;
-                border: 2px solid {COLORS['border']};
-                border-radius: 8px;
-                font-size: 14px;
-                margin: 5px 0;
-                font-family: 'Segoe UI';
-            }}
-            QLineEdit:focus {{
-                border-color: {COLORS['accent_blue']};
-                background-color: {COLORS['secondary_bg']};
-            }}
-            QLineEdit::placeholder {{
-                color: {COLORS['text_secondary']};
-            }}
-        """
-        
-        for edit in [self.username_edit, self.email_edit, self.pass1_edit, self.pass2_edit]:
-            edit.setStyleSheet(input_style)
-        
         self.pass1_edit.setEchoMode(QLineEdit.Password)
         self.pass2_edit.setEchoMode(QLineEdit.Password)
         
@@ -112,54 +84,27 @@ class RegisterPage(QWidget):
         for i in range(form_layout.rowCount()):
             label = form_layout.itemAt(i, QFormLayout.LabelRole).widget()
             if label:
-                label.setStyleSheet(f"color: {COLORS['accent_blue']}; font-size: 14px; font-family: 'Segoe UI'; font-weight: bold;")
-        
-        btn_create = QPushButton("СОЗДАТЬ АККАУНТ")
-        btn_create.setStyleSheet(f"""
-            QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                border: none;
-                padding: 12px 24px;
-                border-radius: 8px;
-                font-size: 16px;
-                font-weight: bold;
-                margin-top: 20px;
-                font-family: 'Segoe UI';
-            }}
-            QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #2563eb, stop:1 #7c3aed);
-            }}
-            QPushButton:pressed {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #1d4ed8, stop:1 #6d28d9);
-            }}
-            QPushButton:disabled {{
-                background-color: #555555;
-                color: #888888;
-            }}
-        """)
+                label.setObjectName("formLabel")
+        
+        # Подсказки о занятости логина/email под полями
+        self.username_hint = QLabel()
+        self.username_hint.setObjectName("hint")
+        self.email_hint = QLabel()
+        self.email_hint.setObjectName("hint")
+        form_layout.insertRow(1, self.username_hint)
+        form_layout.insertRow(3, self.email_hint)
+        
+        # Проверяем после паузы в наборе, а не на каждый символ
+        self.username_timer = self.make_debounce_timer(self.check_username)
+        self.email_timer = self.make_debounce_timer(self.check_email)
+        self.username_edit.textEdited.connect(lambda _: self.on_field_edited(self.username_hint, self.username_timer))
+        self.email_edit.textEdited.connect(lambda _: self.on_field_edited(self.email_hint, self.email_timer))
+        
+        self.btn_create = btn_create = QPushButton("СОЗДАТЬ АККАУНТ")
         btn_create.clicked.connect(self.handle_register)
         
         btn_back = QPushButton("◀ НАЗАД К ВХОДУ")
-        btn_back.setStyleSheet(f"""
-            QPushButton {{
-                background-color: transparent;
-                color: {COLORS['accent_blue']};
-                border: 2px solid {COLORS['accent_blue']};
-                padding: 10px 20px;
-                border-radius: 8px;
-                font-size: 14px;
-                margin-top: 15px;
-                font-family: 'Segoe UI';
-            }}
-            QPushButton:hover {{
-                background-color: {COLORS['accent_blue']};
-                color: {COLORS['text_primary']};
-            }}
-        """)
+        set_variant(btn_back, "outline")
         btn_back.clicked.connect(self.go_login)
         
         main_layout.addWidget(title)
@@ -168,6 +113,45 @@ class RegisterPage(QWidget):
         main_layout.addWidget(btn_back)
         main_layout.addStretch()
 
+    def make_debounce_timer(self, callback):
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(AVAILABILITY_DEBOUNCE_MS)
+        timer.timeout.connect(callback)
+        return timer
+
+    def on_field_edited(self, hint, timer):
+        hint.setText("")
+        timer.start()
+
+    def set_hint(self, hint, text, ok):
+        set_variant(hint, 'ok' if ok else 'error')
+        hint.setText(text)
+
+    def check_username(self):
+        username = self.username_edit.text().strip()
+        if len(username) < 3:
+            return
+        self.tasks.run('check_username', is_username_available, username,
+                       on_result=lambda free: self.show_availability(
+                           self.username_hint, self.username_edit, username, free,
+                           "✅ Логин свободен", "❌ Логин уже занят"))
+
+    def check_email(self):
+        email = self.email_edit.text().strip()
+        if '@' not in email:
+            return
+        self.tasks.run('check_email', is_email_available, email,
+                       on_result=lambda free: self.show_availability(
+                           self.email_hint, self.email_edit, email, free,
+                           "✅ Email свободен", "❌ Email уже зарегистрирован"))
+
+    def show_availability(self, hint, edit, value, free, free_text, taken_text):
+        # Пока шла проверка, поле могли изменить - такой ответ уже не актуален
+        if edit.text().strip() != value:
+            return
+        self.set_hint(hint, free_text if free else taken_text, free)
+
     def handle_register(self):
         u = self.username_edit.text().strip()
         e = self.email_edit.text().strip()
@@ -190,52 +174,52 @@ class RegisterPage(QWidget):
             QMessageBox.critical(self, "❌ ОШИБКА", "Пароли не совпадают.")
             return
 
-        try:
-            create_user(u, e, p1)
-            QMessageBox.information(self, "✅ УСПЕХ", "Аккаунт создан. Теперь войдите.")
-            self.go_login()
-            
-        except Exception as err:
-            error_msg = str(err)
-            if "username" in error_msg.lower():
-                QMessageBox.critical(self, "❌ ОШИБКА", "Логин уже занят.")
-            elif "email" in error_msg.lower():
-                QMessageBox.critical(self, "❌ ОШИБКА", "Email уже зарегистрирован.")
-            else:
-                QMessageBox.critical(self, "❌ ОШИБКА", f"Не удалось создать пользователя: {error_msg}")
+        self.btn_create.setEnabled(False)
+        self.btn_create.setText("СОЗДАНИЕ АККАУНТА...")
+        self.tasks.run('register', create_user, u, e, p1,
+                       on_result=self.on_registered,
+                       on_error=self.on_register_error,
+                       on_finished=self.reset_create_button,
+                       cancel_on_hide=False)
+
+    def reset_create_button(self):
+        self.btn_create.setEnabled(True)
+        self.btn_create.setText("СОЗДАТЬ АККАУНТ")
+
+    def on_registered(self, _):
+        QMessageBox.information(self, "✅ УСПЕХ", "Аккаунт создан. Теперь войдите.")
+        self.go_login()
+
+    def on_register_error(self, err):
+        error_msg = str(err)
+        if "username" in error_msg.lower() or "логин уже" in error_msg.lower():
+            QMessageBox.critical(self, "❌ ОШИБКА", "Логин уже занят.")
+        elif "email" in error_msg.lower():
+            QMessageBox.critical(self, "❌ ОШИБКА", "Email уже зарегистрирован.")
+        else:
+            QMessageBox.critical(self, "❌ ОШИБКА", f"Не удалось создать пользователя: {error_msg}")
 
 class LoginPage(QWidget):
     def __init__(self, on_login_success, go_register):
         super().__init__()
         self.on_login_success = on_login_success
         self.go_register = go_register
+        self.tasks = BackgroundTasks(self)
         self.setup_ui()
 
     def setup_ui(self):
         main_layout = QHBoxLayout(self)
-        self.setStyleSheet(f"background-color: {COLORS['primary_bg']};")
         
         # Левая панель - форма авторизации
         left_panel = QWidget()
-        left_panel.setStyleSheet(f"""
-            background-color: {COLORS['secondary_bg']};
-            border: 2px solid {COLORS['accent_blue']};
-            border-radius: 15px;
-            margin: 20px;
-        """)
+        left_panel.setObjectName("sidePanel")
         left_layout = QVBoxLayout(left_panel)
         left_layout.setContentsMargins(40, 40, 40, 40)
         
         # Заголовок
         title = QLabel("АВТОРИЗАЦИЯ")
         title.setAlignment(Qt.AlignCenter)
-        title.setStyleSheet(f"""
-            font-size: 28px;
-            font-weight: bold;
-            color: {COLORS['accent_blue']};
-            margin-bottom: 30px;
-            font-family: 'Segoe UI';
-        """)
+        title.setObjectName("formTitle")
         
         # Поля ввода
         form_layout = QFormLayout()
@@ -244,46 +228,10 @@ class LoginPage(QWidget):
         
         self.login_edit = QLineEdit()
         self.login_edit.setPlaceholderText("Введите логин или email")
-        self.login_edit.setStyleSheet(f"""
-            QLineEdit {{
-                background-color: {COLORS['secondary_bg']};
-                color: {COLORS['text_primary']};
-                padding: 12px;
-                border: 2px solid {COLORS['border']};
-                border-radius: 8px;
-                font-size: 14px;
-                font-family: 'Segoe UI';
-            }}
-            QLineEdit:focus {{
-                border-color: {COLORS['accent_blue']};
-                background-color: {COLORS['secondary_bg']};
-            }}
-            QLineEdit::placeholder {{
-                color: {COLORS['text_secondary']};
-            }}
-        """)
         
         self.pass_edit = QLineEdit()
         self.pass_edit.setPlaceholderText("Введите пароль")
         self.pass_edit.setEchoMode(QLineEdit.Password)
-        self.pass_edit.setStyleSheet(f"""
-            QLineEdit {{
-                background-color: {COLORS['secondary_bg']};
-                color: {COLORS['text_primary']};
-                padding: 12px;
-                border: 2px solid {COLORS['border']};
-                border-radius: 8px;
-                font-size: 14px;
-                font-family: 'Segoe UI';
-            }}
-            QLineEdit:focus {{
-                border-color: {COLORS['accent_blue']};
-                background-color: {COLORS['secondary_bg']};
-            }}
-            QLineEdit::placeholder {{
-                color: {COLORS['text_secondary']};
-            }}
-        """)
         
         form_layout.addRow("Логин/Email:", self.login_edit)
         form_layout.addRow("Пароль:", self.pass_edit)
@@ -292,67 +240,33 @@ class LoginPage(QWidget):
         for i in range(form_layout.rowCount()):
             label = form_layout.itemAt(i, QFormLayout.LabelRole).widget()
             if label:
-                label.setStyleSheet(f"color: {COLORS['accent_blue']}; font-size: 14px; font-family: 'Segoe UI'; font-weight: bold;")
+                label.setObjectName("formLabel")
+        
+        self.remember_check = QCheckBox("Запомнить меня на этом терминале")
+        
+        # Быстрый вход по сохранённой сессии (виден, только если она есть)
+        self.btn_resume = QPushButton()
+        set_variant(self.btn_resume, "resume")
+        self.btn_resume.clicked.connect(self.handle_resume)
         
         # Кнопка входа
-        btn_login = QPushButton("ВОЙТИ")
-        btn_login.setStyleSheet(f"""
-            QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                border: none;
-                padding: 12px;
-                border-radius: 8px;
-                font-size: 16px;
-                font-weight: bold;
-                font-family: 'Segoe UI';
-            }}
-            QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #2563eb, stop:1 #7c3aed);
-            }}
-            QPushButton:pressed {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #1d4ed8, stop:1 #6d28d9);
-            }}
-        """)
+        self.btn_login = btn_login = QPushButton("ВОЙТИ")
         btn_login.clicked.connect(self.handle_login)
         
         # Кнопка регистрации
         btn_register = QPushButton("СОЗДАТЬ АККАУНТ")
-        btn_register.setStyleSheet(f"""
-            QPushButton {{
-                background-color: transparent;
-                color: {COLORS['accent_blue']};
-                border: 2px solid {COLORS['accent_blue']};
-                padding: 12px;
-                border-radius: 8px;
-                font-size: 16px;
-                font-weight: bold;
-                margin-top: 15px;
-                font-family: 'Segoe UI';
-            }}
-            QPushButton:hover {{
-                background-color: {COLORS['accent_blue']};
-                color: {COLORS['text_primary']};
-            }}
-        """)
+        set_variant(btn_register, "outline")
         btn_register.clicked.connect(self.go_register)
         
         # Демо доступ
         demo_label = QLabel("Демо доступ: vortex / vortex")
-        demo_label.setStyleSheet(f"""
-            color: {COLORS['text_secondary']};
-            font-size: 12px;
-            margin-top: 20px;
-            text-align: center;
-            font-family: 'Segoe UI';
-        """)
+        demo_label.setObjectName("demoHint")
         
         # Собираем левую панель
         left_layout.addWidget(title)
+        left_layout.addWidget(self.btn_resume)
         left_layout.addLayout(form_layout)
+        left_layout.addWidget(self.remember_check)
         left_layout.addWidget(btn_login)
         left_layout.addWidget(btn_register)
         left_layout.addWidget(demo_label)
@@ -360,41 +274,21 @@ class LoginPage(QWidget):
         
         # Правая панель - логотип и слоган
         right_panel = QWidget()
-        right_panel.setStyleSheet(f"""
-            background-color: {COLORS['secondary_bg']};
-            border: 2px solid {COLORS['accent_blue']};
-            border-radius: 15px;
-            margin: 20px;
-        """)
+        right_panel.setObjectName("sidePanel")
         right_layout = QVBoxLayout(right_panel)
         right_layout.setAlignment(Qt.AlignCenter)
         
         # Логотип
         logo_label = QLabel("AUTO DREAMS")
-        logo_label.setStyleSheet(f"""
-            color: {COLORS['accent_blue']};
-            font-size: 36px;
-            font-weight: bold;
-            margin-bottom: 20px;
-            font-family: 'Segoe UI';
-        """)
+        logo_label.setObjectName("logo")
         
         # Слоган
         slogan_label = QLabel("ПРЕМИАЛЬНЫЕ АВТОМОБИЛИ")
-        slogan_label.setStyleSheet(f"""
-            color: {COLORS['accent_purple']};
-            font-size: 18px;
-            font-weight: bold;
-            font-family: 'Segoe UI';
-        """)
+        slogan_label.setObjectName("slogan")
         
         # Декор
         decor_label = QLabel("🚗 💨 ✨")
-        decor_label.setStyleSheet(f"""
-            color: {COLORS['accent_blue']};
-            font-size: 24px;
-            margin-top: 20px;
-        """)
+        decor_label.setObjectName("decor")
         
         right_layout.addWidget(logo_label)
         right_layout.addWidget(slogan_label)
@@ -404,6 +298,41 @@ class LoginPage(QWidget):
         # Распределение пространства
         main_layout.addWidget(left_panel, 1)
         main_layout.addWidget(right_panel, 1)
+        
+        self.refresh_saved_session()
+
+    def showEvent(self, event):
+        # После выхода из аккаунта могла появиться (или истечь) сохранённая сессия
+        self.refresh_saved_session()
+        super().showEvent(event)
+
+    def refresh_saved_session(self):
+        self.saved_session = saved_session()
+        if self.saved_session:
+            self.btn_resume.setText(f"▶ ПРОДОЛЖИТЬ КАК {self.saved_session['username'].upper()}")
+        self.btn_resume.setVisible(self.saved_session is not None)
+
+    def handle_resume(self):
+        if not self.saved_session:
+            return
+        self.btn_resume.setEnabled(False)
+        self.tasks.run('login', self.check_session, self.saved_session,
+                       on_result=self.on_credentials_checked,
+                       on_error=lambda e: QMessageBox.critical(self, "Ошибка входа", f"Не удалось войти: {e}"),
+                       on_finished=lambda: self.btn_resume.setEnabled(True))
+
+    @staticmethod
+    def check_session(claims):
+        """Вход по сохранённой сессии: подпись уже проверена, в БД - только проверка отзыва"""
+        user = find_user_by_session(claims['uid'], claims['nonce'])
+        if not user:
+            clear_token()
+            return None, "Сохранённый вход отозван или устарел. Войдите с паролем."
+        try:
+            get_session_client_id(user)
+        except Exception:
+            pass
+        return user, None
 
     def handle_login(self):
         login = self.login_edit.text().strip()
@@ -415,367 +344,63 @@ class LoginPage(QWidget):
             
         # Демо доступ
         if login == "vortex" and password == "vortex":
-            demo_user = {'username': 'Демо пользователь', 'id': 1}
+            demo_user = {'username': 'Демо пользователь', 'id': DEMO_USER_ID}
             self.on_login_success(demo_user)
             return
             
+        self.btn_login.setEnabled(False)
+        self.btn_login.setText("ВХОД...")
+        self.tasks.run('login', self.check_credentials, login, password, self.remember_check.isChecked(),
+                       on_result=self.on_credentials_checked,
+                       on_error=lambda e: QMessageBox.critical(self, "Ошибка входа", f"Не удалось войти: {e}"),
+                       on_finished=self.reset_login_button)
+
+    @staticmethod
+    def check_credentials(login, password, remember=False):
+        """Поиск пользователя и проверка пароля (выполняется в фоновом потоке)"""
         user = find_user_by_login_or_email(login)
         if not user:
-            QMessageBox.critical(self, "Ошибка входа", "Пользователь не найден.")
-            return
-            
-        if not verify_password(password, user["password_hash"]):
-            QMessageBox.critical(self, "Ошибка входа", "Неверный пароль.")
-            return
-            
-        self.on_login_success(user)
-
-class CarCard(QWidget):
-    def __init__(self, car, user, on_buy_callback):
-        super().__init__()
-        self.car = car
-        self.user = user
-        self.on_buy_callback = on_buy_callback
-        self.setup_ui()
-
-    def setup_ui(self):
-        self.setFixedSize(320, 420)
-        self.setStyleSheet(f"""
-            QWidget {{
-                background-color: {COLORS['secondary_bg']};
-                border: 1px solid {COLORS['border']};
-                border-radius: 12px;
-                margin: 8px;
-            }}
-            QWidget:hover {{
-                border-color: {COLORS['accent_blue']};
-                background-color: #1e2130;
-            }}
-        """)
-
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(12, 12, 12, 12)
-        layout.setSpacing(10)
-
-        # Изображение автомобиля
-        image_label = QLabel()
-        image_label.setFixedSize(296, 160)
-        image_label.setAlignment(Qt.AlignCenter)
-        image_label.setStyleSheet(f"""
-            QLabel {{
-                background-color: {COLORS['primary_bg']};
-                border: 1px solid {COLORS['border']};
-                border-radius: 8px;
-                color: {COLORS['text_primary']};
-            }}
-        """)
-        
-        # Загружаем изображение
-        pixmap = self.load_car_image()
-        if pixmap and not pixmap.isNull():
-            pixmap = pixmap.scaled(290, 155, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            image_label.setPixmap(pixmap)
-        else:
-            image_label.setText(f"🚗\n{self.car['brand']}\n{self.car['model']}")
-            image_label.setStyleSheet(f"""
-                QLabel {{
-                    background-color: {COLORS['primary_bg']};
-                    border: 1px solid {COLORS['border']};
-                    border-radius: 8px;
-                    color: {COLORS['accent_blue']};
-                    font-size: 14px;
-                    font-weight: bold;
-                    font-family: 'Segoe UI';
-                }}
-            """)
-
-        # Марка и модель
-        title_label = QLabel(f"{self.car['brand']} {self.car['model']}")
-        title_label.setStyleSheet(f"""
-            color: {COLORS['text_primary']}; 
-            font-size: 16px; 
-            font-weight: bold;
-            margin-top: 5px;
-            font-family: 'Segoe UI';
-        """)
-        title_label.setAlignment(Qt.AlignCenter)
-        title_label.setWordWrap(True)
-
-        # VIN номер
-        vin_label = QLabel(f"VIN: {self.car['vin'][:8]}...")
-        vin_label.setStyleSheet(f"color: {COLORS['text_secondary']}; font-size: 10px; font-family: 'Segoe UI';")
-        vin_label.setAlignment(Qt.AlignCenter)
-
-        # Цена
-        price_label = QLabel(f"{self.car['price']:,.0f} ₽")
-        price_label.setStyleSheet(f"""
-            color: {COLORS['accent_blue']}; 
-            font-size: 18px; 
-            font-weight: bold;
-            margin: 5px 0;
-            font-family: 'Segoe UI';
-            background-color: {COLORS['primary_bg']};
-            border-radius: 6px;
-            padding: 6px;
-            border: 1px solid {COLORS['border']};
-        """)
-        price_label.setAlignment(Qt.AlignCenter)
-
-        # Статус
-        status_label = QLabel(f"Статус: {self.car['status']}")
-        status_color = COLORS['success'] if self.car['status'] == 'в наличии' else COLORS['danger']
-        status_label.setStyleSheet(f"color: {status_color}; font-size: 12px; font-weight: bold; font-family: 'Segoe UI';")
-        status_label.setAlignment(Qt.AlignCenter)
-
-        # Кнопки
-        buttons_layout = QHBoxLayout()
-        buttons_layout.setSpacing(8)
-        
-        btn_details = QPushButton("🔍")
-        btn_details.setToolTip("Подробнее")
-        btn_details.setFixedSize(40, 35)
-        btn_details.setStyleSheet(f"""
-            QPushButton {{
-                background-color: transparent;
-                color: {COLORS['accent_blue']};
-                border: 1px solid {COLORS['accent_blue']};
-                border-radius: 6px;
-                font-size: 14px;
-                font-weight: bold;
-            }}
-            QPushButton:hover {{
-                background-color: {COLORS['accent_blue']};
-                color: {COLORS['text_primary']};
-            }}
-        """)
-        btn_details.clicked.connect(self.show_details)
-
-        btn_buy = QPushButton("КУПИТЬ" if self.car['status'] == 'в наличии' else "ПРОДАНО")
-        btn_buy.setEnabled(self.car['status'] == 'в наличии')
-        btn_buy.setStyleSheet(f"""
-            QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                border: none;
-                padding: 8px 16px;
-                border-radius: 6px;
-                font-size: 12px;
-                font-weight: bold;
-                font-family: 'Segoe UI';
-            }}
-            QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #2563eb, stop:1 #7c3aed);
-            }}
-            QPushButton:disabled {{
-                background-color: {COLORS['border']};
-                color: {COLORS['text_secondary']};
-            }}
-        """)
-        if self.car['status'] == 'в наличии':
-            btn_buy.clicked.connect(self.buy_car)
-
-        buttons_layout.addWidget(btn_details)
-        buttons_layout.addWidget(btn_buy)
-
-        layout.addWidget(image_label)
-        layout.addWidget(title_label)
-        layout.addWidget(vin_label)
-        layout.addWidget(price_label)
-        layout.addWidget(status_label)
-        layout.addLayout(buttons_layout)
-
-    def load_car_image(self):
-        """Загружаем изображение автомобиля из папки images"""
-        try:
-            images_path = os.path.join(os.path.dirname(__file__), "images")
-            
-            if not os.path.exists(images_path):
-                os.makedirs(images_path)
-                print(f"Создана папка для изображений: {images_path}")
-                return None
-            
-            brand_clean = self.car['brand'].replace(' ', '_').replace('-', '_')
-            model_clean = self.car['model'].replace(' ', '_').replace('-', '_')
-            possible_filenames = [
-                f"{brand_clean}_{model_clean}.jpg",
-                f"{brand_clean}_{model_clean}.png",
-                f"{self.car['brand']}_{self.car['model']}.jpg",
-                f"{self.car['brand']}_{self.car['model']}.png",
-            ]
+            return None, "Пользователь не найден."
             
-            for filename in possible_filenames:
-                image_path = os.path.join(images_path, filename)
-                if os.path.exists(image_path):
-                    pixmap = QPixmap(image_path)
-                    if not pixmap.isNull():
-                        print(f"Загружено изображение: {filename}")
-                        return pixmap
+        if not verify_password(password, user["password_hash"], user["salt"]):
+            return None, "Неверный пароль."
             
-            print(f"Не найдено изображение для: {self.car['brand']} {self.car['model']}")
-            return None
+        # Хеш посчитан со старой стоимостью - пересчитываем, пока пароль под рукой
+        if needs_rehash(user["password_hash"]):
+            try:
+                rehash_password(user["id"], password)
+            except Exception as e:
+                print(f"❌ Не удалось обновить хеш пароля: {e}")
             
-        except Exception as e:
-            print(f"Ошибка загрузки изображения: {e}")
-            return None
-
-    def show_details(self):
-        msg = QMessageBox()
-        msg.setWindowTitle(f"🚗 {self.car['brand']} {self.car['model']}")
-        msg.setText(f"""
-<b style='color: {COLORS['accent_blue']};'>ДЕТАЛЬНАЯ ИНФОРМАЦИЯ:</b>
-
-<b>Марка:</b> {self.car['brand']}
-<b>Модель:</b> {self.car['model']}
-<b>VIN:</b> {self.car['vin']}
-<b>Цена:</b> {self.car['price']:,.0f} ₽
-<b>Статус:</b> {self.car['status']}
-
-<b>Описание:</b>
-{self.get_car_description()}
-        """)
-        msg.setStyleSheet(f"""
-            QMessageBox {{
-                background-color: {COLORS['secondary_bg']};
-                color: {COLORS['text_primary']};
-                border: 2px solid {COLORS['accent_blue']};
-                border-radius: 12px;
-                font-family: 'Segoe UI';
-            }}
-            QMessageBox QLabel {{
-                color: {COLORS['text_primary']};
-                font-size: 14px;
-            }}
-            QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                border: none;
-                padding: 8px 16px;
-                border-radius: 6px;
-                font-weight: bold;
-                font-family: 'Segoe UI';
-                min-width: 80px;
-            }}
-            QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #2563eb, stop:1 #7c3aed);
-            }}
-        """)
-        msg.exec()
-
-    def get_car_description(self):
-        descriptions = {
-            'Toyota Camry': 'Стильный седан • Надежность • Комфорт',
-            'Honda CR-V': 'Практичный кроссовер • Экономичность • Простор',
-            'BMW X5': 'Премиальный внедорожник • Динамика • Роскошь',
-            'Mercedes E-Class': 'Бизнес-класс • Комфорт • Технологии',
-            'Audi Q7': 'Семейный внедорожник • Качество • Безопасность',
-            'Lexus RX': 'Премиум-кроссовер • Тишина • Надежность',
-            'Hyundai Tucson': 'Современный дизайн • Гарантия • Оснащение',
-            'Kia Sportage': 'Стильный кроссовер • Цена/Качество • Гарантия'
-        }
-        
-        key = f"{self.car['brand']} {self.car['model']}"
-        return descriptions.get(key, "Качественный автомобиль • Надежность • Комфорт")
-
-    def buy_car(self):
-        if self.car['status'] != 'в наличии':
-            QMessageBox.warning(self, "Внимание", "Этот автомобиль уже продан.")
-            return
+        # Клиент определяется один раз на сессию, страницы берут его из user['client_id'];
+        # если сейчас не вышло, первая же страница попробует ещё раз
+        try:
+            get_session_client_id(user)
+        except Exception:
+            pass
             
-        reply = QMessageBox()
-        reply.setWindowTitle("🎯 ПОДТВЕРЖДЕНИЕ ПОКУПКИ")
-        reply.setText(f"""
-<b style='color: {COLORS['accent_blue']};'>ПОДТВЕРДИТЕ ПОКУПКУ:</b>
-
-{self.car['brand']} {self.car['model']}
-
-<b>ЦЕНА: {self.car['price']:,.0f} ₽</b>
-
-✅ Гарантия 3 года
-✅ Бесплатная доставка  
-✅ Первое ТО в подарок
-        """)
-        reply.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
-        reply.setDefaultButton(QMessageBox.No)
-        reply.setStyleSheet(f"""
-            QMessageBox {{
-                background-color: {COLORS['secondary_bg']};
-                color: {COLORS['text_primary']};
-                border: 2px solid {COLORS['accent_blue']};
-                border-radius: 12px;
-                font-family: 'Segoe UI';
-            }}
-            QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                border: none;
-                padding: 8px 16px;
-                border-radius: 6px;
-                font-weight: bold;
-                font-family: 'Segoe UI';
-                min-width: 80px;
-            }}
-            QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #2563eb, stop:1 #7c3aed);
-            }}
-        """)
-        
-        result = reply.exec()
-        
-        if result == QMessageBox.Yes:
+        if remember:
             try:
-                client_id = get_or_create_client_for_user(self.user['id'], self.user['username'])
-                create_order(client_id, self.car['id'], 1, self.car['price'])
-                
-                success_msg = QMessageBox()
-                success_msg.setWindowTitle("🎉 ПОЗДРАВЛЯЕМ!")
-                success_msg.setText(f"""
-<b style='color: {COLORS['accent_blue']};'>ПОКУПКА УСПЕШНО ОФОРМЛЕНА!</b>
-
-{self.car['brand']} {self.car['model']}
-
-<b>ЦЕНА: {self.car['price']:,.0f} ₽</b>
+                nonce = issue_session_nonce(user["id"])
+                save_token(create_token(user["id"], user["username"], nonce))
+            except Exception as e:
+                print(f"❌ Не удалось запомнить вход: {e}")
+        else:
+            clear_token()
+        return user, None
 
-📅 Доставка: 3 рабочих дня
-📞 Менеджер свяжется в течение 1 часа
-🎁 Бонусы: Первое ТО + коврики
+    def on_credentials_checked(self, result):
+        user, error = result
+        if error:
+            self.refresh_saved_session()
+            QMessageBox.critical(self, "Ошибка входа", error)
+            return
+        self.pass_edit.clear()
+        self.on_login_success(user)
 
-Спасибо за покупку! 🚗✨
-                """)
-                success_msg.setStyleSheet(f"""
-                    QMessageBox {{
-                        background-color: {COLORS['secondary_bg']};
-                        color: {COLORS['text_primary']};
-                        border: 2px solid {COLORS['accent_blue']};
-                        border-radius: 12px;
-                        font-family: 'Segoe UI';
-                    }}
-                    QPushButton {{
-                        background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                            stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                        color: {COLORS['text_primary']};
-                        border: none;
-                        padding: 8px 16px;
-                        border-radius: 6px;
-                        font-weight: bold;
-                        font-family: 'Segoe UI';
-                    }}
-                    QPushButton:hover {{
-                        background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                            stop:0 #2563eb, stop:1 #7c3aed);
-                    }}
-                """)
-                success_msg.exec()
-                
-                self.on_buy_callback()
-                
-            except Exception as e:
-                QMessageBox.critical(self, "❌ ОШИБКА", f"Не удалось оформить покупку: {str(e)}")
+    def reset_login_button(self):
+        self.btn_login.setEnabled(True)
+        self.btn_login.setText("ВОЙТИ")
 
 class MainMenuPage(QWidget):
     def __init__(self, user, logout_callback):
@@ -785,61 +410,33 @@ class MainMenuPage(QWidget):
         self.setup_ui()
 
     def setup_ui(self):
-        self.setStyleSheet(f"background-color: {COLORS['primary_bg']};")
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(40, 20, 40, 20)
         
         # Заголовок
         title = QLabel("AUTO DREAMS")
         title.setAlignment(Qt.AlignCenter)
-        title.setStyleSheet(f"""
-            font-size: 42px;
-            font-weight: bold;
-            color: {COLORS['accent_blue']};
-            margin-bottom: 10px;
-            font-family: 'Segoe UI';
-        """)
+        title.setObjectName("brandTitle")
         
         subtitle = QLabel("ПРЕМИАЛЬНЫЕ АВТОМОБИЛИ")
         subtitle.setAlignment(Qt.AlignCenter)
-        subtitle.setStyleSheet(f"""
-            font-size: 20px;
-            color: {COLORS['accent_purple']};
-            margin-bottom: 20px;
-            font-family: 'Segoe UI';
-        """)
+        subtitle.setObjectName("brandSubtitle")
         
         # Приветствие
         welcome = QLabel(f"ДОБРО ПОЖАЛОВАТЬ, {self.user['username'].upper()}!")
         welcome.setAlignment(Qt.AlignCenter)
-        welcome.setStyleSheet(f"""
-            font-size: 18px;
-            color: {COLORS['text_secondary']};
-            margin-bottom: 30px;
-            font-family: 'Segoe UI';
-        """)
+        welcome.setObjectName("welcome")
         
         # Главное меню
         menu_container = QWidget()
-        menu_container.setStyleSheet(f"""
-            background-color: {COLORS['secondary_bg']};
-            border: 2px solid {COLORS['accent_blue']};
-            border-radius: 15px;
-            padding: 30px;
-        """)
+        menu_container.setObjectName("formPanel")
         menu_layout = QVBoxLayout(menu_container)
         menu_layout.setAlignment(Qt.AlignCenter)
         menu_layout.setSpacing(15)
         
         menu_label = QLabel("ГЛАВНОЕ МЕНЮ")
         menu_label.setAlignment(Qt.AlignCenter)
-        menu_label.setStyleSheet(f"""
-            font-size: 28px;
-            font-weight: bold;
-            color: {COLORS['accent_blue']};
-            margin-bottom: 30px;
-            font-family: 'Segoe UI';
-        """)
+        menu_label.setObjectName("formTitle")
         
         # Кнопки меню
         btn_assortment = self.create_menu_button("📦 АССОРТИМЕНТ АВТОМОБИЛЕЙ")
@@ -864,26 +461,12 @@ class MainMenuPage(QWidget):
         
         # Инструкция
         instruction_frame = QFrame()
-        instruction_frame.setStyleSheet(f"""
-            QFrame {{
-                background-color: {COLORS['secondary_bg']};
-                border: 2px solid {COLORS['accent_blue']};
-                border-radius: 12px;
-                margin-top: 30px;
-                padding: 20px;
-            }}
-        """)
+        instruction_frame.setObjectName("infoPanel")
         
         instruction_layout = QVBoxLayout(instruction_frame)
         
         instruction_title = QLabel("ИНСТРУКЦИЯ")
-        instruction_title.setStyleSheet(f"""
-            font-size: 16px;
-            font-weight: bold;
-            color: {COLORS['accent_blue']};
-            margin-bottom: 10px;
-            font-family: 'Segoe UI';
-        """)
+        instruction_title.setObjectName("infoTitle")
         
         instruction_text = QLabel(
             "• АССОРТИМЕНТ - просмотр и покупка автомобилей\n"
@@ -892,7 +475,7 @@ class MainMenuPage(QWidget):
             "• МОИ ОТЗЫВЫ - просмотр ваших отзывов\n"
             "• ВЫХОД - возврат к окну авторизации"
         )
-        instruction_text.setStyleSheet(f"color: {COLORS['text_secondary']}; font-size: 12px; line-height: 1.5; font-family: 'Segoe UI';")
+        instruction_text.setObjectName("infoText")
         
         instruction_layout.addWidget(instruction_title)
         instruction_layout.addWidget(instruction_text)
@@ -910,28 +493,7 @@ class MainMenuPage(QWidget):
     def create_menu_button(self, text):
         button = QPushButton(text)
         button.setMinimumSize(400, 60)
-        button.setStyleSheet(f"""
-            QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                border: none;
-                padding: 12px 25px;
-                border-radius: 10px;
-                font-size: 16px;
-                font-weight: bold;
-                margin: 5px 0;
-                font-family: 'Segoe UI';
-            }}
-            QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #2563eb, stop:1 #7c3aed);
-            }}
-            QPushButton:pressed {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #1d4ed8, stop:1 #6d28d9);
-            }}
-        """)
+        set_variant(button, "menu")
         return button
 
     def show_assortment(self):
@@ -947,246 +509,553 @@ class MainMenuPage(QWidget):
         self.parent().parent().show_my_reviews_page()
 
 class CarCatalogPage(QWidget):
+    # Сколько пикселей до конца прокрутки должно остаться, чтобы подгрузить следующую страницу
+    LOAD_MORE_THRESHOLD = 400
+
+    order_placed = Signal()
+
     def __init__(self, user, back_callback):
         super().__init__()
         self.user = user
         self.back_callback = back_callback
+        self.filters = {}
+        self.sort = 'id'
+        self.loaded = False
+        # Поиск по каталогу: индекс всей выборки в памяти (catalog_search) и
+        # постраничный список, сохранённый на время поиска
+        self.search_index = None
+        self.facet_filters = []  # Фильтры пунктов дерева фасетов (в пункте хранится номер)
+        self.search_index_stale = False
+        self.paged_state = None
+        self.tasks = BackgroundTasks(self)
+        from catalog_view import CarListModel
+        self.model = CarListModel(self.fetch_more_cars, self.is_fetching, self)
         self.setup_ui()
 
     def setup_ui(self):
-        self.setStyleSheet(f"background-color: {COLORS['primary_bg']};")
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
 
         title = QLabel("КАТАЛОГ АВТОМОБИЛЕЙ")
-        title.setStyleSheet(f"""
-            font-size: 28px; 
-            color: {COLORS['accent_blue']}; 
-            font-weight: bold; 
-            margin-bottom: 20px;
-            font-family: 'Segoe UI';
-        """)
+        title.setObjectName("title")
         title.setAlignment(Qt.AlignCenter)
 
-        # Создаем область прокрутки
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setStyleSheet(f"""
-            QScrollArea {{
-                border: none;
-                background-color: transparent;
-            }}
-            QScrollBar:vertical {{
-                background-color: {COLORS['secondary_bg']};
-                width: 10px;
-                margin: 0px;
-                border-radius: 5px;
-            }}
-            QScrollBar::handle:vertical {{
-                background-color: {COLORS['accent_blue']};
-                min-height: 20px;
-                border-radius: 5px;
-            }}
-            QScrollBar::handle:vertical:hover {{
-                background-color: {COLORS['accent_purple']};
-            }}
-        """)
+        # Строка поиска: фильтрация на каждое нажатие, без запросов к БД
+        search_layout = QHBoxLayout()
+        search_layout.setSpacing(10)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("🔍 Марка, модель или VIN")
+        self.search_edit.setClearButtonEnabled(True)
+        self.price_from_edit = QLineEdit()
+        self.price_from_edit.setPlaceholderText("Цена от, ₽")
+        self.price_to_edit = QLineEdit()
+        self.price_to_edit.setPlaceholderText("Цена до, ₽")
+        for edit in (self.price_from_edit, self.price_to_edit):
+            edit.setValidator(QIntValidator(0, 2_000_000_000, edit))
+            edit.setClearButtonEnabled(True)
+            edit.setMaximumWidth(180)
+        for edit in (self.search_edit, self.price_from_edit, self.price_to_edit):
+            edit.textChanged.connect(self.on_search_changed)
+        search_layout.addWidget(self.search_edit, 1)
+        search_layout.addWidget(self.price_from_edit)
+        search_layout.addWidget(self.price_to_edit)
+
+        # Каталог - список с отрисовкой карточек делегатом: виджеты на каждую
+        # машину не создаются, рисуются только видимые карточки
+        self.list_view = QListView()
+        self.list_view.setViewMode(QListView.IconMode)
+        self.list_view.setMovement(QListView.Static)
+        self.list_view.setResizeMode(QListView.Adjust)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setLayoutMode(QListView.Batched)
+        self.list_view.setBatchSize(300)
+        self.list_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.list_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.list_view.verticalScrollBar().setSingleStep(40)
+        self.list_view.setMouseTracking(True)
+        self.list_view.viewport().setAttribute(Qt.WA_Hover)
+        self.list_view.setModel(self.model)
+        from catalog_view import CarCardDelegate
+        self.delegate = CarCardDelegate(COLORS, self.list_view)
+        self.delegate.details_requested.connect(self.show_details)
+        self.delegate.buy_requested.connect(self.buy_car)
+        self.list_view.setItemDelegate(self.delegate)
+        self.scroll_bar = self.list_view.verticalScrollBar()
+        self.scroll_bar.valueChanged.connect(self.maybe_load_more)
+        self.scroll_bar.rangeChanged.connect(self.maybe_load_more)
+        self.list_view.setObjectName("catalog")
+
+        # Сообщение вместо списка (загрузка, пустой каталог)
+        self.message_label = QLabel()
+        self.message_label.setObjectName("emptyMessage")
+        self.message_label.setAlignment(Qt.AlignCenter)
 
-        # Контейнер для карточек
-        self.cards_container = QWidget()
-        self.cards_layout = QGridLayout(self.cards_container)
-        self.cards_layout.setAlignment(Qt.AlignTop)
-        self.cards_layout.setHorizontalSpacing(15)
-        self.cards_layout.setVerticalSpacing(15)
-        self.cards_layout.setContentsMargins(10, 10, 10, 10)
+        # Фасеты: марка, модель и ценовой диапазон со счётчиками машин в наличии
+        self.facets_tree = QTreeWidget()
+        self.facets_tree.setObjectName("facets")
+        self.facets_tree.setHeaderHidden(True)
+        self.facets_tree.setFixedWidth(260)
+        self.facets_tree.itemClicked.connect(self.apply_facet)
 
-        scroll_area.setWidget(self.cards_container)
+        results_layout = QVBoxLayout()
+        results_layout.addWidget(self.message_label, 1)
+        results_layout.addWidget(self.list_view, 1)
+        content_layout = QHBoxLayout()
+        content_layout.setSpacing(15)
+        content_layout.addWidget(self.facets_tree)
+        content_layout.addLayout(results_layout, 1)
 
         btn_back = QPushButton("◀ НАЗАД В МЕНЮ")
-        btn_back.setStyleSheet(f"""
-            QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                border: none;
-                padding: 10px 20px;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: bold;
-                margin-top: 20px;
-                font-family: 'Segoe UI';
-            }}
-            QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #2563eb, stop:1 #7c3aed);
-            }}
-        """)
+        set_variant(btn_back, "back")
         btn_back.clicked.connect(self.back_callback)
 
         layout.addWidget(title)
-        layout.addWidget(scroll_area)
+        layout.addLayout(search_layout)
+        layout.addLayout(content_layout, 1)
         layout.addWidget(btn_back)
 
         self.load_cars()
+        self.load_facets()
 
     def load_cars(self):
-        try:
-            # Очищаем старые карточки
-            for i in reversed(range(self.cards_layout.count())): 
-                widget = self.cards_layout.itemAt(i).widget()
-                if widget:
-                    widget.setParent(None)
-            
-            cars = get_all_cars()
-            
-            if not cars:
-                no_cars_label = QLabel("В НАСТОЯЩЕЕ ВРЕМЯ НЕТ ДОСТУПНЫХ АВТОМОБИЛЕЙ")
-                no_cars_label.setStyleSheet(f"color: {COLORS['text_secondary']}; font-size: 16px; font-family: 'Segoe UI';")
-                no_cars_label.setAlignment(Qt.AlignCenter)
-                self.cards_layout.addWidget(no_cars_label, 0, 0, 1, 3)
-                return
+        self.loaded = False
+        self.tasks.cancel('more')
+        self.model.reset([])
+        self.show_message("ЗАГРУЗКА АВТОМОБИЛЕЙ...")
+        self.tasks.run('cars', get_cars_page, self.filters, self.sort,
+                       on_result=self.on_first_page,
+                       on_error=self.on_load_error)
+
+    def refresh(self):
+        self.refresh_cars()
+        self.load_facets()
+
+    def refresh_cars(self):
+        """Перечитывает показанную часть каталога и применяет только отличия"""
+        if self.paged_state is not None:
+            # Идёт поиск - обновляем индекс, результаты пересчитаются по готовности;
+            # постраничный список загрузится заново, когда поиск очистят
+            self.paged_state = ([], None)
+            self.build_search_index()
+            return
+        self.search_index_stale = True
+        shown = self.model.rowCount()
+        if not shown:
+            self.load_cars()
+            return
+        self.tasks.cancel('more')
+        self.tasks.run('refresh', get_cars_page, self.filters, self.sort, None, shown,
+                       on_result=self.on_refreshed,
+                       on_error=lambda e: print(f"Не удалось обновить каталог: {e}"))
+
+    def on_refreshed(self, page):
+        cars, next_key = page
+        self.loaded = True
+        self.model.sync(cars, next_key)
+        if not cars:
+            self.show_message("В НАСТОЯЩЕЕ ВРЕМЯ НЕТ ДОСТУПНЫХ АВТОМОБИЛЕЙ")
+
+    def show_message(self, text):
+        self.message_label.setText(text)
+        self.message_label.show()
+        self.list_view.hide()
+
+    def on_first_page(self, page):
+        cars, next_key = page
+        self.loaded = True
+        if self.paged_state is not None:
+            # Пока грузилась страница, начали поиск - покажем её после очистки поиска
+            self.paged_state = (cars, next_key)
+            return
+        if not cars:
+            self.show_message("В НАСТОЯЩЕЕ ВРЕМЯ НЕТ ДОСТУПНЫХ АВТОМОБИЛЕЙ")
+            return
+        self.model.reset(cars, next_key)
+        self.message_label.hide()
+        self.list_view.show()
+
+    def on_load_error(self, e):
+        self.model.stop_fetching()
+        # Во время поиска список занят его результатами
+        if not self.loaded and self.paged_state is None:
+            self.show_message("НЕ УДАЛОСЬ ЗАГРУЗИТЬ АВТОМОБИЛИ")
+        QMessageBox.critical(self, "❌ ОШИБКА", f"Не удалось загрузить автомобили: {str(e)}")
+
+    def is_fetching(self):
+        return any(self.tasks.is_running(key) for key in ('cars', 'more', 'refresh'))
+
+    def fetch_more_cars(self, after_key):
+        """Вызывается моделью (fetchMore), когда нужна следующая страница"""
+        self.tasks.run('more', get_cars_page, self.filters, self.sort, after_key,
+                       on_result=lambda page: self.model.append_page(*page),
+                       on_error=self.on_load_error,
+                       on_finished=self.maybe_load_more)
+
+    def maybe_load_more(self, *args):
+        """Подгружает следующую страницу заранее, когда пользователь долистал почти до конца"""
+        if not self.model.canFetchMore():
+            return
+        if self.scroll_bar.maximum() - self.scroll_bar.value() > self.LOAD_MORE_THRESHOLD:
+            return
+        self.model.fetchMore()
+
+    def load_facets(self):
+        self.tasks.run('facets', get_catalog_facets,
+                       on_result=self.show_facets,
+                       on_error=lambda e: print(f"Не удалось загрузить фасеты каталога: {e}"))
+
+    @staticmethod
+    def price_band_title(low, high):
+        millions = lambda value: f"{value / 1_000_000:g} млн ₽"
+        if not low:
+            return f"до {millions(high)}"
+        if high is None:
+            return f"от {millions(low)}"
+        return f"{low / 1_000_000:g} – {millions(high)}"
+
+    def show_facets(self, facets):
+        def facet_item(parent, title, filters):
+            item = QTreeWidgetItem([title]) if parent is None else QTreeWidgetItem(parent, [title])
+            item.setData(0, Qt.UserRole, len(self.facet_filters))
+            self.facet_filters.append(filters)
+            return item
+
+        def group_item(title):
+            item = QTreeWidgetItem([title])
+            item.setFlags(Qt.ItemIsEnabled)
+            return item
+
+        self.facets_tree.clear()
+        self.facet_filters = []
+        all_item = facet_item(None, f"Все автомобили ({facets['total']})", {})
+
+        brands = group_item("МАРКА")
+        brand_items = {}
+        for brand, count in sorted(facets['brands'].items()):
+            brand_items[brand] = facet_item(brands, f"{brand} ({count})", {'brand': brand})
+        for (brand, model), count in sorted(facets['models'].items()):
+            if brand in brand_items:
+                facet_item(brand_items[brand], f"{model} ({count})", {'brand': brand, 'model': model})
+
+        prices = group_item("ЦЕНА")
+        for band, (low, high) in enumerate(PRICE_BANDS):
+            count = facets['price_bands'].get(band)
+            if count:
+                filters = {'min_price': low} if high is None else {'min_price': low, 'max_price': high}
+                facet_item(prices, f"{self.price_band_title(low, high)} ({count})", filters)
+
+        self.facets_tree.addTopLevelItems([all_item, brands, prices])
+        brands.setExpanded(True)
+        prices.setExpanded(True)
+
+        # Выбранный фасет остаётся выделенным после обновления счётчиков
+        for item in self.facets_tree.findItems("", Qt.MatchContains | Qt.MatchRecursive):
+            number = item.data(0, Qt.UserRole)
+            if number is not None and self.facet_filters[number] == self.filters:
+                self.facets_tree.setCurrentItem(item)
+                break
+
+    def apply_facet(self, item, column=0):
+        number = item.data(0, Qt.UserRole)
+        if number is None or self.facet_filters[number] == self.filters:
+            return
+        filters = self.facet_filters[number]
+        self.filters = dict(filters)
+        if self.paged_state is None:
+            self.load_cars()
+            return
+        # Идёт поиск - фильтр применяется к его результатам, а постраничный
+        # список с новым фильтром загрузится, когда поиск очистят
+        self.paged_state = ([], None)
+        query = self.search_query()
+        if self.search_index is not None and query is not None:
+            self.apply_search(query)
+
+    def matches_filters(self, car):
+        filters = self.filters
+        return ((not filters.get('brand') or car['brand'] == filters['brand'])
+                and (not filters.get('model') or car['model'] == filters['model'])
+                and (filters.get('min_price') is None or car['price'] >= filters['min_price'])
+                and (filters.get('max_price') is None or car['price'] < filters['max_price']))
+
+    def search_query(self):
+        """(текст, цена от, цена до) или None, если поиск пуст"""
+        text = self.search_edit.text().strip()
+        prices = [int(edit.text()) if edit.text() else None
+                  for edit in (self.price_from_edit, self.price_to_edit)]
+        if not text and prices == [None, None]:
+            return None
+        return text, prices[0], prices[1]
+
+    def on_search_changed(self, *args):
+        query = self.search_query()
+        if query is None:
+            self.leave_search()
+            return
+        if self.paged_state is None:
+            self.paged_state = (self.model.cars, self.model.next_key)
+            self.tasks.cancel('more')
+            self.tasks.cancel('refresh')
+        if self.search_index is None:
+            self.model.reset([])
+            self.show_message("ПОДГОТОВКА ПОИСКА...")
+            self.build_search_index()
+            return
+        if self.search_index_stale:
+            # Ищем по текущему индексу, свежий подменит его по готовности
+            self.build_search_index()
+        self.apply_search(query)
+
+    def build_search_index(self):
+        self.search_index_stale = False
+        self.tasks.run('search-index', self.load_search_index,
+                       on_result=self.on_search_index,
+                       on_error=lambda e: self.show_message(f"ПОИСК НЕДОСТУПЕН: {e}"),
+                       cancel_on_hide=False)
+
+    @staticmethod
+    def load_search_index():
+        """Вся выборка каталога и индекс по ней (выполняется в фоновом потоке)"""
+        from catalog_search import CatalogIndex
+        return CatalogIndex(sorted(get_all_cars(), key=lambda car: car['id']))
+
+    def on_search_index(self, index):
+        self.search_index = index
+        query = self.search_query()
+        if query is not None and self.paged_state is not None:
+            self.apply_search(query)
+
+    def apply_search(self, query):
+        cars = self.search_index.search(*query)
+        if self.filters:
+            cars = [car for car in cars if self.matches_filters(car)]
+        self.model.reset(cars)
+        if cars:
+            self.message_label.hide()
+            self.list_view.show()
+        else:
+            self.show_message("НИЧЕГО НЕ НАЙДЕНО")
+
+    def leave_search(self):
+        if self.paged_state is None:
+            return
+        cars, next_key = self.paged_state
+        self.paged_state = None
+        if not cars:
+            self.load_cars()
+            return
+        self.model.reset(cars, next_key)
+        self.message_label.hide()
+        self.list_view.show()
+
+    def show_details(self, car):
+        msg = QMessageBox()
+        msg.setWindowTitle(f"🚗 {car['brand']} {car['model']}")
+        msg.setText(f"""
+<b style='color: {COLORS['accent_blue']};'>ДЕТАЛЬНАЯ ИНФОРМАЦИЯ:</b>
+
+<b>Марка:</b> {car['brand']}
+<b>Модель:</b> {car['model']}
+<b>VIN:</b> {car['vin']}
+<b>Цена:</b> {car['price']:,.0f} ₽
+<b>Статус:</b> {car['status']}
+
+<b>Описание:</b>
+{self.get_car_description(car)}
+        """)
+        msg.exec()
+
+    @staticmethod
+    def get_car_description(car):
+        descriptions = {
+            'Toyota Camry': 'Стильный седан • Надежность • Комфорт',
+            'Honda CR-V': 'Практичный кроссовер • Экономичность • Простор',
+            'BMW X5': 'Премиальный внедорожник • Динамика • Роскошь',
+            'Mercedes E-Class': 'Бизнес-класс • Комфорт • Технологии',
+            'Audi Q7': 'Семейный внедорожник • Качество • Безопасность',
+            'Lexus RX': 'Премиум-кроссовер • Тишина • Надежность',
+            'Hyundai Tucson': 'Современный дизайн • Гарантия • Оснащение',
+            'Kia Sportage': 'Стильный кроссовер • Цена/Качество • Гарантия'
+        }
+        
+        key = f"{car['brand']} {car['model']}"
+        return descriptions.get(key, "Качественный автомобиль • Надежность • Комфорт")
+
+    def buy_car(self, car):
+        if car['status'] != 'в наличии':
+            QMessageBox.warning(self, "Внимание", "Этот автомобиль уже продан.")
+            return
             
-            # Добавляем карточки автомобилей
-            for i, car in enumerate(cars):
-                row = i // 3
-                col = i % 3
-                car_card = CarCard(car, self.user, self.load_cars)
-                self.cards_layout.addWidget(car_card, row, col)
-                
-        except Exception as e:
-            QMessageBox.critical(self, "❌ ОШИБКА", f"Не удалось загрузить автомобили: {str(e)}")
+        reply = QMessageBox()
+        reply.setWindowTitle("🎯 ПОДТВЕРЖДЕНИЕ ПОКУПКИ")
+        reply.setText(f"""
+<b style='color: {COLORS['accent_blue']};'>ПОДТВЕРДИТЕ ПОКУПКУ:</b>
+
+{car['brand']} {car['model']}
+
+<b>ЦЕНА: {car['price']:,.0f} ₽</b>
+
+✅ Гарантия 3 года
+✅ Бесплатная доставка  
+✅ Первое ТО в подарок
+        """)
+        reply.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+        reply.setDefaultButton(QMessageBox.No)
+        
+        result = reply.exec()
+        
+        if result == QMessageBox.Yes:
+            self.model.set_pending(car['id'], True)
+            # Ключ на каждую машину - параллельные покупки не отменяют друг друга
+            self.tasks.run(f"buy-{car['id']}", self.place_order, self.user, car,
+                           on_result=lambda _: self.on_order_placed(car),
+                           on_error=lambda e: self.on_order_failed(car, e),
+                           cancel_on_hide=False)
+
+    @staticmethod
+    def place_order(user, car):
+        """Оформление заказа (выполняется в фоновом потоке)"""
+        create_order(get_session_client_id(user), car['id'])
+
+    def on_order_failed(self, car, e):
+        self.model.set_pending(car['id'], False)
+        QMessageBox.critical(self, "❌ ОШИБКА", f"Не удалось оформить покупку: {str(e)}")
+        # Машину могли купить с другого терминала - сверяем список и счётчики с БД
+        self.refresh_cars()
+        self.load_facets()
+
+    def on_order_placed(self, car):
+        success_msg = QMessageBox()
+        success_msg.setWindowTitle("🎉 ПОЗДРАВЛЯЕМ!")
+        success_msg.setText(f"""
+<b style='color: {COLORS['accent_blue']};'>ПОКУПКА УСПЕШНО ОФОРМЛЕНА!</b>
+
+{car['brand']} {car['model']}
+
+<b>ЦЕНА: {car['price']:,.0f} ₽</b>
+
+📅 Доставка: 3 рабочих дня
+📞 Менеджер свяжется в течение 1 часа
+🎁 Бонусы: Первое ТО + коврики
+
+Спасибо за покупку! 🚗✨
+        """)
+        success_msg.exec()
+        
+        # Проданная машина уходит из каталога без перезагрузки всего списка,
+        # затем показанная часть сверяется с БД (продажи с других терминалов)
+        self.model.remove_car(car['id'])
+        if self.search_index is not None:
+            self.search_index.discard(car['id'])
+        if self.paged_state is not None:
+            cars, next_key = self.paged_state
+            self.paged_state = ([c for c in cars if c['id'] != car['id']], next_key)
+        else:
+            self.refresh_cars()
+        # Счётчики фасетов в кэше уже уменьшены create_order - без запроса к БД
+        self.load_facets()
+        self.order_placed.emit()
 
 class OrdersPage(QWidget):
     def __init__(self, user, back_callback):
         super().__init__()
         self.user = user
         self.back_callback = back_callback
+        self.loaded = False
+        self.tasks = BackgroundTasks(self)
+        from history_view import HistoryTableModel, ORDER_COLUMNS
+        self.model = HistoryTableModel(ORDER_COLUMNS, 'sale_date', self.fetch_more_orders,
+                                       self.is_fetching, self.on_sort, self)
         self.setup_ui()
 
     def setup_ui(self):
-        self.setStyleSheet(f"background-color: {COLORS['primary_bg']};")
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
         
         title = QLabel("МОИ ЗАКАЗЫ")
-        title.setStyleSheet(f"""
-            font-size: 28px; 
-            color: {COLORS['accent_blue']}; 
-            font-weight: bold; 
-            margin-bottom: 20px;
-            font-family: 'Segoe UI';
-        """)
+        title.setObjectName("title")
         title.setAlignment(Qt.AlignCenter)
         
-        self.table = QTableWidget()
-        self.table.setStyleSheet(f"""
-            QTableWidget {{
-                background-color: {COLORS['secondary_bg']};
-                color: {COLORS['text_primary']};
-                gridline-color: {COLORS['border']};
-                border: 2px solid {COLORS['accent_blue']};
-                border-radius: 8px;
-                font-family: 'Segoe UI';
-            }}
-            QTableWidget::item {{
-                padding: 10px;
-                border-bottom: 1px solid {COLORS['border']};
-                color: {COLORS['text_primary']};
-            }}
-            QTableWidget::item:selected {{
-                background-color: {COLORS['accent_blue']};
-                color: {COLORS['text_primary']};
-            }}
-            QHeaderView::section {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                padding: 12px;
-                font-weight: bold;
-                border: none;
-                font-family: 'Segoe UI';
-            }}
-        """)
+        # Строки подгружаются страницами при прокрутке, сортировка - в БД
+        from history_view import setup_history_table
+        self.table = QTableView()
+        setup_history_table(self.table, self.model)
         
         btn_back = QPushButton("◀ НАЗАД В МЕНЮ")
-        btn_back.setStyleSheet(f"""
-            QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                border: none;
-                padding: 10px 20px;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: bold;
-                margin-top: 20px;
-                font-family: 'Segoe UI';
-            }}
-            QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #2563eb, stop:1 #7c3aed);
-            }}
-        """)
+        set_variant(btn_back, "back")
         btn_back.clicked.connect(self.back_callback)
         
+        self.status_label = QLabel("Загрузка заказов...")
+        self.status_label.setObjectName("statusLabel")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        
         layout.addWidget(title)
+        layout.addWidget(self.status_label)
         layout.addWidget(self.table)
         layout.addWidget(btn_back)
         
         self.load_orders()
 
+    def refresh(self):
+        self.load_orders()
+
+    def on_sort(self, sort, descending):
+        self.load_orders()
+
     def load_orders(self):
-        try:
-            client_id = get_or_create_client_for_user(self.user['id'], self.user['username'])
-            orders = get_client_orders(client_id)
-            
-            self.table.setRowCount(len(orders))
-            self.table.setColumnCount(5)
-            self.table.setHorizontalHeaderLabels(["Автомобиль", "Дата покупки", "Цена", "Продавец", "Статус"])
-            
-            for row, order in enumerate(orders):
-                car_info = f"{order['brand']} {order['model']}"
-                self.table.setItem(row, 0, QTableWidgetItem(car_info))
-                self.table.setItem(row, 1, QTableWidgetItem(str(order['sale_date'])))
-                self.table.setItem(row, 2, QTableWidgetItem(f"{order['final_price']:,.0f} ₽"))
-                self.table.setItem(row, 3, QTableWidgetItem(order['employee_name']))
-                self.table.setItem(row, 4, QTableWidgetItem("✅ Выполнен"))
-            
-            self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-            
-        except Exception as e:
-            QMessageBox.critical(self, "❌ ОШИБКА", f"Не удалось загрузить заказы: {str(e)}")
+        self.loaded = False
+        self.tasks.cancel('more')
+        self.model.reset([])
+        self.status_label.show()
+        self.tasks.run('orders', self.fetch_orders, self.user, self.model.sort_key, self.model.descending, 0,
+                       on_result=self.show_orders,
+                       on_error=self.on_load_error,
+                       on_finished=self.status_label.hide)
+
+    @staticmethod
+    def fetch_orders(user, sort, descending, offset):
+        """Страница заказов клиента (выполняется в фоновом потоке)"""
+        return get_client_orders_page(get_session_client_id(user), sort, descending, offset)
+
+    def show_orders(self, page):
+        self.loaded = True
+        self.model.reset(*page)
+
+    def on_load_error(self, e):
+        self.model.stop_fetching()
+        QMessageBox.critical(self, "❌ ОШИБКА", f"Не удалось загрузить заказы: {str(e)}")
+
+    def is_fetching(self):
+        return self.tasks.is_running('orders') or self.tasks.is_running('more')
+
+    def fetch_more_orders(self, offset):
+        """Вызывается моделью (fetchMore), когда таблицу долистали до конца"""
+        self.tasks.run('more', self.fetch_orders, self.user, self.model.sort_key, self.model.descending, offset,
+                       on_result=lambda page: self.model.append_page(*page),
+                       on_error=self.on_load_error)
 
 class ReviewsPage(QWidget):
+    review_added = Signal()
+
     def __init__(self, user, back_callback):
         super().__init__()
         self.user = user
         self.back_callback = back_callback
+        self.tasks = BackgroundTasks(self)
         self.setup_ui()
 
     def setup_ui(self):
-        self.setStyleSheet(f"background-color: {COLORS['primary_bg']};")
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
         
         title = QLabel("ОСТАВИТЬ ОТЗЫВ")
-        title.setStyleSheet(f"""
-            font-size: 28px; 
-            color: {COLORS['accent_blue']}; 
-            font-weight: bold; 
-            margin-bottom: 20px;
-            font-family: 'Segoe UI';
-        """)
+        title.setObjectName("title")
         title.setAlignment(Qt.AlignCenter)
         
         # Форма отзыва
         form_container = QWidget()
-        form_container.setStyleSheet(f"""
-            background-color: {COLORS['secondary_bg']};
-            border: 2px solid {COLORS['accent_blue']};
-            border-radius: 12px;
-            padding: 25px;
-        """)
+        form_container.setObjectName("formPanel")
         form_layout = QFormLayout(form_container)
         form_layout.setSpacing(15)
         
@@ -1199,32 +1068,6 @@ class ReviewsPage(QWidget):
         self.comment_edit.setPlaceholderText("Напишите ваш отзыв...")
         self.comment_edit.setMaximumHeight(100)
         
-        # Стилизация полей
-        input_style = f"""
-            QLineEdit, QSpinBox, QTextEdit {{
-                background-color: {COLORS['secondary_bg']};
-                color: {COLORS['text_primary']};
-                padding: 10px;
-                border: 1px solid {COLORS['border']};
-                border-radius: 6px;
-                font-size: 14px;
-                font-family: 'Segoe UI';
-            }}
-            QLineEdit:focus, QSpinBox:focus, QTextEdit:focus {{
-                border-color: {COLORS['accent_blue']};
-                background-color: {COLORS['secondary_bg']};
-            }}
-            QSpinBox::up-button, QSpinBox::down-button {{
-                background-color: {COLORS['accent_blue']};
-                border: none;
-                border-radius: 3px;
-            }}
-        """
-        
-        self.order_id_edit.setStyleSheet(input_style)
-        self.rating_spin.setStyleSheet(input_style)
-        self.comment_edit.setStyleSheet(input_style)
-        
         form_layout.addRow("ID заказа:", self.order_id_edit)
         form_layout.addRow("Оценка (1-5):", self.rating_spin)
         form_layout.addRow("Комментарий:", self.comment_edit)
@@ -1233,47 +1076,13 @@ class ReviewsPage(QWidget):
         for i in range(form_layout.rowCount()):
             label = form_layout.itemAt(i, QFormLayout.LabelRole).widget()
             if label:
-                label.setStyleSheet(f"color: {COLORS['accent_blue']}; font-size: 14px; font-family: 'Segoe UI'; font-weight: bold;")
-        
-        btn_submit = QPushButton("📝 ОТПРАВИТЬ ОТЗЫВ")
-        btn_submit.setStyleSheet(f"""
-            QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                border: none;
-                padding: 12px 24px;
-                border-radius: 8px;
-                font-size: 16px;
-                font-weight: bold;
-                margin-top: 15px;
-                font-family: 'Segoe UI';
-            }}
-            QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #2563eb, stop:1 #7c3aed);
-            }}
-        """)
+                label.setObjectName("formLabel")
+        
+        self.btn_submit = btn_submit = QPushButton("📝 ОТПРАВИТЬ ОТЗЫВ")
         btn_submit.clicked.connect(self.submit_review)
         
         btn_back = QPushButton("◀ НАЗАД В МЕНЮ")
-        btn_back.setStyleSheet(f"""
-            QPushButton {{
-                background-color: transparent;
-                color: {COLORS['accent_blue']};
-                border: 2px solid {COLORS['accent_blue']};
-                padding: 10px 20px;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: bold;
-                margin-top: 10px;
-                font-family: 'Segoe UI';
-            }}
-            QPushButton:hover {{
-                background-color: {COLORS['accent_blue']};
-                color: {COLORS['text_primary']};
-            }}
-        """)
+        set_variant(btn_back, "outline")
         btn_back.clicked.connect(self.back_callback)
         
         layout.addWidget(title)
@@ -1292,218 +1101,275 @@ class ReviewsPage(QWidget):
                 QMessageBox.warning(self, "ВНИМАНИЕ", "Заполните все поля.")
                 return
             
-            client_id = get_or_create_client_for_user(self.user['id'], self.user['username'])
-            
-            add_review(client_id, order_id, rating, comment)
-            QMessageBox.information(self, "✅ УСПЕХ", "Отзыв успешно добавлен!")
-            
-            self.order_id_edit.clear()
-            self.rating_spin.setValue(5)
-            self.comment_edit.clear()
-            
         except ValueError:
             QMessageBox.warning(self, "❌ ОШИБКА", "Введите корректный ID заказа.")
-        except Exception as e:
-            QMessageBox.critical(self, "❌ ОШИБКА", f"Не удалось добавить отзыв: {str(e)}")
+            return
+
+        self.btn_submit.setEnabled(False)
+        self.tasks.run('submit', self.save_review, self.user, order_id, rating, comment,
+                       on_result=self.on_review_saved,
+                       on_error=lambda e: QMessageBox.critical(self, "❌ ОШИБКА", f"Не удалось добавить отзыв: {str(e)}"),
+                       on_finished=lambda: self.btn_submit.setEnabled(True),
+                       cancel_on_hide=False)
+
+    @staticmethod
+    def save_review(user, order_id, rating, comment):
+        """Сохранение отзыва (выполняется в фоновом потоке)"""
+        add_review(get_session_client_id(user), order_id, rating, comment)
+
+    def on_review_saved(self, _):
+        QMessageBox.information(self, "✅ УСПЕХ", "Отзыв успешно добавлен!")
+        self.review_added.emit()
+        
+        self.order_id_edit.clear()
+        self.rating_spin.setValue(5)
+        self.comment_edit.clear()
 
 class MyReviewsPage(QWidget):
     def __init__(self, user, back_callback):
         super().__init__()
         self.user = user
         self.back_callback = back_callback
+        self.loaded = False
+        self.tasks = BackgroundTasks(self)
+        from history_view import HistoryTableModel, REVIEW_COLUMNS
+        self.model = HistoryTableModel(REVIEW_COLUMNS, 'review_date', self.fetch_more_reviews,
+                                       self.is_fetching, self.on_sort, self)
         self.setup_ui()
 
     def setup_ui(self):
-        self.setStyleSheet(f"background-color: {COLORS['primary_bg']};")
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
         
         title = QLabel("МОИ ОТЗЫВЫ")
-        title.setStyleSheet(f"""
-            font-size: 28px; 
-            color: {COLORS['accent_blue']}; 
-            font-weight: bold; 
-            margin-bottom: 20px;
-            font-family: 'Segoe UI';
-        """)
+        title.setObjectName("title")
         title.setAlignment(Qt.AlignCenter)
         
-        self.table = QTableWidget()
-        self.table.setStyleSheet(f"""
-            QTableWidget {{
-                background-color: {COLORS['secondary_bg']};
-                color: {COLORS['text_primary']};
-                gridline-color: {COLORS['border']};
-                border: 2px solid {COLORS['accent_blue']};
-                border-radius: 8px;
-                font-family: 'Segoe UI';
-            }}
-            QTableWidget::item {{
-                padding: 10px;
-                border-bottom: 1px solid {COLORS['border']};
-                color: {COLORS['text_primary']};
-            }}
-            QTableWidget::item:selected {{
-                background-color: {COLORS['accent_blue']};
-                color: {COLORS['text_primary']};
-            }}
-            QHeaderView::section {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                padding: 12px;
-                font-weight: bold;
-                border: none;
-                font-family: 'Segoe UI';
-            }}
-        """)
+        from history_view import setup_history_table
+        self.table = QTableView()
+        setup_history_table(self.table, self.model)
         
         btn_back = QPushButton("◀ НАЗАД В МЕНЮ")
-        btn_back.setStyleSheet(f"""
-            QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                border: none;
-                padding: 10px 20px;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: bold;
-                margin-top: 20px;
-                font-family: 'Segoe UI';
-            }}
-            QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #2563eb, stop:1 #7c3aed);
-            }}
-        """)
+        set_variant(btn_back, "back")
         btn_back.clicked.connect(self.back_callback)
         
+        self.status_label = QLabel("Загрузка отзывов...")
+        self.status_label.setObjectName("statusLabel")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        
         layout.addWidget(title)
+        layout.addWidget(self.status_label)
         layout.addWidget(self.table)
         layout.addWidget(btn_back)
         
         self.load_reviews()
 
+    def refresh(self):
+        self.load_reviews()
+
+    def on_sort(self, sort, descending):
+        self.load_reviews()
+
     def load_reviews(self):
-        try:
-            client_id = get_or_create_client_for_user(self.user['id'], self.user['username'])
-            reviews = get_client_reviews(client_id)
-            
-            self.table.setRowCount(len(reviews))
-            self.table.setColumnCount(4)
-            self.table.setHorizontalHeaderLabels(["Заказ", "Оценка", "Комментарий", "Дата"])
-            
-            for row, review in enumerate(reviews):
-                self.table.setItem(row, 0, QTableWidgetItem(f"Заказ #{review['order_id']}"))
-                
-                rating_stars = "★" * review['rating'] + "☆" * (5 - review['rating'])
-                self.table.setItem(row, 1, QTableWidgetItem(rating_stars))
-                
-                comment = review['comment'] if review['comment'] else "Без комментария"
-                self.table.setItem(row, 2, QTableWidgetItem(comment))
-                self.table.setItem(row, 3, QTableWidgetItem(str(review['review_date'])))
-            
-            self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-            self.table.resizeColumnToContents(1)
-            
-        except Exception as e:
-            QMessageBox.critical(self, "❌ ОШИБКА", f"Не удалось загрузить отзывы: {str(e)}")
+        self.loaded = False
+        self.tasks.cancel('more')
+        self.model.reset([])
+        self.status_label.show()
+        self.tasks.run('reviews', self.fetch_reviews, self.user, self.model.sort_key, self.model.descending, 0,
+                       on_result=self.show_reviews,
+                       on_error=self.on_load_error,
+                       on_finished=self.status_label.hide)
+
+    @staticmethod
+    def fetch_reviews(user, sort, descending, offset):
+        """Страница отзывов клиента (выполняется в фоновом потоке)"""
+        return get_client_reviews_page(get_session_client_id(user), sort, descending, offset)
+
+    def show_reviews(self, page):
+        self.loaded = True
+        self.model.reset(*page)
+
+    def on_load_error(self, e):
+        self.model.stop_fetching()
+        QMessageBox.critical(self, "❌ ОШИБКА", f"Не удалось загрузить отзывы: {str(e)}")
+
+    def is_fetching(self):
+        return self.tasks.is_running('reviews') or self.tasks.is_running('more')
+
+    def fetch_more_reviews(self, offset):
+        """Вызывается моделью (fetchMore), когда таблицу долистали до конца"""
+        self.tasks.run('more', self.fetch_reviews, self.user, self.model.sort_key, self.model.descending, offset,
+                       on_result=lambda page: self.model.append_page(*page),
+                       on_error=self.on_load_error)
 
 class MainWindow(QMainWindow):
+    # Страницы пользователя: создаются при первом переходе и живут до выхода из аккаунта
+    PAGE_CLASSES = {
+        'catalog': CarCatalogPage,
+        'orders': OrdersPage,
+        'reviews': ReviewsPage,
+        'my_reviews': MyReviewsPage,
+    }
+    # Через сколько секунд данные страницы перечитываются при следующем переходе на неё
+    PAGE_STALE_SECONDS = 120
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("AUTO DREAMS - ПРЕМИАЛЬНЫЕ АВТОМОБИЛИ")
         self.setMinimumSize(1200, 800)
         self.resize(1200, 800)
-        self.setStyleSheet(f"""
-            QMainWindow {{
-                background-color: {COLORS['primary_bg']};
-            }}
-            QMessageBox {{
-                background-color: {COLORS['secondary_bg']};
-                color: {COLORS['text_primary']};
-                border: 2px solid {COLORS['accent_blue']};
-                border-radius: 12px;
-                font-family: 'Segoe UI';
-            }}
-            QMessageBox QLabel {{
-                color: {COLORS['text_primary']};
-            }}
-            QMessageBox QPushButton {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 {COLORS['accent_blue']}, stop:1 {COLORS['accent_purple']});
-                color: {COLORS['text_primary']};
-                border: none;
-                padding: 8px 16px;
-                border-radius: 6px;
-                font-size: 14px;
-                font-weight: bold;
-                font-family: 'Segoe UI';
-            }}
-            QMessageBox QPushButton:hover {{
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #2563eb, stop:1 #7c3aed);
-            }}
-        """)
         
         self.stacked = QStackedWidget()
         self.setCentralWidget(self.stacked)
-        
-        # Страница входа
+        self.tasks = BackgroundTasks(self)
+        self.user = None
+        self.main_menu = None
+        self.pages = {}
+        self.page_refreshed_at = {}
+        self.stale_pages = set()
+        self.first_painted = False
+        
+        # Страница входа - единственная, которая нужна для первого кадра;
+        # регистрация строится при первом переходе на неё
         self.login_page = LoginPage(
             on_login_success=self.handle_login_success,
             go_register=self.show_register
         )
-        
-        # Страница регистрации
-        self.register_page = RegisterPage(go_login=self.show_login)
+        self.register_page = None
         
         self.stacked.addWidget(self.login_page)
-        self.stacked.addWidget(self.register_page)
         
         self.show_login()
     
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_painted:
+            self.first_painted = True
+            print(f"⏱ Окно показано через {timeline.mark('first_paint'):.0f} мс после запуска")
+            self.report_startup()
+    
+    def finish_startup(self):
+        """Вызывается из цикла событий сразу после первого показа окна"""
+        # Пул процессов для хеширования паролей и калибровка стоимости - до первого входа
+        hashing_service.start()
+        started = time.perf_counter()
+        self.tasks.run('schema', ensure_schema,
+                       on_result=lambda status: self.on_schema_ready(status, started),
+                       on_error=self.on_schema_error,
+                       cancel_on_hide=False)
+    
+    def on_schema_ready(self, status, started):
+        timeline.mark('db_ready')
+        print(f"⏱ Схема БД ({status}) за {(time.perf_counter() - started) * 1000:.0f} мс")
+        self.report_startup()
+    
+    def on_schema_error(self, e):
+        timeline.mark('db_error')
+        print(f"❌ Ошибка проверки схемы БД: {e}")
+        self.report_startup()
+    
+    def report_startup(self):
+        """Когда окно отрисовано и БД проверена - записывает хронологию запуска"""
+        if not (self.first_painted and (timeline.has('db_ready') or timeline.has('db_error'))):
+            return
+        timeline.write_log()
+        if PROFILE_STARTUP:
+            print(timeline.report())
+            QApplication.instance().quit()
+    
     def show_login(self):
         self.stacked.setCurrentWidget(self.login_page)
     
     def show_register(self):
+        if self.register_page is None:
+            self.register_page = RegisterPage(go_login=self.show_login)
+            self.stacked.addWidget(self.register_page)
         self.stacked.setCurrentWidget(self.register_page)
     
     def handle_login_success(self, user):
+        self.evict_pages()
         self.user = user
-        self.main_menu = MainMenuPage(user, logout_callback=self.show_login)
+        self.main_menu = MainMenuPage(user, logout_callback=self.logout)
         self.stacked.addWidget(self.main_menu)
         self.stacked.setCurrentWidget(self.main_menu)
     
+    def logout(self):
+        # Явный выход отменяет "Запомнить меня" только на этом терминале:
+        # метка сессий в БД общая, её сброс разлогинил бы все терминалы
+        clear_token()
+        self.show_login()
+        self.evict_pages()
+        self.user = None
+    
+    def evict_pages(self):
+        """Удаляет страницы пользователя: следующий вход начинает с чистого окна"""
+        pages = list(self.pages.values())
+        if self.main_menu is not None:
+            pages.append(self.main_menu)
+        for page in pages:
+            # Покупку или отзыв в полёте БД доведёт до конца, но ответ уже некому показать
+            for tasks in page.findChildren(BackgroundTasks):
+                tasks.cancel_all()
+            self.stacked.removeWidget(page)
+            page.deleteLater()
+        self.pages.clear()
+        self.page_refreshed_at.clear()
+        self.stale_pages.clear()
+        self.main_menu = None
+    
+    def create_page(self, name):
+        page = self.PAGE_CLASSES[name](self.user, back_callback=self.show_main_menu)
+        if name == 'catalog':
+            page.order_placed.connect(lambda: self.mark_stale('orders'))
+        elif name == 'reviews':
+            page.review_added.connect(lambda: self.mark_stale('my_reviews'))
+        return page
+    
+    def mark_stale(self, name):
+        """Данные страницы устарели - перечитаем их при следующем переходе"""
+        if name in self.pages:
+            self.stale_pages.add(name)
+    
+    def open_page(self, name):
+        page = self.pages.get(name)
+        now = time.monotonic()
+        if page is None:
+            page = self.pages[name] = self.create_page(name)
+            self.stacked.addWidget(page)
+            self.page_refreshed_at[name] = now
+        elif hasattr(page, 'refresh') and (
+                not page.loaded  # Загрузку прервал уход со страницы
+                or name in self.stale_pages
+                or now - self.page_refreshed_at[name] > self.PAGE_STALE_SECONDS):
+            self.stale_pages.discard(name)
+            self.page_refreshed_at[name] = now
+            page.refresh()
+        self.stacked.setCurrentWidget(page)
+    
     def show_car_catalog(self):
-        self.car_catalog = CarCatalogPage(self.user, back_callback=self.show_main_menu)
-        self.stacked.addWidget(self.car_catalog)
-        self.stacked.setCurrentWidget(self.car_catalog)
+        self.open_page('catalog')
     
     def show_orders_page(self):
-        self.orders_page = OrdersPage(self.user, back_callback=self.show_main_menu)
-        self.stacked.addWidget(self.orders_page)
-        self.stacked.setCurrentWidget(self.orders_page)
+        self.open_page('orders')
     
     def show_reviews_page(self):
-        self.reviews_page = ReviewsPage(self.user, back_callback=self.show_main_menu)
-        self.stacked.addWidget(self.reviews_page)
-        self.stacked.setCurrentWidget(self.reviews_page)
+        self.open_page('reviews')
     
     def show_my_reviews_page(self):
-        self.my_reviews_page = MyReviewsPage(self.user, back_callback=self.show_main_menu)
-        self.stacked.addWidget(self.my_reviews_page)
-        self.stacked.setCurrentWidget(self.my_reviews_page)
+        self.open_page('my_reviews')
     
     def show_main_menu(self):
         self.stacked.setCurrentWidget(self.main_menu)
 
 if __name__ == "__main__":
-    # Инициализируем базу данных
-    init_db()
-    
-    app = QApplication(sys.argv)
+    timeline.mark('imports')
+    app = QApplication([arg for arg in sys.argv if arg != '--profile-startup'])
+    apply_theme(app)
+    app.aboutToQuit.connect(hashing_service.shutdown)
+    timeline.mark('qapplication')
     window = MainWindow()
+    timeline.mark('window')
     window.show()
+    # Всё, что не нужно для первого кадра, - после того как окно показано
+    QTimer.singleShot(0, window.finish_startup)
     sys.exit(app.exec())
\ No newline at end of file
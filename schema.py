@@ -0,0 +1,72 @@
+import json
+import os
+from typing import Dict
+
+import backend
+
+# Версия схемы, которую создают init_db/init_car_db. Увеличивайте при каждом
+# изменении таблиц или индексов - тогда при следующем запуске схема обновится.
+SCHEMA_VERSION = 6
+
+# Здесь запоминается, что база уже в актуальной версии, - чтобы при запуске
+# не ходить в БД вообще. Удалите файл, чтобы проверить схему заново.
+SCHEMA_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.schema_version.json')
+
+
+def _database_id() -> str:
+    """Какая именно база используется (кэш версии хранится отдельно для каждой)"""
+    if backend.BACKEND == 'sqlite':
+        import sqlite_db
+        return f"sqlite:{os.path.abspath(sqlite_db.DB_PATH)}"
+    import db_connection
+    return f"mssql:{db_connection.SERVER}/{db_connection.DATABASE}"
+
+
+def _load_cache() -> Dict[str, int]:
+    try:
+        with open(SCHEMA_CACHE_FILE, encoding='utf-8') as f:
+            cached = json.load(f)
+        return cached if isinstance(cached, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(database_id: str, version: int):
+    cached = _load_cache()
+    cached[database_id] = version
+    try:
+        with open(SCHEMA_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cached, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"❌ Не удалось сохранить версию схемы: {e}")
+
+
+def forget_schema_cache():
+    """Следующий ensure_schema() заново сверится с базой"""
+    try:
+        os.remove(SCHEMA_CACHE_FILE)
+    except OSError:
+        pass
+
+
+def ensure_schema() -> str:
+    """Приводит схему БД к SCHEMA_VERSION.
+
+    Возвращает, как это было сделано:
+      'cached'   - версия уже подтверждена ранее, в БД не обращались;
+      'checked'  - версия в БД совпала (один запрос);
+      'migrated' - выполнены init_db/init_car_db и записана новая версия.
+    """
+    database_id = _database_id()
+    if _load_cache().get(database_id) == SCHEMA_VERSION:
+        return 'cached'
+
+    if backend.get_schema_version() >= SCHEMA_VERSION:
+        _save_cache(database_id, SCHEMA_VERSION)
+        return 'checked'
+
+    if not (backend.init_db() and backend.init_car_db()):
+        raise RuntimeError("не удалось создать таблицы или индексы, подробности выше")
+    backend.set_schema_version(SCHEMA_VERSION)
+    _save_cache(database_id, SCHEMA_VERSION)
+    return 'migrated'
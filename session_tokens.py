@@ -0,0 +1,99 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from typing import Any, Dict, Optional
+
+# Токен "Запомнить меня" хранится на терминале и подписан локальным ключом.
+# Отозвать его можно из БД: в токене лежит users.session_nonce, и при входе
+# он сверяется с текущим значением в таблице users.
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+KEY_FILE = os.path.join(APP_DIR, '.session_key')
+TOKEN_FILE = os.path.join(APP_DIR, '.session_token')
+TOKEN_TTL = 12 * 60 * 60  # Одна смена
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _secret_key() -> bytes:
+    try:
+        with open(KEY_FILE, 'rb') as f:
+            key = f.read()
+        if len(key) >= 32:
+            return key
+    except OSError:
+        pass
+    key = secrets.token_bytes(32)
+    with open(KEY_FILE, 'wb') as f:
+        f.write(key)
+    try:
+        os.chmod(KEY_FILE, 0o600)
+    except OSError:
+        pass
+    return key
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_secret_key(), payload.encode('ascii'), hashlib.sha256).digest())
+
+
+def create_token(user_id: int, username: str, nonce: str, ttl: int = TOKEN_TTL) -> str:
+    claims = {'uid': user_id, 'username': username, 'nonce': nonce, 'exp': int(time.time()) + ttl}
+    payload = _b64encode(json.dumps(claims, ensure_ascii=False).encode('utf-8'))
+    return f"{payload}.{_sign(payload)}"
+
+
+def parse_token(token: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Данные токена, если подпись верна и срок не истёк; иначе None"""
+    if not token or '.' not in token:
+        return None
+    payload, signature = token.rsplit('.', 1)
+    try:
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, UnicodeError):
+        return None
+    if claims.get('exp', 0) < time.time():
+        return None
+    return claims
+
+
+def save_token(token: str):
+    try:
+        with open(TOKEN_FILE, 'w', encoding='ascii') as f:
+            f.write(token)
+    except OSError as e:
+        print(f"❌ Не удалось сохранить сессию: {e}")
+
+
+def load_token() -> Optional[str]:
+    try:
+        with open(TOKEN_FILE, encoding='ascii') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def clear_token():
+    try:
+        os.remove(TOKEN_FILE)
+    except OSError:
+        pass
+
+
+def saved_session() -> Optional[Dict[str, Any]]:
+    """Действующая сохранённая сессия этого терминала (проверка без обращения к БД)"""
+    claims = parse_token(load_token())
+    if claims is None:
+        clear_token()
+    return claims
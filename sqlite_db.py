@@ -0,0 +1,535 @@
+import os
+import random
+import secrets
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from cache import TTLCache
+from db_common import (
+    CARS_PAGE_SIZE, DUPLICATE_USER_ERROR, FACET_BRAND, FACET_MODEL, FACET_PRICE_BAND, FACET_TOTAL,
+    HISTORY_PAGE_SIZE, INSERT_USER_SQL, REHASH_PASSWORD_SQL, REVOKE_SESSIONS_SQL, SESSION_USER_SQL, UPDATE_PASSWORD_SQL,
+    cars_page_sql, facets_from_rows, facets_without, insert_users_batched, orders_order_by,
+    price_band_sql, query_taken_logins, reviews_order_by, split_page,
+)
+from db_pool import ConnectionPool
+from db_rows import Record, fetch_record, fetch_records
+from hashing import hash_password, verify_password
+
+# Локальное хранилище на SQLite - тот же набор функций, что в car_db и auth_db.
+# Нужен для филиалов без доступа к SQL Server, для бенчмарков и профилирования.
+DB_PATH = os.environ.get(
+    'AUTO_DREAMS_SQLITE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'auto_dreams.db')
+)
+
+# Фасеты каталога кэшируются и уменьшаются при продаже, как в car_db
+FACETS_CACHE_TTL = 60
+_facets_cache = TTLCache(FACETS_CACHE_TTL, max_entries=1)
+
+# Массовый импорт: старые сборки SQLite принимают не больше 999 параметров
+BULK_CHECK_CHUNK = 400
+BULK_INSERT_BATCH = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT UNIQUE NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    salt TEXT NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    session_nonce TEXT
+);
+CREATE TABLE IF NOT EXISTS CARS (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    brand TEXT NOT NULL,
+    model TEXT NOT NULL,
+    vin TEXT UNIQUE NOT NULL,
+    price REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'в наличии'
+);
+CREATE TABLE IF NOT EXISTS EMPLOYEES (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS CLIENTS (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    phone TEXT,
+    user_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS ORDERS (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id INTEGER NOT NULL REFERENCES CLIENTS (id),
+    car_id INTEGER NOT NULL REFERENCES CARS (id),
+    employee_id INTEGER NOT NULL REFERENCES EMPLOYEES (id),
+    sale_date TEXT NOT NULL,
+    final_price REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS REVIEWS (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id INTEGER NOT NULL REFERENCES CLIENTS (id),
+    order_id INTEGER NOT NULL REFERENCES ORDERS (id),
+    rating INTEGER NOT NULL,
+    comment TEXT,
+    review_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IX_CARS_status_price_id ON CARS (status, price, id);
+CREATE INDEX IF NOT EXISTS IX_CARS_status_brand_id ON CARS (status, brand, model, id);
+CREATE INDEX IF NOT EXISTS IX_CARS_status_brand_model_price ON CARS (status, brand, model, price);
+CREATE UNIQUE INDEX IF NOT EXISTS UX_CLIENTS_user_id ON CLIENTS (user_id) WHERE user_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS IX_ORDERS_client_id ON ORDERS (client_id);
+CREATE INDEX IF NOT EXISTS IX_ORDERS_client_id_sale_date ON ORDERS (client_id, sale_date, id);
+CREATE INDEX IF NOT EXISTS IX_REVIEWS_client_id ON REVIEWS (client_id, review_date);
+"""
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+pool = ConnectionPool(_connect, max_size=5)
+
+
+def get_conn():
+    """Соединение из пула: ``with get_conn() as conn: ...``"""
+    return pool.connection()
+
+
+def pool_stats() -> Dict[str, Any]:
+    return pool.stats()
+
+
+def use_database(path: str):
+    """Переключает модуль на другой файл БД (бенчмарки, тесты производительности)"""
+    global DB_PATH
+    pool.close_all()
+    DB_PATH = path
+    _employee_ids.clear()
+
+
+def init_db() -> bool:
+    """Создание всех таблиц и индексов"""
+    try:
+        with get_conn() as conn:
+            conn.executescript(SCHEMA)
+            # Базы, созданные до появления колонки session_nonce
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(users)")]
+            if 'session_nonce' not in columns:
+                conn.execute("ALTER TABLE users ADD COLUMN session_nonce TEXT")
+            print("✅ Таблицы SQLite готовы")
+            return True
+    except Exception as e:
+        print(f"❌ Ошибка инициализации БД: {e}")
+        return False
+
+
+def init_car_db() -> bool:
+    """Индексы каталога создаются вместе со схемой в init_db"""
+    return True
+
+
+def get_schema_version() -> int:
+    """Версия схемы хранится в заголовке файла БД (PRAGMA user_version)"""
+    with get_conn() as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def set_schema_version(version: int):
+    with get_conn() as conn:
+        conn.execute(f"PRAGMA user_version = {int(version)}")
+
+
+def seed_demo_data(cars: int = 50, employees: int = 5, seed: int = 42):
+    """Заполняет пустую базу воспроизводимыми демо-данными"""
+    rnd = random.Random(seed)
+    models = [
+        ('Toyota', 'Camry'), ('Honda', 'CR-V'), ('BMW', 'X5'), ('Mercedes', 'E-Class'),
+        ('Audi', 'Q7'), ('Lexus', 'RX'), ('Hyundai', 'Tucson'), ('Kia', 'Sportage'),
+    ]
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM CARS")
+        if cursor.fetchone()[0]:
+            return
+        cursor.executemany(
+            "INSERT INTO EMPLOYEES (first_name, last_name) VALUES (?, ?)",
+            [(f"Продавец{i}", "Демо") for i in range(1, employees + 1)]
+        )
+        cursor.executemany(
+            "INSERT INTO CARS (brand, model, vin, price, status) VALUES (?, ?, ?, ?, 'в наличии')",
+            [
+                (*rnd.choice(models), f"VIN{seed:04d}{i:09d}", rnd.randrange(1_500_000, 12_000_000, 10_000))
+                for i in range(cars)
+            ]
+        )
+
+
+def get_all_cars() -> List[Record]:
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM CARS WHERE status = 'в наличии'")
+            return fetch_records(cursor)
+    except Exception as e:
+        print(f"Ошибка при получении автомобилей: {e}")
+        return []
+
+
+def get_cars_page(filters: Optional[Dict[str, Any]] = None, sort: str = 'id',
+                  after_key: Optional[Tuple[Any, int]] = None,
+                  limit: int = CARS_PAGE_SIZE) -> Tuple[List[Record], Optional[Tuple[Any, int]]]:
+    """Страница каталога с keyset-пагинацией (см. car_db.get_cars_page)"""
+    column, where, order_by, params = cars_page_sql(filters or {}, sort, after_key)
+    query = f"SELECT * FROM CARS WHERE {where} ORDER BY {order_by} LIMIT {int(limit) + 1}"
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            cars = fetch_records(cursor)
+    except Exception as e:
+        print(f"Ошибка при получении страницы каталога: {e}")
+        # Пустой результат неотличим от пустого каталога - ошибку получает страница (on_load_error)
+        raise
+
+    return split_page(cars, column, limit)
+
+
+# В SQLite нет GROUPING SETS - те же наборы группировки через UNION ALL,
+# номера facet совпадают с GROUPING_ID в car_db (см. db_common)
+_FACETS_SQL = f"""
+    WITH available AS (
+        SELECT brand, model, {price_band_sql()} AS price_band
+        FROM CARS WHERE status = 'в наличии'
+    )
+    SELECT brand, model, NULL AS price_band, COUNT(*) AS cars, {FACET_MODEL} AS facet FROM available GROUP BY brand, model
+    UNION ALL
+    SELECT brand, NULL, NULL, COUNT(*), {FACET_BRAND} FROM available GROUP BY brand
+    UNION ALL
+    SELECT NULL, NULL, price_band, COUNT(*), {FACET_PRICE_BAND} FROM available GROUP BY price_band
+    UNION ALL
+    SELECT NULL, NULL, NULL, COUNT(*), {FACET_TOTAL} FROM available
+"""
+
+
+def get_catalog_facets() -> Dict[str, Any]:
+    """Счётчики машин в наличии для навигации по каталогу (см. car_db.get_catalog_facets)"""
+    hit, facets = _facets_cache.lookup('facets')
+    if hit:
+        return facets
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_FACETS_SQL)
+            facets = facets_from_rows(fetch_records(cursor))
+    except Exception as e:
+        print(f"Ошибка при подсчёте фасетов каталога: {e}")
+        raise
+    _facets_cache.put('facets', facets)
+    return facets
+
+
+def get_client_orders(client_id: int) -> List[Record]:
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT o.*, c.brand, c.model, c.vin, emp.first_name || ' ' || emp.last_name as employee_name
+                FROM ORDERS o
+                JOIN CARS c ON o.car_id = c.id
+                JOIN EMPLOYEES emp ON o.employee_id = emp.id
+                WHERE o.client_id = ?
+            """, (client_id,))
+            return fetch_records(cursor)
+    except Exception as e:
+        print(f"Ошибка при получении заказов: {e}")
+        return []
+
+
+def get_client_orders_page(client_id: int, sort: str = 'sale_date', descending: bool = True,
+                           offset: int = 0, limit: int = HISTORY_PAGE_SIZE) -> Tuple[List[Record], bool]:
+    """Страница заказов клиента (см. car_db.get_client_orders_page)"""
+    order_by = orders_order_by(sort, descending)
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT o.*, c.brand, c.model, c.vin, emp.first_name || ' ' || emp.last_name as employee_name
+                FROM ORDERS o
+                JOIN CARS c ON o.car_id = c.id
+                JOIN EMPLOYEES emp ON o.employee_id = emp.id
+                WHERE o.client_id = ?
+                ORDER BY {order_by}
+                LIMIT ? OFFSET ?
+            """, (client_id, int(limit) + 1, int(offset)))
+            orders = fetch_records(cursor)
+    except Exception as e:
+        print(f"Ошибка при получении заказов: {e}")
+        raise
+    return orders[:limit], len(orders) > limit
+
+
+def add_review(client_id: int, order_id: int, rating: int, comment: str):
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO REVIEWS (client_id, order_id, rating, comment, review_date) "
+                "VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)",
+                (client_id, order_id, rating, comment)
+            )
+    except Exception as e:
+        print(f"Ошибка при добавлении отзыва: {e}")
+        raise
+
+
+def get_client_reviews(client_id: int) -> List[Record]:
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT r.*, c.brand, c.model
+                FROM REVIEWS r
+                JOIN ORDERS o ON r.order_id = o.id
+                JOIN CARS c ON o.car_id = c.id
+                WHERE r.client_id = ?
+                ORDER BY r.review_date DESC
+            """, (client_id,))
+            return fetch_records(cursor)
+    except Exception as e:
+        print(f"Ошибка при получении отзывов: {e}")
+        return []
+
+
+def get_client_reviews_page(client_id: int, sort: str = 'review_date', descending: bool = True,
+                            offset: int = 0, limit: int = HISTORY_PAGE_SIZE) -> Tuple[List[Record], bool]:
+    """Страница отзывов клиента (см. car_db.get_client_orders_page)"""
+    order_by = reviews_order_by(sort, descending)
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT r.*, c.brand, c.model
+                FROM REVIEWS r
+                JOIN ORDERS o ON r.order_id = o.id
+                JOIN CARS c ON o.car_id = c.id
+                WHERE r.client_id = ?
+                ORDER BY {order_by}
+                LIMIT ? OFFSET ?
+            """, (client_id, int(limit) + 1, int(offset)))
+            reviews = fetch_records(cursor)
+    except Exception as e:
+        print(f"Ошибка при получении отзывов: {e}")
+        raise
+    return reviews[:limit], len(reviews) > limit
+
+
+_employee_ids: List[int] = []
+_employee_lock = threading.Lock()
+_next_employee = 0
+
+
+def _next_employee_id(cursor) -> int:
+    global _next_employee
+    with _employee_lock:
+        if not _employee_ids:
+            cursor.execute("SELECT id FROM EMPLOYEES ORDER BY id")
+            _employee_ids.extend(row[0] for row in cursor.fetchall())
+        if not _employee_ids:
+            return 1
+        employee_id = _employee_ids[_next_employee % len(_employee_ids)]
+        _next_employee += 1
+        return employee_id
+
+
+def create_order(client_id: int, car_id: int, employee_id: Optional[int] = None) -> int:
+    """Оформляет покупку в одной транзакции и возвращает id заказа"""
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            if employee_id is None:
+                employee_id = _next_employee_id(cursor)
+            cursor.execute("UPDATE CARS SET status = 'продан' WHERE id = ? AND status = 'в наличии'", (car_id,))
+            if cursor.rowcount == 0:
+                _facets_cache.invalidate()
+                raise Exception("Автомобиль уже продан")
+            cursor.execute(
+                "INSERT INTO ORDERS (client_id, car_id, employee_id, sale_date, final_price) "
+                "SELECT ?, id, ?, CURRENT_TIMESTAMP, price FROM CARS WHERE id = ?",
+                (client_id, employee_id, car_id)
+            )
+            order_id = cursor.lastrowid
+            cursor.execute("SELECT brand, model, price FROM CARS WHERE id = ?", (car_id,))
+            sold = cursor.fetchone()
+        _facets_cache.patch(lambda key, facets: facets_without(facets, *sold))
+        return order_id
+    except Exception as e:
+        print(f"Ошибка при создании заказа: {e}")
+        raise
+
+
+def get_or_create_client_for_user(user_id: int, username: str) -> int:
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id FROM CLIENTS WHERE user_id = ?", (user_id,))
+            client = cursor.fetchone()
+            if client:
+                return client[0]
+            cursor.execute(
+                "UPDATE CLIENTS SET user_id = ? WHERE id = "
+                "(SELECT id FROM CLIENTS WHERE user_id IS NULL AND first_name = ? LIMIT 1)",
+                (user_id, username)
+            )
+            if cursor.rowcount == 0:
+                cursor.execute(
+                    "INSERT INTO CLIENTS (user_id, first_name, last_name, phone) "
+                    "VALUES (?, ?, 'User', '+7-000-000-00-00') ON CONFLICT DO NOTHING",
+                    (user_id, username)
+                )
+            cursor.execute("SELECT id FROM CLIENTS WHERE user_id = ?", (user_id,))
+            return cursor.fetchone()[0]
+    except Exception as e:
+        print(f"Ошибка при получении/создании клиента: {e}")
+        raise
+
+
+def get_session_client_id(user: Dict[str, Any]) -> int:
+    """id клиента для сессии: определяется один раз и запоминается в user['client_id']"""
+    client_id = user.get('client_id')
+    if client_id is None:
+        client_id = user['client_id'] = get_or_create_client_for_user(user['id'], user['username'])
+    return client_id
+
+
+def _is_available(column: str, value: str) -> bool:
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT 1 FROM users WHERE {column} = ? LIMIT 1", (value.strip(),))
+        return cursor.fetchone() is None
+
+
+def is_username_available(username: str, use_free_cache: bool = True) -> bool:
+    """Свободен ли логин (локальный файл - без кэша ответов)"""
+    return _is_available('username', username)
+
+
+def is_email_available(email: str, use_free_cache: bool = True) -> bool:
+    """Свободен ли email (локальный файл - без кэша ответов)"""
+    return _is_available('email', email)
+
+
+def create_user(username: str, email: str, password: str):
+    """Создание нового пользователя"""
+    try:
+        # Дубликат отсекаем до дорогого хеширования
+        if not is_username_available(username):
+            raise ValueError("Логин уже занят")
+        if not is_email_available(email):
+            raise ValueError("Email уже зарегистрирован")
+
+        password_hash, salt = hash_password(password)
+
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(INSERT_USER_SQL, (username, email, password_hash, salt))
+
+    except ValueError as e:
+        raise Exception(str(e))
+    except sqlite3.IntegrityError:
+        raise Exception(DUPLICATE_USER_ERROR)
+    except Exception as e:
+        raise Exception(f"Ошибка при создании пользователя: {str(e)}")
+
+
+def find_taken_logins(usernames: Iterable[str], emails: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+    """Какие из логинов и email уже заняты - (логины, email) в нижнем регистре"""
+    with get_conn() as conn:
+        return query_taken_logins(conn.cursor(), usernames, emails, BULK_CHECK_CHUNK)
+
+
+def create_users_bulk(rows: List[Tuple[str, str, str, str]]) -> List[Optional[str]]:
+    """Вставка уже захешированных пользователей пачками; None - создан, иначе текст ошибки"""
+    with get_conn() as conn:
+        return insert_users_batched(conn, conn.cursor(), rows, BULK_INSERT_BATCH, sqlite3.IntegrityError)
+
+
+def find_user_by_login_or_email(login: str) -> Optional[Dict[str, Any]]:
+    """Поиск пользователя по логину или email"""
+    # Два поиска по уникальным индексам вместо username = ? OR email = ?
+    columns = ('email', 'username') if '@' in login else ('username', 'email')
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            for column in columns:
+                cursor.execute(
+                    f"SELECT id, username, email, password_hash, salt FROM users WHERE {column} = ?",
+                    (login,)
+                )
+                user = fetch_record(cursor)
+                if user:
+                    return user.to_dict()
+            return None
+
+    except Exception as e:
+        print(f"❌ Ошибка поиска пользователя: {e}")
+        return None
+
+
+def issue_session_nonce(user_id: int) -> str:
+    """Метка сессий пользователя для токена "Запомнить меня" (создаётся при первом запросе)"""
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE users SET session_nonce = COALESCE(session_nonce, ?) WHERE id = ?",
+            (secrets.token_hex(16), user_id)
+        )
+        cursor.execute("SELECT session_nonce FROM users WHERE id = ?", (user_id,))
+        return cursor.fetchone()[0]
+
+
+def find_user_by_session(user_id: int, nonce: str) -> Optional[Dict[str, Any]]:
+    """Пользователь по сохранённой сессии - поиск по первичному ключу, без проверки пароля"""
+    try:
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SESSION_USER_SQL, (user_id, nonce))
+            user = fetch_record(cursor)
+            return user.to_dict() if user else None
+    except Exception as e:
+        print(f"❌ Ошибка проверки сессии: {e}")
+        return None
+
+
+def revoke_sessions(user_id: int):
+    """Отзывает все сохранённые входы пользователя на всех терминалах"""
+    with get_conn() as conn:
+        conn.execute(REVOKE_SESSIONS_SQL, (user_id,))
+
+
+def update_password(user_id: int, password: str):
+    """Смена пароля: новый хеш, сохранённые входы на всех терминалах отзываются"""
+    password_hash, salt = hash_password(password)
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute(UPDATE_PASSWORD_SQL, (password_hash, salt, user_id))
+
+
+def rehash_password(user_id: int, password: str):
+    """Пересчитывает хеш того же пароля с текущими параметрами (после повышения стоимости)"""
+    password_hash, salt = hash_password(password)
+    with get_conn() as conn:
+        cursor = conn.cursor()
+        cursor.execute(REHASH_PASSWORD_SQL, (password_hash, salt, user_id))
+
+
+if __name__ == "__main__":
+    init_db()
+    seed_demo_data()
+    print(f"✅ База {DB_PATH} готова")
@@ -0,0 +1,78 @@
+"""Хронология запуска приложения.
+
+main.py импортирует этот модуль первым, поэтому STARTED_AT - момент,
+когда интерпретатор дошёл до кода приложения. Дальше main отмечает этапы:
+
+    imports      - импорт модулей приложения и PySide6
+    qapplication - создан QApplication и применена тема
+    window       - построено главное окно (только страница входа)
+    first_paint  - окно впервые отрисовано
+    db_ready     - схема БД проверена (или db_error)
+
+Каждый запуск дописывается одной JSON-строкой в STARTUP_LOG. С флагом
+--profile-startup приложение печатает разбивку по этапам и завершается.
+"""
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+STARTED_AT = time.perf_counter()
+
+STARTUP_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup.log')
+
+PHASE_TITLES = {
+    'imports': "Импорт модулей",
+    'qapplication': "QApplication и тема",
+    'window': "Главное окно",
+    'first_paint': "Первая отрисовка",
+    'db_ready': "Проверка схемы БД",
+    'db_error': "Ошибка проверки схемы БД",
+}
+
+
+class StartupTimeline:
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, phase: str) -> float:
+        """Отмечает окончание этапа; возвращает мс от запуска"""
+        now = time.perf_counter()
+        self.marks.append((phase, now))
+        return (now - self.started_at) * 1000
+
+    def has(self, phase: str) -> bool:
+        return any(name == phase for name, _ in self.marks)
+
+    def elapsed_ms(self) -> Dict[str, float]:
+        return {phase: (at - self.started_at) * 1000 for phase, at in self.marks}
+
+    def breakdown(self) -> List[Tuple[str, float, float]]:
+        """(этап, длительность этапа, мс от запуска) в порядке отметок"""
+        rows = []
+        previous = self.started_at
+        for phase, at in sorted(self.marks, key=lambda mark: mark[1]):
+            rows.append((phase, (at - previous) * 1000, (at - self.started_at) * 1000))
+            previous = at
+        return rows
+
+    def report(self) -> str:
+        lines = ["Запуск по этапам:"]
+        for phase, duration, total in self.breakdown():
+            lines.append(f"  {PHASE_TITLES.get(phase, phase):<28} {duration:8.1f} мс  (с запуска {total:8.1f} мс)")
+        return "\n".join(lines)
+
+    def write_log(self, path: str = STARTUP_LOG):
+        entry = {
+            'at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'phases_ms': {phase: round(ms, 1) for phase, ms in self.elapsed_ms().items()},
+        }
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"❌ Не удалось записать журнал запуска: {e}")
+
+
+timeline = StartupTimeline(STARTED_AT)
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# Модули приложения лежат в корне репозитория
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Модели Qt проверяются без окон
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+# backend.py работает с локальным файлом SQLite, а не с SQL Server
+os.environ.setdefault('AUTO_DREAMS_BACKEND', 'sqlite')
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    QtWidgets = pytest.importorskip('PySide6.QtWidgets')
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
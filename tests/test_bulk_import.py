@@ -0,0 +1,111 @@
+import csv
+import sys
+
+import pytest
+
+import bulk_import
+import sqlite_db
+from hashing import HashingService
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    original_path = sqlite_db.DB_PATH
+    sqlite_db.use_database(str(tmp_path / 'import.db'))
+    sqlite_db.init_db()
+    monkeypatch.setattr(bulk_import, 'find_taken_logins', sqlite_db.find_taken_logins)
+    monkeypatch.setattr(bulk_import, 'create_users_bulk', sqlite_db.create_users_bulk)
+    # Минимальная стоимость PBKDF2, чтобы тест не ждал калибровки на 0.25 с
+    service = HashingService(target_seconds=0)
+    monkeypatch.setattr(bulk_import, 'hashing_service', service)
+    yield sqlite_db
+    service.shutdown()
+    sqlite_db.use_database(original_path)
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(bulk_import.FIELDS)
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_read_csv_numbers_lines_after_header(tmp_path):
+    path = write_csv(tmp_path / 'users.csv', [('anna', 'anna@example.com', 'secret1'), ('boris', 'b@example.com', '')])
+
+    rows = bulk_import.read_rows(path)
+
+    assert [row['line'] for row in rows] == [2, 3]
+    assert rows[0]['username'] == 'anna'
+
+
+def test_read_jsonl_marks_broken_lines(tmp_path):
+    path = tmp_path / 'users.jsonl'
+    path.write_text('{"username": "anna", "email": "anna@example.com", "password": "secret1"}\n'
+                    '\n'
+                    '{broken\n'
+                    '[1, 2]\n', encoding='utf-8')
+
+    rows = bulk_import.read_rows(str(path))
+
+    assert [row['line'] for row in rows] == [1, 3, 4]
+    assert rows[0]['email'] == 'anna@example.com'
+    assert rows[1]['error'].startswith("Некорректный JSON")
+    assert rows[2]['error'] == "Ожидается JSON-объект"
+
+
+@pytest.mark.parametrize('row, error', [
+    ({'username': 'anna', 'email': 'anna@example.com', 'password': 'secret1'}, None),
+    ({'username': 'anna', 'email': 'anna@example.com'}, "Заполнены не все поля"),
+    ({'username': 'an', 'email': 'anna@example.com', 'password': 'secret1'}, "Логин должен быть не короче 3 символов"),
+    ({'username': 'anna', 'email': 'anna.example.com', 'password': 'secret1'}, "Некорректный email"),
+    ({'username': 'anna', 'email': 'anna@example.com', 'password': '12345'}, "Пароль должен быть не короче 6 символов"),
+    ({'error': "Некорректный JSON"}, "Некорректный JSON"),
+])
+def test_validate(row, error):
+    assert bulk_import.validate(row) == error
+
+
+def test_import_creates_new_users_and_skips_duplicates(store):
+    store.create_user('taken', 'taken@example.com', 'password')
+    rows = [
+        {'line': 2, 'username': 'anna', 'email': 'anna@example.com', 'password': 'secret1'},
+        {'line': 3, 'username': 'ANNA', 'email': 'other@example.com', 'password': 'secret1'},
+        {'line': 4, 'username': 'taken', 'email': 'new@example.com', 'password': 'secret1'},
+        {'line': 5, 'username': 'boris', 'email': 'taken@example.com', 'password': 'secret1'},
+        {'line': 6, 'username': 'bo', 'email': 'bo@example.com', 'password': 'secret1'},
+    ]
+
+    results = bulk_import.import_users(rows)
+
+    assert [(r['line'], r['status'], r['message']) for r in results] == [
+        (2, 'created', ''),
+        (3, 'skipped', "Повтор логина или email в файле"),
+        (4, 'skipped', "Логин уже занят"),
+        (5, 'skipped', "Email уже зарегистрирован"),
+        (6, 'skipped', "Логин должен быть не короче 3 символов"),
+    ]
+    user = store.find_user_by_login_or_email('anna')
+    assert store.verify_password('secret1', user['password_hash'], user['salt'])
+
+
+def test_main_writes_report_next_to_input(store, tmp_path, monkeypatch):
+    path = write_csv(tmp_path / 'clients.csv', [('anna', 'anna@example.com', 'secret1')])
+    monkeypatch.setattr(sys, 'argv', ['bulk_import.py', path])
+
+    bulk_import.main()
+
+    with open(path + '.report.csv', encoding='utf-8-sig', newline='') as f:
+        report = list(csv.DictReader(f))
+    assert [(r['line'], r['username'], r['status']) for r in report] == [('2', 'anna', 'created')]
+
+
+def test_report_round_trips_results(tmp_path):
+    results = [{'line': 2, 'username': 'anna', 'email': 'anna@example.com', 'status': 'created', 'message': ''}]
+    path = str(tmp_path / 'report.csv')
+
+    bulk_import.write_report(results, path)
+
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        assert list(csv.DictReader(f)) == [{k: str(v) for k, v in results[0].items()}]
@@ -0,0 +1,52 @@
+from cache import DROP, TTLCache
+
+
+def test_patch_updates_drops_and_keeps_entries():
+    cache = TTLCache(ttl=60)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.put('c', 3)
+
+    cache.patch(lambda key, value: DROP if key == 'b' else value * 10 if key == 'a' else value)
+
+    assert cache.lookup('a') == (True, 10)
+    assert cache.lookup('b') == (False, None)
+    assert cache.lookup('c') == (True, 3)
+    assert cache.stats()['patches'] == 1
+
+
+def test_patch_does_not_extend_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('cache.time.monotonic', lambda: now[0])
+    cache = TTLCache(ttl=60)
+    cache.put('facets', {'total': 5})
+
+    now[0] += 50
+    cache.patch(lambda key, value: {'total': value['total'] - 1})
+    assert cache.lookup('facets') == (True, {'total': 4})
+
+    now[0] += 20
+    assert cache.lookup('facets') == (False, None)
+    assert cache.stats()['expired'] == 1
+
+
+def test_patch_keeps_value_object_when_unchanged():
+    cache = TTLCache(ttl=60)
+    value = ['car']
+    cache.put('page', value)
+
+    cache.patch(lambda key, current: current)
+
+    assert cache.lookup('page')[1] is value
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.lookup('a')
+    cache.put('c', 3)
+
+    assert cache.lookup('b') == (False, None)
+    assert cache.lookup('a') == (True, 1)
+    assert cache.lookup('c') == (True, 3)
@@ -0,0 +1,82 @@
+import random
+
+from catalog_search import CatalogIndex, tokenize
+
+CARS = [
+    {'id': 1, 'brand': 'Toyota', 'model': 'Land Cruiser', 'vin': 'JT3HN86R0X0123456', 'price': 9_500_000},
+    {'id': 2, 'brand': 'Toyota', 'model': 'Camry', 'vin': 'JT2BF22K1Y0234567', 'price': 3_200_000},
+    {'id': 3, 'brand': 'Honda', 'model': 'CR-V', 'vin': 'SHSRD78875U345678', 'price': 2_900_000},
+    {'id': 4, 'brand': 'BMW', 'model': '3 Series', 'vin': 'WBA3A5C50CF456789', 'price': 4_100_000},
+    {'id': 5, 'brand': 'Land Rover', 'model': 'Defender', 'vin': 'SALLDHMA7AA567890', 'price': 8_700_000},
+]
+
+
+def found(index, *args, **kwargs):
+    return [car['id'] for car in index.search(*args, **kwargs)]
+
+
+def test_tokenize_splits_on_separators():
+    assert tokenize("CR-V  Land_Cruiser/3.0") == ['cr', 'v', 'land', 'cruiser', '3', '0']
+
+
+def test_search_by_word_prefixes_in_any_field():
+    index = CatalogIndex(CARS)
+
+    assert found(index, "toy") == [1, 2]
+    assert found(index, "LAND") == [1, 5]
+    assert found(index, "land cru") == [1]
+    assert found(index, "cr-v") == [3]
+    assert found(index, "WBA3") == [4]
+    assert found(index, "toyota honda") == []
+    assert found(index, "zz") == []
+
+
+def test_empty_query_returns_all_cars_in_original_order():
+    assert found(CatalogIndex(CARS), "") == [1, 2, 3, 4, 5]
+
+
+def test_price_range_is_inclusive():
+    index = CatalogIndex(CARS)
+
+    assert found(index, min_price=3_200_000, max_price=8_700_000) == [2, 4, 5]
+    assert found(index, "land", max_price=9_000_000) == [5]
+    assert found(index, min_price=10_000_000) == []
+
+
+def test_discard_hides_sold_car():
+    index = CatalogIndex(CARS)
+
+    index.discard(1)
+    index.discard(999)
+
+    assert found(index, "land") == [5]
+    assert len(index) == 4
+
+
+def test_search_matches_brute_force():
+    rnd = random.Random(3)
+    words = ['alpha', 'alpine', 'beta', 'bravo', 'camry', 'cr-v', 'x5', 'x3']
+    cars = [
+        {'id': i, 'brand': rnd.choice(words), 'model': rnd.choice(words),
+         'vin': f"VIN{i:05d}", 'price': rnd.randrange(0, 100)}
+        for i in range(500)
+    ]
+    index = CatalogIndex(cars)
+
+    def brute(text, low, high):
+        query = tokenize(text)
+        result = []
+        for car in cars:
+            car_tokens = tokenize(f"{car['brand']} {car['model']} {car['vin']}")
+            if not all(any(token.startswith(word) for token in car_tokens) for word in query):
+                continue
+            if low is not None and car['price'] < low or high is not None and car['price'] > high:
+                continue
+            result.append(car['id'])
+        return result
+
+    for _ in range(300):
+        text = ' '.join(rnd.choice(words)[:rnd.randint(1, 4)] for _ in range(rnd.randint(0, 2)))
+        low = rnd.choice([None, rnd.randrange(0, 100)])
+        high = rnd.choice([None, rnd.randrange(0, 100)])
+        assert found(index, text, low, high) == brute(text, low, high)
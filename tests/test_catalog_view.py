@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+pytest.importorskip('PySide6')
+
+from PySide6.QtCore import QPersistentModelIndex
+from PySide6.QtTest import QAbstractItemModelTester
+
+from catalog_view import CarListModel, CarRole
+
+
+def car(car_id, price=1_000_000):
+    return {'id': car_id, 'brand': 'Toyota', 'model': 'Camry', 'vin': f"VIN{car_id}", 'price': price}
+
+
+@pytest.fixture
+def model(qapp):
+    model = CarListModel(fetch_more=lambda key: None, is_fetching=lambda: False)
+    # Проверяет согласованность сигналов begin/end* с содержимым модели
+    QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+    return model
+
+
+def ids(model):
+    return [model.data(model.index(row), CarRole)['id'] for row in range(model.rowCount())]
+
+
+def record_signals(model):
+    events = []
+    model.rowsInserted.connect(lambda parent, first, last: events.append(('insert', first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: events.append(('remove', first, last)))
+    model.rowsMoved.connect(lambda *args: events.append(('move', args[1], args[4])))
+    model.dataChanged.connect(lambda top, bottom, roles=(): events.append(('changed', top.row(), bottom.row())))
+    model.modelReset.connect(lambda: events.append(('reset',)))
+    return events
+
+
+def test_sync_inserts_new_cars_in_place(model):
+    model.reset([car(1), car(3)])
+    events = record_signals(model)
+
+    model.sync([car(1), car(2), car(3), car(4)])
+
+    assert ids(model) == [1, 2, 3, 4]
+    assert events == [('insert', 1, 1), ('insert', 3, 3)]
+
+
+def test_sync_removes_sold_cars_as_ranges(model):
+    model.reset([car(i) for i in range(1, 7)])
+    events = record_signals(model)
+
+    model.sync([car(1), car(4), car(6)])
+
+    assert ids(model) == [1, 4, 6]
+    # Соседние пропавшие строки удаляются одним диапазоном, снизу вверх
+    assert events == [('remove', 4, 4), ('remove', 1, 2)]
+
+
+def test_sync_moves_car_and_keeps_persistent_index(model):
+    model.reset([car(1, 100), car(2, 200), car(3, 300)])
+    moved = QPersistentModelIndex(model.index(2))
+    events = record_signals(model)
+
+    model.sync([car(3, 50), car(1, 100), car(2, 200)])
+
+    assert ids(model) == [3, 1, 2]
+    assert moved.row() == 0
+    assert model.data(model.index(0), CarRole)['price'] == 50
+    assert ('move', 2, 0) in events
+    assert ('changed', 0, 0) in events
+    assert not any(event[0] in ('insert', 'remove', 'reset') for event in events)
+
+
+def test_sync_updates_changed_rows_only(model):
+    model.reset([car(1, 100), car(2, 200)])
+    events = record_signals(model)
+
+    model.sync([car(1, 100), car(2, 250)])
+
+    assert events == [('changed', 1, 1)]
+
+
+def test_sync_trims_tail_and_keeps_next_key(model):
+    model.reset([car(i) for i in range(1, 6)], next_key=(None, 5))
+
+    model.sync([car(1), car(2)], next_key=(None, 2))
+
+    assert ids(model) == [1, 2]
+    assert model.next_key == (None, 2)
+
+
+def test_sync_forgets_pending_for_removed_cars(model):
+    model.reset([car(1), car(2)])
+    model.set_pending(2, True)
+
+    model.sync([car(1)])
+
+    assert model.pending == set()
+
+
+def test_sync_matches_random_selections(model):
+    rnd = random.Random(7)
+    for _ in range(200):
+        before = [car(car_id, rnd.randint(1, 5)) for car_id in rnd.sample(range(40), rnd.randint(0, 15))]
+        after = [car(car_id, rnd.randint(1, 5)) for car_id in rnd.sample(range(40), rnd.randint(0, 15))]
+        model.reset(before)
+        model.sync(after)
+        assert [model.data(model.index(row), CarRole) for row in range(model.rowCount())] == after
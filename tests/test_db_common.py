@@ -0,0 +1,161 @@
+import random
+import sqlite3
+
+import pytest
+
+from db_common import (
+    CAR_SORTS, FACET_BRAND, FACET_MODEL, FACET_PRICE_BAND, FACET_TOTAL, PRICE_BANDS, car_filters_sql,
+    cars_page_sql, facets_from_rows, facets_without, price_band_of, price_band_sql, split_page,
+)
+from db_rows import fetch_records
+
+
+@pytest.fixture(scope='module')
+def cars_db():
+    rnd = random.Random(11)
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE CARS (id INTEGER PRIMARY KEY, brand TEXT, model TEXT, price INTEGER, status TEXT)")
+    # Мало разных цен и марок - много равных значений на границах страниц
+    conn.executemany(
+        "INSERT INTO CARS VALUES (?, ?, ?, ?, ?)",
+        [(i, rnd.choice(['Audi', 'BMW', 'Kia']), rnd.choice(['A', 'B']), rnd.choice([1, 2, 3]) * 1_000_000,
+          rnd.choice(['в наличии', 'в наличии', 'продан'])) for i in range(1, 201)]
+    )
+    yield conn
+    conn.close()
+
+
+def load_page(conn, filters, sort, after_key, limit):
+    column, where, order_by, params = cars_page_sql(filters, sort, after_key)
+    cursor = conn.execute(f"SELECT * FROM CARS WHERE {where} ORDER BY {order_by} LIMIT {limit + 1}", params)
+    return split_page(fetch_records(cursor), column, limit)
+
+
+def test_filters_default_to_available_cars():
+    assert car_filters_sql({}) == (["status = ?"], ['в наличии'])
+
+
+def test_filters_build_price_range_half_open():
+    conditions, params = car_filters_sql({'brand': 'BMW', 'min_price': 0, 'max_price': 2_000_000})
+
+    assert conditions == ["status = ?", "brand = ?", "price >= ?", "price < ?"]
+    assert params == ['в наличии', 'BMW', 0, 2_000_000]
+
+
+def test_first_page_has_no_keyset_condition():
+    column, where, order_by, params = cars_page_sql({}, 'price_desc', None)
+
+    assert column == 'price'
+    assert where == "status = ?"
+    assert order_by == "price DESC, id DESC"
+
+
+def test_keyset_condition_breaks_ties_by_id():
+    _, where, _, params = cars_page_sql({}, 'price_asc', (2_000_000, 17))
+
+    assert where.endswith("(price > ? OR (price = ? AND id > ?))")
+    assert params[-3:] == [2_000_000, 2_000_000, 17]
+
+
+def test_unknown_sort_is_rejected():
+    with pytest.raises(KeyError):
+        cars_page_sql({}, 'price; DROP TABLE CARS', None)
+
+
+def test_split_page_returns_next_key_only_when_more_rows():
+    rows = [{'id': i, 'price': i * 10} for i in range(1, 5)]
+
+    assert split_page(rows[:3], 'price', 3) == (rows[:3], None)
+    assert split_page(rows, 'price', 3) == (rows[:3], (30, 3))
+
+
+@pytest.mark.parametrize('sort', sorted(CAR_SORTS))
+@pytest.mark.parametrize('filters', [{}, {'brand': 'BMW'}, {'min_price': 2_000_000, 'max_price': 3_000_000}])
+def test_paging_walks_every_car_once_in_order(cars_db, sort, filters):
+    _, where, order_by, params = cars_page_sql(filters, sort, None)
+    expected = [row[0] for row in cars_db.execute(f"SELECT id FROM CARS WHERE {where} ORDER BY {order_by}", params)]
+
+    seen, after_key = [], None
+    while True:
+        cars, after_key = load_page(cars_db, filters, sort, after_key, 7)
+        seen.extend(car['id'] for car in cars)
+        if after_key is None:
+            break
+
+    assert seen == expected
+
+
+@pytest.mark.parametrize('price, band', [
+    (0, 0), (1_999_999, 0), (2_000_000, 1), (3_999_999, 1), (4_000_000, 2), (7_000_000, 3), (50_000_000, 3),
+])
+def test_price_band_boundaries(price, band):
+    assert price_band_of(price) == band
+
+
+def test_price_band_sql_matches_python(cars_db):
+    prices = [0, 1_999_999, 2_000_000, 4_000_000, 6_999_999, 7_000_000, 50_000_000]
+
+    for price in prices:
+        (band,) = cars_db.execute(f"SELECT {price_band_sql()} FROM (SELECT ? AS price)", (price,)).fetchone()
+        assert band == price_band_of(price)
+    assert price_band_of(prices[-1]) == len(PRICE_BANDS) - 1
+
+
+def facet_rows():
+    return [
+        {'brand': 'BMW', 'model': 'X5', 'price_band': None, 'cars': 2, 'facet': FACET_MODEL},
+        {'brand': 'BMW', 'model': 'X3', 'price_band': None, 'cars': 1, 'facet': FACET_MODEL},
+        {'brand': 'BMW', 'model': None, 'price_band': None, 'cars': 3, 'facet': FACET_BRAND},
+        {'brand': None, 'model': None, 'price_band': 1, 'cars': 1, 'facet': FACET_PRICE_BAND},
+        {'brand': None, 'model': None, 'price_band': 2, 'cars': 2, 'facet': FACET_PRICE_BAND},
+        {'brand': None, 'model': None, 'price_band': None, 'cars': 3, 'facet': FACET_TOTAL},
+    ]
+
+
+def test_facets_from_rows_decodes_grouping_sets():
+    facets = facets_from_rows(facet_rows())
+
+    assert facets == {
+        'total': 3,
+        'brands': {'BMW': 3},
+        'models': {('BMW', 'X5'): 2, ('BMW', 'X3'): 1},
+        'price_bands': {1: 1, 2: 2},
+    }
+
+
+def test_facets_without_drops_emptied_counts():
+    facets = facets_from_rows(facet_rows())
+
+    sold = facets_without(facets, 'BMW', 'X3', 3_000_000)
+
+    assert sold == {
+        'total': 2,
+        'brands': {'BMW': 2},
+        'models': {('BMW', 'X5'): 2},
+        'price_bands': {2: 2},
+    }
+    # Исходный словарь из кэша не меняется
+    assert facets['models'][('BMW', 'X3')] == 1
+
+
+def test_sqlite_facets_match_brute_force_counts(tmp_path):
+    import sqlite_db
+    original_path = sqlite_db.DB_PATH
+    sqlite_db.use_database(str(tmp_path / 'facets.db'))
+    try:
+        sqlite_db.init_db()
+        sqlite_db.seed_demo_data(cars=60, employees=2, seed=5)
+        sqlite_db._facets_cache.invalidate()
+        cars = [car for car in sqlite_db.get_all_cars() if car['status'] == 'в наличии']
+
+        facets = sqlite_db.get_catalog_facets()
+    finally:
+        sqlite_db._facets_cache.invalidate()
+        sqlite_db.use_database(original_path)
+
+    assert facets['total'] == len(cars)
+    assert sum(facets['brands'].values()) == len(cars)
+    assert facets['brands'] == {b: sum(c['brand'] == b for c in cars) for b in {c['brand'] for c in cars}}
+    assert facets['price_bands'] == {
+        band: sum(price_band_of(c['price']) == band for c in cars) for band in {price_band_of(c['price']) for c in cars}
+    }
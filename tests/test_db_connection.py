@@ -0,0 +1,104 @@
+import json
+import time
+
+import pytest
+
+pytest.importorskip('pyodbc')
+
+import db_connection
+
+
+class FakeConnection:
+    def __init__(self, conn_str):
+        self.conn_str = conn_str
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Настраиваемые ответы на строки подключения: задержка и работает ли вариант"""
+    monkeypatch.setattr(db_connection, 'CONN_CACHE_FILE', str(tmp_path / '.db_connection.json'))
+    monkeypatch.setattr(db_connection, 'CONN_STRS', ['primary', 'trusted', 'localhost'])
+    monkeypatch.setattr(db_connection, '_resolved_conn_str', None)
+    state = {'delays': {}, 'down': set(), 'attempts': [], 'opened': []}
+
+    def connect(conn_str, timeout=None):
+        state['attempts'].append(conn_str)
+        time.sleep(state['delays'].get(conn_str, 0))
+        if conn_str in state['down']:
+            raise db_connection.pyodbc.Error(f"{conn_str} is down")
+        conn = FakeConnection(conn_str)
+        state['opened'].append(conn)
+        return conn
+
+    monkeypatch.setattr(db_connection.pyodbc, 'connect', connect)
+    return state
+
+
+def test_probe_prefers_priority_over_speed(server):
+    server['delays'] = {'primary': 0.2, 'localhost': 0.0}
+
+    conn_str, conn = db_connection._probe_candidates()
+
+    assert conn_str == 'primary'
+    assert conn.conn_str == 'primary'
+
+
+def test_probe_skips_failed_candidates_and_closes_the_rest(server):
+    server['down'] = {'primary'}
+    server['delays'] = {'trusted': 0.1}
+
+    conn_str, conn = db_connection._probe_candidates()
+    time.sleep(0.2)
+
+    assert conn_str == 'trusted'
+    assert [c.conn_str for c in server['opened'] if c.closed] == ['localhost']
+
+
+def test_probe_fails_when_nothing_works(server):
+    server['down'] = {'primary', 'trusted', 'localhost'}
+
+    with pytest.raises(Exception, match="Не удалось подключиться"):
+        db_connection._probe_candidates()
+
+
+def test_winning_string_is_cached_between_runs(server, monkeypatch):
+    server['down'] = {'primary'}
+    db_connection.connect()
+
+    # Следующий запуск: подключаемся сразу по запомненной строке
+    monkeypatch.setattr(db_connection, '_resolved_conn_str', None)
+    server['attempts'].clear()
+    conn = db_connection.connect()
+
+    assert conn.conn_str == 'trusted'
+    assert server['attempts'] == ['trusted']
+
+
+def test_cache_does_not_store_the_password(server):
+    db_connection.connect()
+
+    with open(db_connection.CONN_CACHE_FILE, encoding='utf-8') as f:
+        cached = json.load(f)
+    assert set(cached) == {'index', 'fingerprint'}
+
+
+def test_cache_ignored_when_connection_strings_change(server, monkeypatch):
+    db_connection.connect()
+    monkeypatch.setattr(db_connection, 'CONN_STRS', ['primary-new', 'trusted', 'localhost'])
+
+    assert db_connection._load_cached_conn_str() is None
+
+
+def test_broken_cached_string_is_forgotten_and_reprobed(server, monkeypatch):
+    db_connection.connect()
+    monkeypatch.setattr(db_connection, '_resolved_conn_str', None)
+    server['down'] = {'primary'}
+
+    conn = db_connection.connect()
+
+    assert conn.conn_str == 'trusted'
+    assert db_connection._load_cached_conn_str() == 'trusted'
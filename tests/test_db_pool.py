@@ -0,0 +1,128 @@
+import threading
+
+import pytest
+
+from db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.commits = 0
+        self.rollbacks = 0
+        self.fail_commit = False
+
+    def commit(self):
+        if self.fail_commit:
+            raise OSError("connection lost")
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def opened():
+    return []
+
+
+@pytest.fixture
+def pool(opened):
+    def connect():
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+    return ConnectionPool(connect, max_size=2, idle_timeout=300, checkout_timeout=0.2)
+
+
+def test_nested_blocks_share_connection_and_commit_once(pool):
+    with pool.connection() as outer:
+        with pool.connection() as inner:
+            assert inner is outer
+        assert outer.commits == 0
+    assert outer.commits == 1
+    assert pool.stats()['idle'] == 1
+
+
+def test_error_rolls_back_and_returns_connection(pool):
+    with pytest.raises(ValueError):
+        with pool.connection() as conn:
+            raise ValueError("boom")
+
+    assert conn.rollbacks == 1
+    with pool.connection() as again:
+        assert again is conn
+
+
+def test_idle_connections_are_evicted(pool, opened, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('db_pool.time.monotonic', lambda: now[0])
+    with pool.connection():
+        pass
+
+    now[0] += 301
+    with pool.connection() as conn:
+        pass
+
+    assert opened[0].closed
+    assert conn is opened[1]
+    assert pool.stats()['evicted'] == 1
+
+
+def test_checkout_times_out_when_pool_is_exhausted(pool):
+    ready, release = threading.Event(), threading.Event()
+
+    def hold():
+        with pool.connection():
+            ready.set()
+            release.wait()
+
+    threads = [threading.Thread(target=hold) for _ in range(2)]
+    for thread in threads:
+        ready.clear()
+        thread.start()
+        ready.wait()
+    try:
+        with pytest.raises(PoolTimeout):
+            with pool.connection():
+                pass
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    assert pool.stats()['waits'] == 1
+
+
+def test_close_all_closes_checked_out_connection_on_return(pool, opened):
+    with pool.connection() as conn:
+        pool.close_all()
+        assert not conn.closed
+
+    assert conn.closed
+    assert pool.stats()['size'] == 0
+    with pool.connection() as fresh:
+        assert fresh is not conn
+
+
+def test_failed_commit_is_raised_and_connection_discarded(pool):
+    with pytest.raises(OSError):
+        with pool.connection() as conn:
+            conn.fail_commit = True
+
+    assert conn.closed
+    stats = pool.stats()
+    assert stats['discarded'] == 1
+    assert stats['size'] == 0
+
+
+def test_failed_rollback_keeps_original_error(pool):
+    with pytest.raises(ValueError):
+        with pool.connection() as conn:
+            conn.rollback = lambda: (_ for _ in ()).throw(OSError("connection lost"))
+            raise ValueError("boom")
+
+    assert conn.closed
+    assert pool.stats()['size'] == 0
@@ -0,0 +1,82 @@
+import sqlite3
+
+import pytest
+
+from db_rows import Record, fetch_record, fetch_records, record_class
+
+
+@pytest.fixture
+def cursor():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE CARS (id INTEGER, brand TEXT, price INTEGER)")
+    conn.executemany("INSERT INTO CARS VALUES (?, ?, ?)", [(1, 'Toyota', 100), (2, 'BMW', 200)])
+    yield conn.cursor()
+    conn.close()
+
+
+def test_fetch_records_supports_dict_and_attribute_access(cursor):
+    cursor.execute("SELECT id, brand, price FROM CARS ORDER BY id")
+    cars = fetch_records(cursor)
+
+    assert [car['brand'] for car in cars] == ['Toyota', 'BMW']
+    assert cars[1].price == 200
+    assert cars[0][0] == 1
+    assert cars[0].get('vin', 'нет') == 'нет'
+    assert 'price' in cars[0] and 'vin' not in cars[0]
+    assert list(cars[0]) == ['id', 'brand', 'price']
+    assert dict(cars[0].items()) == {'id': 1, 'brand': 'Toyota', 'price': 100}
+
+
+def test_rows_of_one_result_share_class(cursor):
+    cursor.execute("SELECT id, brand, price FROM CARS")
+    first, second = fetch_records(cursor)
+
+    assert type(first) is type(second)
+    assert type(first) is record_class(('id', 'brand', 'price'))
+
+
+def test_empty_results(cursor):
+    cursor.execute("SELECT id FROM CARS WHERE id < 0")
+    assert fetch_records(cursor) == []
+
+    cursor.execute("SELECT id FROM CARS WHERE id < 0")
+    assert fetch_record(cursor) is None
+
+
+def test_record_equality_and_hash(cursor):
+    cursor.execute("SELECT id, brand, price FROM CARS WHERE id = 1")
+    car = fetch_record(cursor)
+    cursor.execute("SELECT id, brand, price FROM CARS WHERE id = 1")
+    same = fetch_record(cursor)
+
+    assert car == same and hash(car) == hash(same)
+    assert car == {'id': 1, 'brand': 'Toyota', 'price': 100}
+    assert car != car._replace(price=150)
+
+
+def test_replace_returns_changed_copy(cursor):
+    cursor.execute("SELECT id, brand, price FROM CARS WHERE id = 2")
+    car = fetch_record(cursor)
+
+    cheaper = car._replace(price=150)
+
+    assert cheaper.price == 150 and car.price == 200
+    assert isinstance(cheaper, Record)
+
+
+def test_duplicate_column_names_keep_last_value(cursor):
+    cursor.execute("SELECT id, brand, price AS id FROM CARS WHERE id = 1")
+    car = fetch_record(cursor)
+
+    assert car['id'] == 100
+    assert car.to_dict() == dict(zip(('id', 'brand', 'id'), (1, 'Toyota', 100)))
+
+
+def test_unknown_attribute_raises(cursor):
+    cursor.execute("SELECT id FROM CARS WHERE id = 1")
+    car = fetch_record(cursor)
+
+    with pytest.raises(AttributeError):
+        car.brand
+    with pytest.raises(KeyError):
+        car['brand']
@@ -0,0 +1,33 @@
+import pytest
+
+from hashing import LEGACY_ITERATIONS, HashingService, encode_hash, parse_hash
+
+
+@pytest.fixture
+def service(monkeypatch):
+    # Калибровка этого запуска - 500 000 итераций
+    monkeypatch.setattr(HashingService, 'iterations', property(lambda self: 500_000))
+    return HashingService()
+
+
+def test_parse_hash_reads_iterations():
+    assert parse_hash(encode_hash(480_000, 'abc')) == (480_000, 'abc')
+
+
+def test_parse_hash_legacy_hash_has_default_cost():
+    assert parse_hash('deadbeef') == (LEGACY_ITERATIONS, 'deadbeef')
+
+
+@pytest.mark.parametrize('iterations', [475_000, 496_000, 514_000, 716_000, 260_000])
+def test_calibration_noise_does_not_trigger_rehash(service, iterations):
+    assert not service.needs_rehash(encode_hash(iterations, 'abc'))
+
+
+@pytest.mark.parametrize('iterations', [250_000, 120_000])
+def test_clearly_stale_hash_is_rehashed(service, iterations):
+    assert service.needs_rehash(encode_hash(iterations, 'abc'))
+
+
+def test_legacy_hash_is_rehashed(service):
+    assert service.needs_rehash('deadbeef')
+
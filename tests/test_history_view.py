@@ -0,0 +1,95 @@
+import pytest
+
+pytest.importorskip('PySide6')
+
+from PySide6.QtCore import Qt
+from PySide6.QtTest import QAbstractItemModelTester
+
+from history_view import REVIEW_COLUMNS, HistoryTableModel
+
+
+class Page:
+    """Заменяет страницу отзывов: запоминает запросы модели"""
+
+    def __init__(self):
+        self.requested = []
+        self.sorts = []
+        self.fetching = False
+
+    def fetch_more(self, offset):
+        self.requested.append(offset)
+        self.fetching = True
+
+
+def review(review_id):
+    return {'id': review_id, 'order_id': review_id, 'rating': 4, 'comment': '', 'review_date': '2024-01-01'}
+
+
+@pytest.fixture
+def page():
+    return Page()
+
+
+@pytest.fixture
+def model(qapp, page):
+    model = HistoryTableModel(REVIEW_COLUMNS, 'review_date', page.fetch_more, lambda: page.fetching,
+                              lambda key, descending: page.sorts.append((key, descending)))
+    QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+    return model
+
+
+def test_fetch_more_requests_next_offset(model, page):
+    model.reset([review(i) for i in range(100)], has_more=True)
+
+    assert model.canFetchMore()
+    model.fetchMore()
+
+    assert page.requested == [100]
+
+
+def test_no_fetch_while_page_is_loading(model, page):
+    model.reset([review(i) for i in range(100)], has_more=True)
+    model.fetchMore()
+    model.fetchMore()
+
+    assert not model.canFetchMore()
+    assert page.requested == [100]
+
+
+def test_append_page_extends_rows_and_stops_at_last_page(model, page):
+    model.reset([review(i) for i in range(100)], has_more=True)
+    model.fetchMore()
+    page.fetching = False
+
+    model.append_page([review(i) for i in range(100, 130)], has_more=False)
+
+    assert model.rowCount() == 130
+    assert not model.canFetchMore()
+    model.fetchMore()
+    assert page.requested == [100]
+
+
+def test_empty_history_does_not_fetch(model, page):
+    model.reset([], has_more=False)
+
+    model.fetchMore()
+
+    assert model.rowCount() == 0
+    assert page.requested == []
+
+
+def test_stop_fetching_after_error(model):
+    model.reset([review(1)], has_more=True)
+
+    model.stop_fetching()
+
+    assert not model.canFetchMore()
+
+
+def test_sort_reports_db_key_and_ignores_repeats(model, page):
+    model.sort(1, Qt.AscendingOrder)
+    model.sort(1, Qt.AscendingOrder)
+    model.sort(3, Qt.DescendingOrder)
+
+    assert page.sorts == [('rating', False), ('review_date', True)]
+    assert model.sort_column() == 3
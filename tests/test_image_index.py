@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+pytest.importorskip('PySide6')
+
+from image_index import IMAGE_EXTENSIONS, ImageIndex, image_key, normalize, scan_images
+
+
+def touch(path):
+    path.write_bytes(b'')
+    return str(path)
+
+
+def test_normalize_ignores_case_spaces_and_dashes():
+    assert normalize('Mercedes E-Class') == 'mercedes_e_class'
+    assert image_key('Mercedes', 'E-Class') == image_key('mercedes', 'e class')
+
+
+def test_missing_directory_is_created(tmp_path):
+    directory = tmp_path / 'images'
+
+    assert scan_images(str(directory)) == {}
+    assert directory.is_dir()
+
+
+def test_scan_prefers_extension_order_and_skips_other_files(tmp_path):
+    touch(tmp_path / 'BMW_X5.png')
+    jpg = touch(tmp_path / 'bmw x5.JPG')
+    png = touch(tmp_path / 'Kia-Sportage.png')
+    touch(tmp_path / 'notes.txt')
+    (tmp_path / 'Audi_Q7.jpg').mkdir()
+
+    entries = scan_images(str(tmp_path))
+
+    assert IMAGE_EXTENSIONS[0] == '.jpg'
+    assert set(entries) == {'bmw_x5', 'kia_sportage'}
+    assert entries['bmw_x5'] == (jpg, os.stat(jpg).st_mtime)
+    assert entries['kia_sportage'][0] == png
+
+
+def test_index_lookup_after_scan(qapp, tmp_path):
+    path = touch(tmp_path / 'Toyota_Camry.jpg')
+    index = ImageIndex(str(tmp_path))
+    changed = []
+    index.changed.connect(lambda: changed.append(True))
+
+    assert index.lookup('Toyota', 'Camry') is None
+    index._on_scanned(scan_images(str(tmp_path)))
+
+    assert index.ready and changed == [True]
+    assert index.lookup('toyota', 'camry')[0] == path
+    assert index.lookup('Toyota', 'Corolla') is None
+    assert len(index) == 1
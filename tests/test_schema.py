@@ -0,0 +1,62 @@
+import pytest
+
+import schema
+import sqlite_db
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    if schema.backend.BACKEND != 'sqlite':
+        pytest.skip("тесты схемы используют SQLite (AUTO_DREAMS_BACKEND=sqlite)")
+    monkeypatch.setattr(schema, 'SCHEMA_CACHE_FILE', str(tmp_path / '.schema_version.json'))
+    original_path = sqlite_db.DB_PATH
+    sqlite_db.use_database(str(tmp_path / 'schema.db'))
+    yield sqlite_db
+    sqlite_db.use_database(original_path)
+
+
+def test_new_database_is_migrated_then_cached(store):
+    assert schema.ensure_schema() == 'migrated'
+    assert store.get_schema_version() == schema.SCHEMA_VERSION
+
+    assert schema.ensure_schema() == 'cached'
+
+
+def test_cached_version_skips_database(store, monkeypatch):
+    schema.ensure_schema()
+
+    def fail():
+        raise AssertionError("версия уже подтверждена")
+    monkeypatch.setattr(schema.backend, 'get_schema_version', fail)
+
+    assert schema.ensure_schema() == 'cached'
+
+
+def test_forgotten_cache_is_checked_once(store):
+    schema.ensure_schema()
+    schema.forget_schema_cache()
+
+    assert schema.ensure_schema() == 'checked'
+    assert schema.ensure_schema() == 'cached'
+
+
+def test_old_version_is_migrated_again(store):
+    schema.ensure_schema()
+    store.set_schema_version(schema.SCHEMA_VERSION - 1)
+    schema.forget_schema_cache()
+
+    assert schema.ensure_schema() == 'migrated'
+
+
+def test_cache_is_kept_per_database(store, tmp_path):
+    schema.ensure_schema()
+    store.use_database(str(tmp_path / 'other.db'))
+
+    assert schema.ensure_schema() == 'migrated'
+
+
+def test_broken_cache_file_is_ignored(store):
+    with open(schema.SCHEMA_CACHE_FILE, 'w', encoding='utf-8') as f:
+        f.write('not json')
+
+    assert schema.ensure_schema() == 'migrated'
@@ -0,0 +1,114 @@
+import os
+
+import pytest
+
+import session_tokens
+from session_tokens import clear_token, create_token, parse_token, save_token, saved_session
+
+
+@pytest.fixture(autouse=True)
+def token_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_tokens, 'KEY_FILE', str(tmp_path / '.session_key'))
+    monkeypatch.setattr(session_tokens, 'TOKEN_FILE', str(tmp_path / '.session_token'))
+    return tmp_path
+
+
+def test_valid_token_round_trip():
+    claims = parse_token(create_token(7, 'alice', 'nonce-1'))
+
+    assert claims['uid'] == 7
+    assert claims['username'] == 'alice'
+    assert claims['nonce'] == 'nonce-1'
+
+
+def test_expired_token_is_rejected():
+    assert parse_token(create_token(7, 'alice', 'nonce-1', ttl=-1)) is None
+
+
+def test_tampered_payload_is_rejected():
+    token = create_token(7, 'alice', 'nonce-1')
+    other = create_token(1, 'admin', 'nonce-1')
+    forged = f"{other.split('.')[0]}.{token.split('.')[1]}"
+
+    assert parse_token(forged) is None
+
+
+def test_tampered_signature_is_rejected():
+    payload, signature = create_token(7, 'alice', 'nonce-1').split('.')
+    flipped = ('A' if signature[0] != 'A' else 'B') + signature[1:]
+
+    assert parse_token(f"{payload}.{flipped}") is None
+
+
+def test_token_signed_with_other_key_is_rejected(token_files):
+    token = create_token(7, 'alice', 'nonce-1')
+    os.remove(token_files / '.session_key')
+
+    assert parse_token(token) is None
+
+
+@pytest.mark.parametrize('token', [None, '', 'no-dot', 'a.b', '!!!.???'])
+def test_garbage_is_rejected(token):
+    assert parse_token(token) is None
+
+
+def test_saved_session_clears_invalid_token(token_files):
+    save_token(create_token(7, 'alice', 'nonce-1', ttl=-1))
+
+    assert saved_session() is None
+    assert not (token_files / '.session_token').exists()
+
+
+def test_clear_token_forgets_saved_session():
+    save_token(create_token(7, 'alice', 'nonce-1'))
+    assert saved_session()['username'] == 'alice'
+
+    clear_token()
+
+    assert saved_session() is None
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    import sqlite_db
+    original_path = sqlite_db.DB_PATH
+    sqlite_db.use_database(str(tmp_path / 'sessions.db'))
+    sqlite_db.init_db()
+    yield sqlite_db
+    sqlite_db.use_database(original_path)
+
+
+def test_nonce_is_checked_against_database(sqlite_store):
+    sqlite_store.create_user('alice', 'alice@example.com', 'password')
+    user_id = sqlite_store.find_user_by_login_or_email('alice')['id']
+    nonce = sqlite_store.issue_session_nonce(user_id)
+    claims = parse_token(create_token(user_id, 'alice', nonce))
+
+    assert sqlite_store.find_user_by_session(claims['uid'], claims['nonce'])['username'] == 'alice'
+    assert sqlite_store.find_user_by_session(claims['uid'], 'other-nonce') is None
+
+    sqlite_store.revoke_sessions(user_id)
+    assert sqlite_store.find_user_by_session(claims['uid'], claims['nonce']) is None
+
+
+def test_password_change_revokes_saved_sessions(sqlite_store):
+    sqlite_store.create_user('bob', 'bob@example.com', 'password')
+    user_id = sqlite_store.find_user_by_login_or_email('bob')['id']
+    nonce = sqlite_store.issue_session_nonce(user_id)
+
+    sqlite_store.update_password(user_id, 'new-password')
+
+    assert sqlite_store.find_user_by_session(user_id, nonce) is None
+    assert sqlite_store.issue_session_nonce(user_id) != nonce
+
+
+def test_rehash_keeps_saved_sessions(sqlite_store):
+    sqlite_store.create_user('carol', 'carol@example.com', 'password')
+    user_id = sqlite_store.find_user_by_login_or_email('carol')['id']
+    nonce = sqlite_store.issue_session_nonce(user_id)
+
+    sqlite_store.rehash_password(user_id, 'password')
+
+    assert sqlite_store.find_user_by_session(user_id, nonce)['username'] == 'carol'
+    user = sqlite_store.find_user_by_login_or_email('carol')
+    assert sqlite_store.verify_password('password', user['password_hash'], user['salt'])
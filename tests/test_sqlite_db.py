@@ -0,0 +1,149 @@
+import pytest
+
+import sqlite_db
+
+
+@pytest.fixture
+def store(tmp_path):
+    original_path = sqlite_db.DB_PATH
+    sqlite_db.use_database(str(tmp_path / 'store.db'))
+    sqlite_db.init_db()
+    sqlite_db.seed_demo_data(cars=20, employees=3, seed=7)
+    sqlite_db._facets_cache.invalidate()
+    yield sqlite_db
+    sqlite_db._facets_cache.invalidate()
+    sqlite_db.use_database(original_path)
+
+
+@pytest.fixture
+def client_id(store):
+    return store.get_or_create_client_for_user(1, 'alice')
+
+
+def test_create_order_sells_car_and_records_order(store, client_id):
+    car = store.get_all_cars()[0]
+
+    order_id = store.create_order(client_id, car['id'])
+
+    assert car['id'] not in {c['id'] for c in store.get_all_cars()}
+    (order,) = store.get_client_orders(client_id)
+    assert order['id'] == order_id
+    assert order['car_id'] == car['id']
+    assert order['final_price'] == car['price']
+
+
+def test_second_order_for_same_car_is_rejected(store, client_id):
+    car_id = store.get_all_cars()[0]['id']
+    store.create_order(client_id, car_id)
+
+    with pytest.raises(Exception, match="уже продан"):
+        store.create_order(client_id, car_id)
+    assert len(store.get_client_orders(client_id)) == 1
+
+
+def test_orders_rotate_between_employees(store, client_id):
+    for car in store.get_all_cars()[:3]:
+        store.create_order(client_id, car['id'])
+
+    employees = {order['employee_id'] for order in store.get_client_orders(client_id)}
+    assert employees == {1, 2, 3}
+
+
+def test_order_patches_cached_facets(store, client_id):
+    before = store.get_catalog_facets()
+    car = store.get_all_cars()[0]
+
+    store.create_order(client_id, car['id'])
+
+    after = store.get_catalog_facets()
+    assert after['total'] == before['total'] - 1
+    assert after['brands'].get(car['brand'], 0) == before['brands'][car['brand']] - 1
+    # Патч кэша совпадает с честным пересчётом
+    store._facets_cache.invalidate()
+    assert store.get_catalog_facets() == after
+
+
+def test_client_lookup_is_idempotent(store):
+    first = store.get_or_create_client_for_user(5, 'bob')
+
+    assert store.get_or_create_client_for_user(5, 'bob') == first
+    assert store.get_or_create_client_for_user(6, 'bob') != first
+
+
+def test_legacy_client_is_linked_by_name(store):
+    with store.get_conn() as conn:
+        legacy_id = conn.execute(
+            "INSERT INTO CLIENTS (first_name, last_name, phone) VALUES ('carol', 'Old', '+7-111')"
+        ).lastrowid
+
+    assert store.get_or_create_client_for_user(9, 'carol') == legacy_id
+    # Второй пользователь с тем же именем получает нового клиента
+    assert store.get_or_create_client_for_user(10, 'carol') != legacy_id
+
+
+def test_demo_session_gets_its_own_client(store):
+    demo = store.get_or_create_client_for_user(0, 'demo')
+
+    assert demo != store.get_or_create_client_for_user(1, 'alice')
+
+
+def test_session_client_id_is_resolved_once(store, monkeypatch):
+    user = {'id': 3, 'username': 'dave'}
+    client_id = store.get_session_client_id(user)
+    assert user['client_id'] == client_id
+
+    def fail(*args):
+        raise AssertionError("клиент уже известен")
+    monkeypatch.setattr(store, 'get_or_create_client_for_user', fail)
+
+    assert store.get_session_client_id(user) == client_id
+
+
+def test_cars_page_walks_whole_catalog(store):
+    seen, after_key = [], None
+    while True:
+        cars, after_key = store.get_cars_page(sort='price_desc', after_key=after_key, limit=6)
+        seen.extend(car['id'] for car in cars)
+        if after_key is None:
+            break
+
+    assert sorted(seen) == sorted(car['id'] for car in store.get_all_cars())
+    assert len(seen) == len(set(seen)) == 20
+
+
+def test_order_history_pages(store, client_id):
+    for car in store.get_all_cars()[:5]:
+        store.create_order(client_id, car['id'])
+
+    first, more = store.get_client_orders_page(client_id, sort='final_price', descending=False, limit=3)
+    rest, last = store.get_client_orders_page(client_id, sort='final_price', descending=False, offset=3, limit=3)
+
+    assert more and not last
+    prices = [order['final_price'] for order in first + rest]
+    assert prices == sorted(prices) and len(prices) == 5
+
+
+def test_unknown_history_sort_is_rejected(store, client_id):
+    with pytest.raises(ValueError):
+        store.get_client_orders_page(client_id, sort='final_price; DROP TABLE ORDERS')
+
+
+def test_schema_version_round_trip(store):
+    store.set_schema_version(4)
+
+    assert store.get_schema_version() == 4
+
+
+def test_bulk_users_report_duplicates(store, monkeypatch):
+    store.create_user('erin', 'erin@example.com', 'password')
+    # Маленькие пачки: дубликат во второй пачке разбирается построчно
+    monkeypatch.setattr(store, 'BULK_INSERT_BATCH', 2)
+    rows = [(f'user{i}', f'user{i}@example.com', 'hash', 'salt') for i in range(3)]
+    rows.append(('erin', 'other@example.com', 'hash', 'salt'))
+
+    errors = store.create_users_bulk(rows)
+
+    assert errors == [None, None, None, store.DUPLICATE_USER_ERROR]
+    assert store.find_taken_logins(['user2', 'erin', 'nobody'], ['user0@example.com']) == (
+        {'user2', 'erin', 'user0'}, {'user2@example.com', 'erin@example.com', 'user0@example.com'}
+    )
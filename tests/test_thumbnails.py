@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+pytest.importorskip('PySide6')
+
+from PySide6.QtGui import QColor, QImage
+
+import thumbnails
+from image_index import ImageIndex, scan_images
+
+
+@pytest.fixture
+def images(tmp_path):
+    image = QImage(580, 310, QImage.Format_RGB32)
+    image.fill(QColor('red'))
+    image.save(str(tmp_path / 'BMW_X5.png'))
+    (tmp_path / 'Kia_Sportage.jpg').write_bytes(b'not an image')
+    return tmp_path
+
+
+@pytest.fixture
+def service(qapp, images, monkeypatch):
+    index = ImageIndex(str(images))
+    index._on_scanned(scan_images(str(images)))
+    monkeypatch.setattr(thumbnails, 'image_index', lambda: index)
+    service = thumbnails.ThumbnailService()
+    yield service
+    service.pool.waitForDone()
+
+
+def wait_for(service, qapp):
+    service.pool.waitForDone()
+    deadline = time.monotonic() + 2
+    while service._pending and time.monotonic() < deadline:
+        qapp.processEvents()
+    qapp.processEvents()
+
+
+def test_car_without_image_gets_placeholder(service):
+    assert service.get('Lada', 'Vesta') is None
+    assert service.stats()['misses'] == 0
+
+
+def test_thumbnail_is_decoded_in_background(service, qapp):
+    ready = []
+    service.thumbnail_ready.connect(lambda brand, model: ready.append((brand, model)))
+
+    # Пока миниатюра декодируется - заглушка
+    assert service.get('BMW', 'X5') is None
+    wait_for(service, qapp)
+
+    pixmap = service.get('BMW', 'X5')
+    assert ready == [('BMW', 'X5')]
+    assert (pixmap.width(), pixmap.height()) == (290, 155)
+    assert service.stats()['hits'] == 1 and service.stats()['decoded'] == 1
+
+
+def test_broken_image_is_not_retried(service, qapp):
+    assert service.get('Kia', 'Sportage') is None
+    wait_for(service, qapp)
+
+    assert service.get('Kia', 'Sportage') is None
+    assert not service._pending
+    assert service.stats()['errors'] == 1
+
+
+def test_decode_thumbnail_fits_card(images):
+    image = thumbnails.decode_thumbnail(str(images / 'BMW_X5.png'))
+
+    assert image.width() <= thumbnails.THUMBNAIL_SIZE.width()
+    assert image.height() <= thumbnails.THUMBNAIL_SIZE.height()
@@ -0,0 +1,324 @@
+from functools import lru_cache
+from typing import Dict
+
+from PySide6.QtCore import Qt
+
+# Цветовая палитра нового дизайна
+COLORS = {
+    'primary_bg': '#0f1117',
+    'secondary_bg': '#1a1d29',
+    'accent_blue': '#3b82f6',
+    'accent_purple': '#8b5cf6',
+    'text_primary': '#f1f5f9',
+    'text_secondary': '#94a3b8',
+    'success': '#10b981',
+    'danger': '#ef4444',
+    'border': '#334155'
+}
+
+# Оттенки градиента кнопок при наведении и нажатии
+HOVER_GRADIENT = ('#2563eb', '#7c3aed')
+PRESSED_GRADIENT = ('#1d4ed8', '#6d28d9')
+
+# Вся тема приложения - одна таблица стилей на QApplication. Виджеты не
+# получают собственных setStyleSheet: роль задаётся objectName (заголовок,
+# панель формы и т.п.), вариант кнопки - свойством "variant" (см. set_variant).
+STYLESHEET_TEMPLATE = """
+QWidget {{
+    font-family: 'Segoe UI';
+    color: {text_primary};
+}}
+QMainWindow, QDialog {{
+    background-color: {primary_bg};
+}}
+
+/* Заголовки и подписи */
+QLabel#title, QLabel#formTitle {{
+    font-size: 28px;
+    font-weight: bold;
+    color: {accent_blue};
+    margin-bottom: 20px;
+}}
+QLabel#formTitle {{
+    margin-bottom: 30px;
+}}
+QLabel#brandTitle {{
+    font-size: 42px;
+    font-weight: bold;
+    color: {accent_blue};
+    margin-bottom: 10px;
+}}
+QLabel#brandSubtitle {{
+    font-size: 20px;
+    color: {accent_purple};
+    margin-bottom: 20px;
+}}
+QLabel#welcome {{
+    font-size: 18px;
+    color: {text_secondary};
+    margin-bottom: 30px;
+}}
+QLabel#logo {{
+    color: {accent_blue};
+    font-size: 36px;
+    font-weight: bold;
+    margin-bottom: 20px;
+}}
+QLabel#slogan {{
+    color: {accent_purple};
+    font-size: 18px;
+    font-weight: bold;
+}}
+QLabel#decor {{
+    color: {accent_blue};
+    font-size: 24px;
+    margin-top: 20px;
+}}
+QLabel#formLabel {{
+    color: {accent_blue};
+    font-size: 14px;
+    font-weight: bold;
+}}
+QLabel#hint {{
+    font-size: 12px;
+}}
+QLabel#hint[variant="ok"] {{
+    color: {success};
+}}
+QLabel#hint[variant="error"] {{
+    color: {danger};
+}}
+QLabel#demoHint {{
+    color: {text_secondary};
+    font-size: 12px;
+    margin-top: 20px;
+}}
+QLabel#statusLabel {{
+    color: {text_secondary};
+    font-size: 14px;
+}}
+QLabel#emptyMessage {{
+    color: {text_secondary};
+    font-size: 16px;
+}}
+QLabel#infoTitle {{
+    font-size: 16px;
+    font-weight: bold;
+    color: {accent_blue};
+    margin-bottom: 10px;
+}}
+QLabel#infoText {{
+    color: {text_secondary};
+    font-size: 12px;
+}}
+QCheckBox {{
+    color: {text_secondary};
+    font-size: 13px;
+}}
+
+/* Панели */
+QWidget#formPanel {{
+    background-color: {secondary_bg};
+    border: 2px solid {accent_blue};
+    border-radius: 15px;
+    padding: 30px;
+}}
+QWidget#sidePanel {{
+    background-color: {secondary_bg};
+    border: 2px solid {accent_blue};
+    border-radius: 15px;
+    margin: 20px;
+}}
+QFrame#infoPanel {{
+    background-color: {secondary_bg};
+    border: 2px solid {accent_blue};
+    border-radius: 12px;
+    margin-top: 30px;
+    padding: 20px;
+}}
+QFrame#divider {{
+    background-color: {accent_blue};
+    border: none;
+    min-height: 2px;
+    max-height: 2px;
+}}
+
+/* Поля ввода */
+QLineEdit, QSpinBox, QTextEdit {{
+    background-color: {secondary_bg};
+    color: {text_primary};
+    padding: 12px;
+    border: 2px solid {border};
+    border-radius: 8px;
+    font-size: 14px;
+}}
+QLineEdit:focus, QSpinBox:focus, QTextEdit:focus {{
+    border-color: {accent_blue};
+}}
+QSpinBox::up-button, QSpinBox::down-button {{
+    background-color: {accent_blue};
+    border: none;
+    border-radius: 3px;
+}}
+
+/* Кнопки: по умолчанию - градиентная основная */
+QPushButton {{
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 {accent_blue}, stop:1 {accent_purple});
+    color: {text_primary};
+    border: none;
+    padding: 12px 24px;
+    border-radius: 8px;
+    font-size: 16px;
+    font-weight: bold;
+}}
+QPushButton:hover {{
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 {hover_from}, stop:1 {hover_to});
+}}
+QPushButton:pressed {{
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 {pressed_from}, stop:1 {pressed_to});
+}}
+QPushButton:disabled {{
+    background: {border};
+    color: {text_secondary};
+}}
+QPushButton[variant="back"] {{
+    padding: 10px 20px;
+    font-size: 14px;
+    margin-top: 20px;
+}}
+QPushButton[variant="menu"] {{
+    padding: 12px 25px;
+    border-radius: 10px;
+    margin: 5px 0;
+}}
+QPushButton[variant="outline"], QPushButton[variant="resume"] {{
+    background: transparent;
+    color: {accent_blue};
+    border: 2px solid {accent_blue};
+    margin-top: 15px;
+}}
+QPushButton[variant="outline"]:hover {{
+    background: {accent_blue};
+    color: {text_primary};
+}}
+QPushButton[variant="resume"] {{
+    color: {success};
+    border-color: {success};
+    margin-top: 0;
+}}
+QPushButton[variant="resume"]:hover {{
+    background: {success};
+    color: {text_primary};
+}}
+
+/* Таблицы и списки */
+QTableWidget, QTableView {{
+    background-color: {secondary_bg};
+    color: {text_primary};
+    gridline-color: {border};
+    border: 2px solid {accent_blue};
+    border-radius: 8px;
+}}
+QTableWidget::item, QTableView::item {{
+    padding: 10px;
+    border-bottom: 1px solid {border};
+}}
+QTableWidget::item:selected, QTableView::item:selected {{
+    background-color: {accent_blue};
+    color: {text_primary};
+}}
+QHeaderView::section {{
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 {accent_blue}, stop:1 {accent_purple});
+    color: {text_primary};
+    padding: 12px;
+    font-weight: bold;
+    border: none;
+}}
+QListView#catalog {{
+    border: none;
+    background-color: transparent;
+}}
+QTreeWidget#facets {{
+    background-color: {secondary_bg};
+    border: 2px solid {border};
+    border-radius: 8px;
+    padding: 6px;
+    font-size: 13px;
+}}
+QTreeWidget#facets::item {{
+    padding: 4px 2px;
+}}
+QTreeWidget#facets::item:selected {{
+    background-color: {accent_blue};
+    color: {text_primary};
+    border-radius: 4px;
+}}
+QScrollBar:vertical {{
+    background-color: {secondary_bg};
+    width: 10px;
+    margin: 0px;
+    border-radius: 5px;
+}}
+QScrollBar::handle:vertical {{
+    background-color: {accent_blue};
+    min-height: 20px;
+    border-radius: 5px;
+}}
+QScrollBar::handle:vertical:hover {{
+    background-color: {accent_purple};
+}}
+
+/* Диалоги */
+QMessageBox {{
+    background-color: {secondary_bg};
+    border: 2px solid {accent_blue};
+    border-radius: 12px;
+}}
+QMessageBox QLabel {{
+    color: {text_primary};
+    font-size: 14px;
+}}
+QMessageBox QPushButton {{
+    padding: 8px 16px;
+    border-radius: 6px;
+    font-size: 14px;
+    min-width: 80px;
+}}
+"""
+
+
+@lru_cache(maxsize=None)
+def _build(palette: tuple) -> str:
+    colors = dict(palette)
+    return STYLESHEET_TEMPLATE.format(
+        hover_from=HOVER_GRADIENT[0], hover_to=HOVER_GRADIENT[1],
+        pressed_from=PRESSED_GRADIENT[0], pressed_to=PRESSED_GRADIENT[1],
+        **colors
+    )
+
+
+def build_stylesheet(colors: Dict[str, str] = COLORS) -> str:
+    """Таблица стилей приложения для палитры (собирается один раз на палитру)"""
+    return _build(tuple(sorted(colors.items())))
+
+
+def apply_theme(app, colors: Dict[str, str] = COLORS):
+    app.setStyleSheet(build_stylesheet(colors))
+
+
+def set_variant(widget, variant: str):
+    """Меняет вариант оформления виджета (свойство "variant" в таблице стилей)"""
+    if widget.property('variant') == variant:
+        return
+    widget.setProperty('variant', variant)
+    # Уже стилизованный виджет нужно перестилизовать, чтобы селектор сработал;
+    # при создании страницы достаточно свойства
+    if widget.testAttribute(Qt.WA_WState_Polished):
+        style = widget.style()
+        style.unpolish(widget)
+        style.polish(widget)
+        widget.update()
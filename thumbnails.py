@@ -0,0 +1,147 @@
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+from PySide6.QtCore import QObject, QSize, Qt, QThreadPool, Signal
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+
+from image_index import image_index
+from workers import Worker
+
+THUMBNAIL_SIZE = QSize(290, 155)  # Область изображения в карточке каталога
+THUMBNAIL_CACHE_BYTES = 32 * 1024 * 1024  # Сколько памяти могут занимать миниатюры
+DECODE_THREADS = 2  # Отдельный пул, чтобы декодирование не задерживало запросы к БД
+
+ThumbnailKey = Tuple[str, str, float]  # (марка, модель, mtime файла)
+
+
+def decode_thumbnail(path: str) -> QImage:
+    """Декодирует изображение сразу в размер миниатюры (выполняется в фоновом потоке)"""
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid():
+        # JPEG декодируется сразу в уменьшенном масштабе, без полноразмерного кадра
+        reader.setScaledSize(size.scaled(THUMBNAIL_SIZE, Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"{os.path.basename(path)}: {reader.errorString()}")
+    if not size.isValid():
+        image = image.scaled(THUMBNAIL_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return image
+
+
+class ThumbnailService(QObject):
+    """Миниатюры машин: декодирование в фоне и LRU-кэш в памяти.
+
+    get() никогда не обращается к диску в GUI-потоке: путь и mtime файла
+    берутся из индекса папки images (image_index), а если миниатюры ещё нет,
+    возвращается None (карточка рисует заглушку), загрузка ставится в очередь
+    и по готовности испускается thumbnail_ready(brand, model).
+    Кэш ограничен по памяти и хранит ключ (марка, модель, mtime файла), так что
+    заменённый файл получает новый ключ и декодируется заново.
+    """
+
+    thumbnail_ready = Signal(str, str)
+    images_changed = Signal()  # Файлы в папке images добавили, удалили или заменили
+
+    def __init__(self, parent: QObject = None, max_bytes: int = THUMBNAIL_CACHE_BYTES):
+        super().__init__(parent)
+        self.max_bytes = max_bytes
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(DECODE_THREADS)
+        self.index = image_index()
+        self.index.changed.connect(self.images_changed)
+        self._cache: "OrderedDict[ThumbnailKey, QPixmap]" = OrderedDict()
+        self._bytes = 0
+        self._shown: Dict[Tuple[str, str], ThumbnailKey] = {}  # Последняя готовая версия для машины
+        self._pending: Dict[ThumbnailKey, Worker] = {}
+        self._failed: Set[ThumbnailKey] = set()
+        self._stats = {'hits': 0, 'misses': 0, 'decoded': 0, 'evicted': 0, 'errors': 0}
+
+    def get(self, brand: str, model: str) -> Optional[QPixmap]:
+        entry = self.index.lookup(brand, model)
+        if entry is None:
+            return None
+        path, mtime = entry
+        key = (brand, model, mtime)
+        pixmap = self._cache.get(key)
+        if pixmap is not None:
+            self._cache.move_to_end(key)
+            self._stats['hits'] += 1
+            return pixmap
+
+        self._stats['misses'] += 1
+        if key not in self._failed:
+            self._request(key, path)
+        # Пока новая версия файла декодируется, показываем прежнюю
+        previous = self._shown.get((brand, model))
+        return self._cache.get(previous) if previous is not None else None
+
+    def _request(self, key: ThumbnailKey, path: str):
+        if key in self._pending:
+            return
+        worker = Worker(decode_thumbnail, path)
+        worker.signals.result.connect(lambda image: self._on_decoded(key, image))
+        worker.signals.error.connect(lambda e: self._on_error(key, e))
+        worker.signals.finished.connect(lambda: self._pending.pop(key, None))
+        self._pending[key] = worker
+        self.pool.start(worker)
+
+    def _on_decoded(self, key: ThumbnailKey, image: QImage):
+        self._stats['decoded'] += 1
+        self._put(key, QPixmap.fromImage(image))
+        name = key[:2]
+        previous = self._shown.get(name)
+        self._shown[name] = key
+        if previous is not None and previous != key:
+            self._drop(previous)
+        self.thumbnail_ready.emit(*name)
+
+    def _on_error(self, key: ThumbnailKey, error: Exception):
+        # Битый файл не декодируем повторно, пока его не заменят (новый mtime - новый ключ)
+        self._stats['errors'] += 1
+        self._failed.add(key)
+        print(f"Ошибка загрузки изображения: {error}")
+
+    @staticmethod
+    def _size_of(value: Any) -> int:
+        if isinstance(value, QPixmap):
+            return value.width() * value.height() * max(value.depth(), 8) // 8
+        return 0
+
+    def _put(self, key, value):
+        self._drop(key)
+        self._cache[key] = value
+        self._bytes += self._size_of(value)
+        while self._bytes > self.max_bytes and len(self._cache) > 1:
+            old_key, old_value = self._cache.popitem(last=False)
+            self._bytes -= self._size_of(old_value)
+            if self._shown.get(old_key[:2]) == old_key:
+                del self._shown[old_key[:2]]
+            self._stats['evicted'] += 1
+
+    def _drop(self, key):
+        value = self._cache.pop(key, None)
+        if value is not None:
+            self._bytes -= self._size_of(value)
+
+    def clear(self):
+        self._cache.clear()
+        self._shown.clear()
+        self._failed.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats, entries=len(self._cache), bytes=self._bytes)
+
+
+_service: Optional[ThumbnailService] = None
+
+
+def thumbnail_service() -> ThumbnailService:
+    """Общий сервис миниатюр (создаётся при первом обращении, после QApplication)"""
+    global _service
+    if _service is None:
+        _service = ThumbnailService()
+    return _service
@@ -0,0 +1,124 @@
+"""Замер времени создания страниц интерфейса.
+
+    python ui_bench.py --repeat 20 --output ui_after.json
+    python ui_bench.py --repeat 20 --compare ui_before.json
+
+Каждая страница создаётся repeat раз. В замер входит конструктор и
+стилизация всех дочерних виджетов (ensurePolished) - именно там Qt разбирает
+и применяет таблицы стилей. Окна не показываются (платформа offscreen),
+данные берутся из временной SQLite-базы с демо-данными.
+
+Переход на одну таблицу стилей из COLORS (theme.py), --repeat 5, offscreen, p50:
+
+    main_window  18.96 -> 7.29 мс
+    login        11.71 -> 2.92 мс
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+
+def construct(factory: Callable[[], Any]) -> float:
+    from PySide6.QtWidgets import QApplication, QWidget
+    from workers import BackgroundTasks
+
+    started = time.perf_counter()
+    widget = factory()
+    for child in [widget, *widget.findChildren(QWidget)]:
+        child.ensurePolished()
+    elapsed = time.perf_counter() - started
+
+    # Загрузки, запущенные конструктором, в замер не входят
+    for tasks in widget.findChildren(BackgroundTasks):
+        tasks.cancel_all()
+    widget.deleteLater()
+    QApplication.processEvents()
+    return elapsed
+
+
+def run(repeat: int) -> Dict[str, Any]:
+    import sqlite_db
+    sqlite_db.init_db()
+    sqlite_db.seed_demo_data()
+    sqlite_db.create_user('ui_bench', 'ui_bench@bench.local', 'password')
+    user = sqlite_db.find_user_by_login_or_email('ui_bench')
+
+    from PySide6.QtCore import QThreadPool
+    from PySide6.QtWidgets import QApplication
+    import main as app_main
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    apply_theme = getattr(app_main, 'apply_theme', None)
+    theme_started = time.perf_counter()
+    if apply_theme is not None:
+        apply_theme(app)
+    theme_ms = (time.perf_counter() - theme_started) * 1000
+
+    noop = lambda *args: None
+    pages = {
+        'login': lambda: app_main.LoginPage(on_login_success=noop, go_register=noop),
+        'register': lambda: app_main.RegisterPage(go_login=noop),
+        'main_menu': lambda: app_main.MainMenuPage(user, logout_callback=noop),
+        'catalog': lambda: app_main.CarCatalogPage(user, back_callback=noop),
+        'orders': lambda: app_main.OrdersPage(user, back_callback=noop),
+        'reviews': lambda: app_main.ReviewsPage(user, back_callback=noop),
+        'my_reviews': lambda: app_main.MyReviewsPage(user, back_callback=noop),
+        'main_window': app_main.MainWindow,
+    }
+
+    results = {'repeat': repeat, 'apply_theme_ms': theme_ms, 'pages': {}}
+    for name, factory in pages.items():
+        construct(factory)  # прогрев: импорты, шрифты, кэши стиля
+        ms = sorted(construct(factory) * 1000 for _ in range(repeat))
+        results['pages'][name] = {
+            'mean_ms': statistics.fmean(ms),
+            'p50_ms': statistics.median(ms),
+            'max_ms': ms[-1],
+        }
+        print(f"{name:<12} mean {results['pages'][name]['mean_ms']:8.2f} ms  "
+              f"p50 {results['pages'][name]['p50_ms']:8.2f} ms  max {ms[-1]:8.2f} ms")
+
+    QThreadPool.globalInstance().waitForDone()
+    sqlite_db.pool.close_all()
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]):
+    print("\nСравнение с базовым прогоном (отрицательное - быстрее):")
+    for name, stats in current['pages'].items():
+        base = baseline.get('pages', {}).get(name)
+        if base and base['p50_ms']:
+            delta = (stats['p50_ms'] - base['p50_ms']) / base['p50_ms'] * 100
+            print(f"{name:<12} p50 {base['p50_ms']:8.2f} -> {stats['p50_ms']:8.2f} ms ({delta:+6.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время создания страниц интерфейса")
+    parser.add_argument('--repeat', type=int, default=20, help="сколько раз создавать каждую страницу")
+    parser.add_argument('--output', help="куда сохранить JSON")
+    parser.add_argument('--compare', help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Окружение задаётся до импорта main/backend
+        os.environ['AUTO_DREAMS_BACKEND'] = 'sqlite'
+        os.environ['AUTO_DREAMS_SQLITE_PATH'] = os.path.join(tmp, 'ui_bench.db')
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        results = run(args.repeat)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ Результаты сохранены: {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
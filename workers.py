@@ -0,0 +1,121 @@
+from typing import Any, Callable, Dict, Optional
+
+from PySide6.QtCore import QEvent, QObject, QRunnable, QThreadPool, Signal
+
+
+class WorkerSignals(QObject):
+    """Сигналы фоновой задачи; обработчики вызываются в GUI-потоке"""
+    result = Signal(object)
+    error = Signal(object)
+    finished = Signal()
+
+
+class Worker(QRunnable):
+    """Выполняет функцию в QThreadPool и сообщает результат сигналами.
+
+    cancel() не прерывает уже начатый запрос к БД, но гарантирует,
+    что его результат не будет доставлен (и что задача не начнётся, если ещё ждёт в очереди).
+    """
+
+    def __init__(self, fn: Callable, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        if self.cancelled:
+            self.signals.finished.emit()
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(e)
+        else:
+            if not self.cancelled:
+                self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class BackgroundTasks(QObject):
+    """Фоновые задачи одной страницы.
+
+    Задачи именуются ключом: новая задача с тем же ключом отменяет предыдущую,
+    поэтому устаревший результат (например, прошлой загрузки списка) не затрёт свежий.
+    Когда страница скрывается (пользователь ушёл с неё), результаты загрузок
+    отбрасываются; задачи с cancel_on_hide=False (покупка, отзыв) доводятся до конца.
+    """
+
+    def __init__(self, parent: QObject = None, pool: Optional[QThreadPool] = None):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._workers: Dict[str, Worker] = {}
+        self._keep_on_hide = set()
+        self._shown = False
+        if parent is not None:
+            parent.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Show:
+            self._shown = True
+        # Пока страница ни разу не показывалась, загрузки из конструктора не трогаем
+        elif event.type() == QEvent.Hide and self._shown and not event.spontaneous():
+            self._shown = False
+            for key in list(self._workers):
+                if key not in self._keep_on_hide:
+                    self.cancel(key)
+        return False
+
+    def run(self, key: str, fn: Callable, *args,
+            on_result: Optional[Callable[[Any], None]] = None,
+            on_error: Optional[Callable[[Exception], None]] = None,
+            on_finished: Optional[Callable[[], None]] = None,
+            cancel_on_hide: bool = True, **kwargs) -> Worker:
+        self.cancel(key)
+        if cancel_on_hide:
+            self._keep_on_hide.discard(key)
+        else:
+            self._keep_on_hide.add(key)
+
+        worker = Worker(fn, *args, **kwargs)
+        if on_result is not None:
+            worker.signals.result.connect(lambda result: self._deliver(key, worker, on_result, result))
+        if on_error is not None:
+            worker.signals.error.connect(lambda error: self._deliver(key, worker, on_error, error))
+        worker.signals.finished.connect(lambda: self._finish(key, worker, on_finished))
+
+        self._workers[key] = worker
+        self.pool.start(worker)
+        return worker
+
+    def is_running(self, key: str) -> bool:
+        return key in self._workers
+
+    def cancel(self, key: str):
+        worker = self._workers.pop(key, None)
+        if worker is not None:
+            worker.cancel()
+
+    def cancel_all(self):
+        for key in list(self._workers):
+            self.cancel(key)
+
+    def _deliver(self, key: str, worker: Worker, callback: Callable, value: Any):
+        # Результат отменённой или заменённой задачи выбрасываем
+        if worker.cancelled or self._workers.get(key) is not worker:
+            return
+        callback(value)
+
+    def _finish(self, key: str, worker: Worker, on_finished: Optional[Callable[[], None]]):
+        if self._workers.get(key) is not worker:
+            return
+        del self._workers[key]
+        if on_finished is not None:
+            on_finished()